@@ -1,8 +1,16 @@
 
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, BeforeValidator
+from typing import Annotated, Any, Dict, List, Optional, Union
 from fastapi import File, UploadFile, Form
 
+from utils.payload import parse_legacy_payload
+
+
+# Structured fields accept native JSON objects/arrays. Legacy clients that send
+# ``str(dict)`` / JSON-encoded strings are decoded once, here, at the boundary;
+# strings that are not structured data are kept as-is.
+JSONPayload = Annotated[Union[Dict[str, Any], List[Any], str], BeforeValidator(parse_legacy_payload)]
+
 
 class BaseRequest(BaseModel):
     model_provider: str = "openai"
@@ -12,8 +20,8 @@ class BaseRequest(BaseModel):
 
 class ChatWithAutorRequest(BaseRequest):
 
-    messages: str
-    learner_profile: str = ""
+    messages: JSONPayload
+    learner_profile: JSONPayload = ""
 
 
 class LearningGoalRefinementRequest(BaseRequest):
@@ -32,93 +40,94 @@ class SkillGapIdentificationRequest(BaseRequest):
 
     learning_goal: str
     learner_information: str
-    skill_requirements: Optional[str] = None
+    skill_requirements: Optional[JSONPayload] = None
 
 
 class LearnerProfileInitializationWithInfoRequest(BaseRequest):
 
     learning_goal: str
-    learner_information: str
-    skill_gaps: str
+    learner_information: JSONPayload
+    skill_gaps: JSONPayload
 
 
 class LearnerProfileInitializationRequest(BaseRequest):
 
     learning_goal: str
-    skill_requirements: str
-    skill_gaps: str
+    skill_requirements: JSONPayload
+    skill_gaps: JSONPayload
     cv_path: str
 
 
 class LearnerProfileUpdateRequest(BaseRequest):
 
-    learner_profile: str
-    learner_interactions: str
-    learner_information: str = ""
-    session_information: str = ""
+    learner_profile: JSONPayload
+    learner_interactions: JSONPayload
+    learner_information: JSONPayload = ""
+    session_information: JSONPayload = ""
+    learning_path: Optional[JSONPayload] = None
 
 
 class LearningPathSchedulingRequest(BaseRequest):
 
-    learner_profile: str
+    learner_profile: JSONPayload
     session_count: int
 
 
 class LearningPathReschedulingRequest(BaseRequest):
     
-    learner_profile: str
-    learning_path: str
+    learner_profile: JSONPayload
+    learning_path: JSONPayload
     session_count: int = -1
-    other_feedback: str = ""
+    other_feedback: JSONPayload = ""
 
 
 class TailoredContentGenerationRequest(BaseRequest):
 
-    learner_profile: str
-    learning_path: str
-    knowledge_point: str
+    learner_profile: JSONPayload
+    learning_path: JSONPayload
+    knowledge_point: JSONPayload
 
 
 class KnowledgePerspectiveExplorationRequest(BaseRequest):
 
-    learner_profile: str
-    learning_path: str
-    knowledge_point: str
+    learner_profile: JSONPayload
+    learning_path: JSONPayload
+    knowledge_point: JSONPayload
 
 
 class KnowledgePerspectiveDraftingRequest(BaseRequest):
 
-    learner_profile: str
-    learning_path: str
-    knowledge_point: str
-    perspectives_of_knowledge_point: str
-    knowledge_perspective: str
+    learner_profile: JSONPayload
+    learning_path: JSONPayload
+    knowledge_point: JSONPayload
+    perspectives_of_knowledge_point: JSONPayload
+    knowledge_perspective: JSONPayload
     use_search: bool = True
 
 
 class KnowledgeDocumentIntegrationRequest(BaseRequest):
 
-    learner_profile: str
-    learning_path: str
-    knowledge_point: str
-    perspectives_of_knowledge_point: str
-    drafts_of_perspectives: str
+    learner_profile: JSONPayload
+    learning_path: JSONPayload
+    knowledge_point: JSONPayload
+    perspectives_of_knowledge_point: JSONPayload
+    drafts_of_perspectives: JSONPayload
 
 
 class PointPerspectivesDraftingRequest(BaseModel):
 
-    learner_profile: str
-    learning_path: str
-    knowledge_point: str
-    perspectives_of_knowledge_point: str
+    learner_profile: JSONPayload
+    learning_path: JSONPayload
+    knowledge_point: JSONPayload
+    perspectives_of_knowledge_point: JSONPayload
     use_search: bool
     allow_parallel: bool
  
 
 class KnowledgeQuizGenerationRequest(BaseModel):
 
-    learner_profile: str
-    learning_document: str
+    learner_profile: JSONPayload
+    learning_document: JSONPayload
     single_choice_count: int = 3
     multiple_choice_count: int = 0
     true_false_count: int = 0
@@ -127,46 +136,81 @@ class KnowledgeQuizGenerationRequest(BaseModel):
 
 class TailoredContentGenerationRequest(BaseModel):
 
-    learner_profile: str
-    learning_path: str
-    learning_session: str
+    learner_profile: JSONPayload
+    learning_path: JSONPayload
+    learning_session: JSONPayload
+    use_search: bool = True
+    allow_parallel: bool = True
+    with_quiz: bool = True
+    single_choice_count: int = 3
+    multiple_choice_count: int = 0
+    true_false_count: int = 0
+    short_answer_count: int = 0
+    prefetched_only: bool = False
+    regenerate: bool = False
+    trace: bool = False
+
+
+class LearningContentPrefetchRequest(BaseModel):
+
+    learner_profile: JSONPayload
+    learning_path: JSONPayload
+    current_session_id: Optional[str] = None
+    session_id: Optional[str] = None
+    use_search: bool = True
+    with_quiz: bool = True
+    # Unset counts fall back to ``prefetch.quiz_counts``.
+    single_choice_count: Optional[int] = None
+    multiple_choice_count: Optional[int] = None
+    true_false_count: Optional[int] = None
+    short_answer_count: Optional[int] = None
+
+
+class LearningPathContentGenerationRequest(BaseModel):
+
+    learner_profile: JSONPayload
+    learning_path: JSONPayload
+    session_ids: Optional[List[str]] = None
+    include_learned: bool = False
     use_search: bool = True
     allow_parallel: bool = True
     with_quiz: bool = True
+    max_concurrency: Optional[int] = None
 
 
 class KnowledgePointExplorationRequest(BaseModel):
     
-    learner_profile: str
-    learning_path: str
-    learning_session: str
+    learner_profile: JSONPayload
+    learning_path: JSONPayload
+    learning_session: JSONPayload
 
 
 class KnowledgePointDraftingRequest(BaseModel):
 
-    learner_profile: str
-    learning_path: str
-    learning_session: str
-    knowledge_points: str
-    knowledge_point: str
+    learner_profile: JSONPayload
+    learning_path: JSONPayload
+    learning_session: JSONPayload
+    knowledge_points: JSONPayload
+    knowledge_point: JSONPayload
     use_search: bool
 
 
 class KnowledgePointsDraftingRequest(BaseModel):
 
-    learner_profile: str
-    learning_path: str
-    learning_session: str
-    knowledge_points: str
+    learner_profile: JSONPayload
+    learning_path: JSONPayload
+    learning_session: JSONPayload
+    knowledge_points: JSONPayload
     use_search: bool
     allow_parallel: bool
+    trace: bool = False
 
 
 class LearningDocumentIntegrationRequest(BaseModel):
 
-    learner_profile: str
-    learning_path: str
-    learning_session: str
-    knowledge_points: str
-    knowledge_drafts: str
+    learner_profile: JSONPayload
+    learning_path: JSONPayload
+    learning_session: JSONPayload
+    knowledge_points: JSONPayload
+    knowledge_drafts: JSONPayload
     output_markdown: bool = False
@@ -1,5 +1,6 @@
 from .base_agent import BaseAgent
 from .llm_factory import LLMFactory
+from .llm_pool import LLMClientPool
 from .searcher_factory import SearcherFactory, SearchRunner
 from .embedder_factory import EmbedderFactory
 from .rag_factory import TextSplitterFactory, VectorStoreFactory
@@ -8,6 +9,7 @@ from .rag_factory import TextSplitterFactory, VectorStoreFactory
 __all__ = [
     "BaseAgent",
     "LLMFactory",
+    "LLMClientPool",
     "SearcherFactory",
     "SearchRunner",
     "EmbedderFactory",
@@ -1,9 +1,21 @@
-from typing import Any, Dict, Optional, Sequence
+import json
+import asyncio
+import logging
+import threading
+import contextlib
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Tuple
 
 from langchain.agents import create_agent
 from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk
 
-from utils.llm_output import preprocess_response
+from base.llm_scheduler import get_default_llm_scheduler
+from base.metrics import LLM_CALL_FAILURES, LLM_CALL_SECONDS
+from base.tracing import span
+from base.usage import default_usage_tracker, estimate_tokens, usage_from_messages
+from base.response_cache import get_default_response_cache, model_identity
+from utils.llm_output import preprocess_response, get_text_from_chunk, get_text_from_response, ThinkStreamFilter
 from langgraph.typing import InputT, OutputT, StateT
 from langchain.agents.middleware.types import (
     AgentMiddleware,
@@ -16,6 +28,8 @@ from langchain.agents.middleware.types import (
     _OutputAgentState,
 )
 
+logger = logging.getLogger(__name__)
+
 valid_agent_arg_list = [
     "middleware",
     "response_format",
@@ -30,9 +44,25 @@ valid_agent_arg_list = [
     "cache"
 ]
 
+# Agent arguments that only configure graph bookkeeping; they do not require the graph.
+_DIRECT_CALL_AGENT_ARGS = {"name", "debug"}
+
 
 class BaseAgent:
 
+    # Whether ``invoke``/``ainvoke`` results may be served from the response cache.
+    # Subclasses opt out by setting this to False; ``cache_responses=`` overrides per instance.
+    cache_responses: bool = True
+
+    @classmethod
+    def shared(cls, model: BaseChatModel, **kwargs: Any) -> "BaseAgent":
+        """Return the process-wide instance of this agent for ``model`` and ``kwargs``, creating it once.
+
+        Agents hold no per-call state, so helpers reuse one instance instead of
+        constructing (and possibly compiling) a new one on every request.
+        """
+        return default_agent_registry.get(cls, model, **kwargs)
+
     def __init__(
             self,
             model: BaseChatModel,
@@ -45,9 +75,25 @@ class BaseAgent:
         self._system_prompt = system_prompt
         self._tools = tools
         self._agent_kwargs = {k: v for k, v in kwargs.items() if k in valid_agent_arg_list}
-        self._agent = self._build_agent()
+        self._graph = self._build_agent() if self.uses_graph else None
         self.exclude_think = kwargs.get("exclude_think", True)
         self.jsonalize_output = kwargs.get("jsonalize_output", True)
+        self.cache_responses = kwargs.get("cache_responses", type(self).cache_responses)
+
+    @property
+    def uses_graph(self) -> bool:
+        """Whether calls go through a ``create_agent`` graph.
+
+        Without tools or graph options the graph is a single model node, so
+        the chat model is called directly instead.
+        """
+        return bool(self._tools) or any(k not in _DIRECT_CALL_AGENT_ARGS for k in self._agent_kwargs)
+
+    @property
+    def _agent(self):
+        if self._graph is None:
+            self._graph = self._build_agent()
+        return self._graph
 
     def _build_agent(self):
         return create_agent(
@@ -63,7 +109,7 @@ class BaseAgent:
             self._system_prompt = system_prompt
         if task_prompt is not None:
             self._task_prompt = task_prompt
-        self._agent = self._build_agent()
+        self._graph = self._build_agent() if self.uses_graph else None
 
     def _build_prompt(self, variables: Dict[str, Any], task_prompt: Optional[str] = None) -> _InputAgentState:
         """Build chat messages for model call."""
@@ -77,11 +123,234 @@ class BaseAgent:
         }
         return prompt
 
+    @property
+    def agent_name(self) -> str:
+        return getattr(self, "name", None) or type(self).__name__
+
+    def _response_cache_key(self, input_dict: dict, task_prompt: Optional[str]):
+        """Return ``(cache, key)``; ``cache`` is None when caching does not apply."""
+        if not self.cache_responses or self._tools:
+            return None, None
+        cache = get_default_response_cache()
+        if cache is None or not cache.accepts(self.agent_name, self._model):
+            return None, None
+        key = cache.make_key(
+            self._model,
+            self._system_prompt,
+            task_prompt,
+            input_dict,
+            exclude_think=self.exclude_think,
+            jsonalize_output=self.jsonalize_output,
+        )
+        return cache, key
+
+    def _record_usage(self, input_dict: dict, input_prompt: _InputAgentState, messages: Sequence[Any], output_text: Optional[str]) -> None:
+        """Report token counts (provider-reported, else estimated) and prompt size per template variable."""
+        try:
+            prompt_text = (self._system_prompt or "") + "".join(
+                str(message.get("content", "")) for message in input_prompt.get("messages", [])
+            )
+            usage = usage_from_messages(messages)
+            estimated = usage is None
+            if estimated:
+                usage = {"input_tokens": estimate_tokens(prompt_text), "output_tokens": estimate_tokens(output_text or "")}
+            default_usage_tracker.record(
+                self.agent_name,
+                input_tokens=usage["input_tokens"],
+                output_tokens=usage["output_tokens"],
+                estimated=estimated,
+                prompt_chars=len(prompt_text),
+                variable_chars={name: len(str(value)) for name, value in input_dict.items()},
+            )
+        except Exception as e:
+            logger.debug(f"Failed to record usage for {self.agent_name}: {e}")
+
+    def _record_invoke_usage(self, input_dict: dict, input_prompt: _InputAgentState, raw_output: Any) -> None:
+        messages = raw_output.get("messages", []) if isinstance(raw_output, dict) else []
+        try:
+            output_text = str(get_text_from_response(raw_output))
+        except Exception:
+            output_text = ""
+        self._record_usage(input_dict, input_prompt, messages, output_text)
+
+    def _direct_messages(self, input_prompt: _InputAgentState) -> list:
+        messages = list(input_prompt["messages"])
+        if self._system_prompt:
+            messages.insert(0, {"role": "system", "content": self._system_prompt})
+        return messages
+
+    def _run(self, input_prompt: _InputAgentState) -> Any:
+        """One model call, shaped like the graph output (``{"messages": [..., reply]}``)."""
+        if self.uses_graph:
+            return self._agent.invoke(input_prompt)
+        reply = self._model.invoke(self._direct_messages(input_prompt))
+        return {"messages": [*input_prompt["messages"], reply]}
+
+    async def _arun(self, input_prompt: _InputAgentState) -> Any:
+        if self.uses_graph:
+            return await self._agent.ainvoke(input_prompt)
+        reply = await self._model.ainvoke(self._direct_messages(input_prompt))
+        return {"messages": [*input_prompt["messages"], reply]}
+
+    async def _astream_chunks(self, input_prompt: _InputAgentState) -> AsyncIterator[Any]:
+        if self.uses_graph:
+            async for chunk, _metadata in self._agent.astream(input_prompt, stream_mode="messages"):
+                yield chunk
+        else:
+            async for chunk in self._model.astream(self._direct_messages(input_prompt)):
+                yield chunk
+
+    def _call_model(self, input_prompt: _InputAgentState) -> Any:
+        """Run one model call through the LLM scheduler, recording latency and failures."""
+        scheduler = get_default_llm_scheduler()
+        try:
+            with LLM_CALL_SECONDS.time(agent=self.agent_name, mode="invoke"), span("llm", agent=self.agent_name):
+                if scheduler is not None:
+                    return scheduler.call(self._model, lambda: self._run(input_prompt), label=self.agent_name)
+                return self._run(input_prompt)
+        except Exception as e:
+            LLM_CALL_FAILURES.inc(agent=self.agent_name, error=type(e).__name__)
+            raise
+
+    async def _acall_model(self, input_prompt: _InputAgentState) -> Any:
+        scheduler = get_default_llm_scheduler()
+        try:
+            with LLM_CALL_SECONDS.time(agent=self.agent_name, mode="invoke"), span("llm", agent=self.agent_name):
+                if scheduler is not None:
+                    return await scheduler.acall(self._model, lambda: self._arun(input_prompt), label=self.agent_name)
+                return await self._arun(input_prompt)
+        except Exception as e:
+            LLM_CALL_FAILURES.inc(agent=self.agent_name, error=type(e).__name__)
+            raise
+
     def invoke(self, input_dict: dict, task_prompt: Optional[str] = None) -> Any:
         """Invoke the agent with the given input text."""
+        cache, cache_key = self._response_cache_key(input_dict, task_prompt)
+        cached_output = cache.get(self.agent_name, cache_key) if cache is not None else None
+        if cached_output is not None:
+            return cached_output
+        input_prompt = self._build_prompt(input_dict, task_prompt=task_prompt)
+        raw_output = self._call_model(input_prompt)
+        self._record_invoke_usage(input_dict, input_prompt, raw_output)
+        output = preprocess_response(
+            raw_output, only_text=True, exclude_think=self.exclude_think, json_output=self.jsonalize_output
+        )
+        if cache is not None:
+            cache.set(self.agent_name, cache_key, output)
+        return output
+
+    async def ainvoke(self, input_dict: dict, task_prompt: Optional[str] = None) -> Any:
+        """Asynchronously invoke the agent without blocking the event loop."""
+        cache, cache_key = self._response_cache_key(input_dict, task_prompt)
+        # The response cache is SQLite-backed; keep its reads and writes off the event loop.
+        cached_output = await asyncio.to_thread(cache.get, self.agent_name, cache_key) if cache is not None else None
+        if cached_output is not None:
+            return cached_output
         input_prompt = self._build_prompt(input_dict, task_prompt=task_prompt)
-        raw_output = self._agent.invoke(input_prompt)
+        raw_output = await self._acall_model(input_prompt)
+        self._record_invoke_usage(input_dict, input_prompt, raw_output)
         output = preprocess_response(
             raw_output, only_text=True, exclude_think=self.exclude_think, json_output=self.jsonalize_output
         )
+        if cache is not None:
+            await asyncio.to_thread(cache.set, self.agent_name, cache_key, output)
         return output
+
+    async def astream(self, input_dict: dict, task_prompt: Optional[str] = None) -> AsyncIterator[str]:
+        """Stream the reply as text deltas while the model generates.
+
+        ``<think>`` blocks are removed incrementally when ``exclude_think`` is set.
+        No JSON post-processing is applied; callers stream free text. The call
+        holds one scheduler slot for its whole duration but is not retried,
+        since part of the reply may already have been sent.
+        """
+        input_prompt = self._build_prompt(input_dict, task_prompt=task_prompt)
+        think_filter = ThinkStreamFilter() if self.exclude_think else None
+        scheduler = get_default_llm_scheduler()
+        slot = scheduler.limiter_for(self._model).aslot() if scheduler is not None else contextlib.nullcontext()
+        chunks_with_usage = []
+        streamed_text = []
+        try:
+            with LLM_CALL_SECONDS.time(agent=self.agent_name, mode="stream"):
+                async with slot:
+                    async for chunk in self._astream_chunks(input_prompt):
+                        if not isinstance(chunk, AIMessageChunk):
+                            continue
+                        if chunk.usage_metadata:
+                            chunks_with_usage.append(chunk)
+                        text = get_text_from_chunk(chunk)
+                        streamed_text.append(text or "")
+                        if think_filter is not None:
+                            text = think_filter.feed(text)
+                        if text:
+                            yield text
+        except Exception as e:
+            LLM_CALL_FAILURES.inc(agent=self.agent_name, error=type(e).__name__)
+            raise
+        self._record_usage(input_dict, input_prompt, chunks_with_usage, "".join(streamed_text))
+        if think_filter is not None:
+            tail = think_filter.flush().rstrip()
+            if tail:
+                yield tail
+
+
+class AgentRegistry:
+    """Bounded LRU registry of ready agent instances.
+
+    Keyed by agent class, model (its output-determining settings plus the
+    client object) and constructor arguments; the system prompt is fixed by
+    each agent class. Objects passed as arguments (managers, caches) are keyed
+    by identity. Shared instances must not be reconfigured with
+    :meth:`BaseAgent.set_prompts`.
+    """
+
+    def __init__(self, max_size: int = 64) -> None:
+        self.max_size = max(1, int(max_size))
+        self._agents: "OrderedDict[Tuple, BaseAgent]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _make_key(cls: type, model: Any, kwargs: Dict[str, Any]) -> Tuple:
+        arguments = tuple(sorted(
+            (name, value if isinstance(value, (str, int, float, bool, type(None))) else ("id", id(value)))
+            for name, value in kwargs.items()
+        ))
+        identity = json.dumps(model_identity(model), sort_keys=True, default=str)
+        return (cls, identity, id(model), arguments)
+
+    def get(self, cls: type, model: Any, **kwargs: Any) -> BaseAgent:
+        key = self._make_key(cls, model, kwargs)
+        with self._lock:
+            agent = self._agents.get(key)
+            if agent is not None:
+                self._agents.move_to_end(key)
+                self.hits += 1
+                return agent
+            self.misses += 1
+        # Build outside the lock; a concurrent duplicate is harmless and the first one wins.
+        return self._insert(key, cls(model, **kwargs))
+
+    def add(self, agent: BaseAgent, model: Any, **kwargs: Any) -> BaseAgent:
+        """Register an already built ``agent`` as if :meth:`get` had built it with these arguments."""
+        return self._insert(self._make_key(type(agent), model, kwargs), agent)
+
+    def _insert(self, key: Tuple, agent: BaseAgent) -> BaseAgent:
+        with self._lock:
+            agent = self._agents.setdefault(key, agent)
+            self._agents.move_to_end(key)
+            while len(self._agents) > self.max_size:
+                self._agents.popitem(last=False)
+        return agent
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._agents), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._agents.clear()
+
+
+default_agent_registry = AgentRegistry()
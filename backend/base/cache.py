@@ -0,0 +1,240 @@
+"""Persistent key-value cache on top of a local SQLite file.
+
+Used for results that are expensive to recompute (LLM responses, extracted text,
+search results, fetched pages, embeddings). Entries carry an optional expiry
+and are evicted least-recently-used first once the table exceeds
+``max_entries`` rows or ``max_bytes`` of stored values.
+"""
+
+import os
+import json
+import time
+import logging
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def json_dumps_bytes(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_loads_bytes(data: bytes) -> Any:
+    return json.loads(data)
+
+
+class SQLiteCache:
+    """Thread-safe SQLite-backed cache with TTL and LRU eviction.
+
+    Values go through ``serializer``/``deserializer`` (JSON by default). Pass
+    identity functions to store raw bytes. Several caches can share one
+    database file by using different ``table`` names.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        table: str = "cache",
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        serializer: Callable[[Any], bytes] = json_dumps_bytes,
+        deserializer: Callable[[bytes], Any] = json_loads_bytes,
+    ) -> None:
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table!r}")
+        self.db_path = db_path
+        self.table = table
+        self.ttl = float(ttl) if ttl else None
+        self.max_entries = int(max_entries) if max_entries else None
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self._serialize = serializer
+        self._deserialize = deserializer
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    expires_at REAL
+                )
+                """
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)")
+            count, total = self._conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {table}").fetchone()
+        self._count = int(count)
+        self._bytes = int(total)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key``, or ``None`` on a miss or expiry."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Look up several keys in one query; only hits are returned."""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        now = time.time()
+        found: Dict[str, Any] = {}
+        with self._lock, self._conn:
+            rows = []
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows.extend(self._conn.execute(
+                    f"SELECT key, value, size, expires_at FROM {self.table} WHERE key IN ({placeholders})", batch
+                ).fetchall())
+            expired = []
+            for key, value, size, expires_at in rows:
+                if expires_at is not None and expires_at <= now:
+                    expired.append((key, size))
+                    continue
+                try:
+                    found[key] = self._deserialize(value)
+                except Exception as e:
+                    logger.warning(f"Dropping unreadable cache entry {key[:16]} from {self.table}: {e}")
+                    expired.append((key, size))
+            for key, size in expired:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._count -= 1
+                self._bytes -= size
+            if found:
+                self._conn.executemany(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", [(now, key) for key in found]
+                )
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set_many({key: value}, ttl=ttl)
+
+    def set_many(self, items: Mapping[str, Any], ttl: Optional[float] = None) -> None:
+        """Store several values in one transaction, then evict down to the size limits."""
+        if not items:
+            return
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl else None
+        rows = []
+        for key, value in items.items():
+            data = self._serialize(value)
+            rows.append((key, sqlite3.Binary(data), len(data), now, now, expires_at))
+        with self._lock, self._conn:
+            for row in rows:
+                previous = self._conn.execute(f"SELECT size FROM {self.table} WHERE key = ?", (row[0],)).fetchone()
+                if previous is None:
+                    self._count += 1
+                else:
+                    self._bytes -= previous[0]
+                self._bytes += row[2]
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, created_at, accessed_at, expires_at) "
+                f"VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            row = self._conn.execute(f"SELECT size FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._count -= 1
+                self._bytes -= row[0]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """Return every unexpired ``(key, value)`` pair without touching LRU order or counters."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, value FROM {self.table} WHERE expires_at IS NULL OR expires_at > ?", (time.time(),)
+            ).fetchall()
+        items = []
+        for key, value in rows:
+            try:
+                items.append((key, self._deserialize(value)))
+            except Exception:
+                continue
+        return items
+
+    def purge_expired(self) -> int:
+        with self._lock, self._conn:
+            return self._purge_expired(time.time())
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._count = 0
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": self._count,
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _purge_expired(self, now: float) -> int:
+        count, total = self._conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (now,),
+        ).fetchone()
+        if count:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            self._count -= count
+            self._bytes -= total
+        return int(count)
+
+    def _evict(self) -> None:
+        """Drop expired rows, then least recently used rows, until within limits. Caller holds the lock."""
+        if not self._over_limit():
+            return
+        self.evictions += self._purge_expired(time.time())
+        while self._over_limit():
+            rows = self._conn.execute(
+                f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if not self._over_limit():
+                    break
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._count -= 1
+                self._bytes -= size
+                self.evictions += 1
+
+    def _over_limit(self) -> bool:
+        return bool(
+            (self.max_entries and self._count > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        )
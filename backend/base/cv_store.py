@@ -0,0 +1,178 @@
+import os
+import re
+import asyncio
+import hashlib
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple, Union
+
+from omegaconf import DictConfig
+
+from base.cache import SQLiteCache
+from base.single_flight import default_single_flight
+from utils.config import ensure_config_dict
+from utils.preprocess import count_pdf_pages, extract_pdf_page_range
+
+logger = logging.getLogger(__name__)
+
+_FILE_ID_PATTERN = re.compile(r"[0-9a-f]{64}(\.pdf)?")
+
+
+class CVRejectedError(ValueError):
+    """Raised when an uploaded CV is refused (too large, or not a PDF)."""
+
+
+class CVStore:
+    """Content-addressed storage and text extraction for uploaded CVs.
+
+    Uploads are saved as ``<upload_dir>/<sha256>.pdf``, so re-uploading the
+    same file (under any name) is a no-op. Text is extracted page-parallel in a
+    process pool, capped at ``max_pages``, and cached by file hash in a
+    :class:`SQLiteCache`; a repeated CV skips parsing entirely. Concurrent
+    extractions of the same file share one run.
+    """
+
+    def __init__(
+        self,
+        upload_dir: str = "data/cv",
+        max_upload_bytes: Optional[int] = 20 * 1024 * 1024,
+        max_pages: Optional[int] = 30,
+        max_workers: int = 2,
+        pages_per_task: int = 4,
+        text_cache: Optional[SQLiteCache] = None,
+    ) -> None:
+        self.upload_dir = upload_dir
+        self.max_upload_bytes = int(max_upload_bytes) if max_upload_bytes else None
+        self.max_pages = int(max_pages) if max_pages else None
+        self.max_workers = max(1, int(max_workers))
+        self.pages_per_task = max(1, int(pages_per_task))
+        self.text_cache = text_cache
+        os.makedirs(upload_dir, exist_ok=True)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.uploads = 0
+        self.duplicate_uploads = 0
+        self.extractions = 0
+
+    @classmethod
+    def from_config(cls, config: Union[DictConfig, Dict[str, Any]]) -> "CVStore":
+        config = ensure_config_dict(config)
+        cv_config = config.get("cv", {}) or {}
+        text_cache = None
+        if cv_config.get("text_cache_enabled", True):
+            text_cache = SQLiteCache(
+                cv_config.get("text_cache_path", "data/cache/cv_text.sqlite3"),
+                table="cv_text",
+                ttl=cv_config.get("text_cache_ttl"),
+                max_entries=cv_config.get("text_cache_max_entries", 1000),
+            )
+        return cls(
+            upload_dir=cv_config.get("upload_dir", "data/cv"),
+            max_upload_bytes=cv_config.get("max_upload_bytes", 20 * 1024 * 1024),
+            max_pages=cv_config.get("max_pages", 30),
+            max_workers=cv_config.get("max_workers", 2),
+            pages_per_task=cv_config.get("pages_per_task", 4),
+            text_cache=text_cache,
+        )
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def start(self) -> None:
+        """Start the worker processes now rather than on the first upload.
+
+        Called at application startup, while the server has not spawned its
+        worker threads yet, so forked workers do not inherit their locks.
+        """
+        self._get_pool().submit(os.getpid).result()
+
+    def path_for(self, file_id: str) -> str:
+        return os.path.join(self.upload_dir, f"{file_id}.pdf")
+
+    def store(self, content: bytes) -> str:
+        """Save an uploaded PDF under its SHA-256 and return that hash as the file id."""
+        if self.max_upload_bytes and len(content) > self.max_upload_bytes:
+            raise CVRejectedError(f"CV exceeds the upload limit of {self.max_upload_bytes} bytes.")
+        if not content.startswith(b"%PDF-"):
+            raise CVRejectedError("Invalid file format. Please provide a PDF file.")
+        file_id = hashlib.sha256(content).hexdigest()
+        path = self.path_for(file_id)
+        if os.path.exists(path):
+            self.duplicate_uploads += 1
+            return file_id
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        self.uploads += 1
+        return file_id
+
+    def resolve(self, cv_path: str) -> Tuple[str, str]:
+        """Return ``(file_id, path)`` for a file id returned by :meth:`store` or a legacy file name in ``upload_dir``."""
+        name = os.path.basename(cv_path)
+        if _FILE_ID_PATTERN.fullmatch(name):
+            file_id = name[:64]
+            path = self.path_for(file_id)
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Unknown CV: {file_id}")
+            return file_id, path
+        path = os.path.join(self.upload_dir, name)
+        if not name.endswith(".pdf") or not os.path.exists(path):
+            raise FileNotFoundError(f"Unknown CV: {name}")
+        with open(path, "rb") as f:
+            file_id = hashlib.sha256(f.read()).hexdigest()
+        return file_id, path
+
+    async def _aextract(self, path: str) -> str:
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        num_pages = await loop.run_in_executor(pool, count_pdf_pages, path)
+        if self.max_pages is not None and num_pages > self.max_pages:
+            logger.info(f"Extracting the first {self.max_pages} of {num_pages} pages of {path}.")
+            num_pages = self.max_pages
+        ranges = [(start, min(start + self.pages_per_task, num_pages)) for start in range(0, num_pages, self.pages_per_task)]
+        chunks = await asyncio.gather(
+            *(loop.run_in_executor(pool, extract_pdf_page_range, path, start, stop) for start, stop in ranges)
+        )
+        self.extractions += 1
+        return "\n".join(text for chunk in chunks for text in chunk)
+
+    async def aextract_text(self, file_id: str, path: Optional[str] = None) -> str:
+        """Return the text of a stored CV, parsing it only if it is not cached yet."""
+        cache_key = f"{file_id}:{self.max_pages}"
+        if self.text_cache is not None:
+            text = await asyncio.to_thread(self.text_cache.get, cache_key)
+            if text is not None:
+                return text
+        text = await default_single_flight.ado(f"cv:{cache_key}", lambda: self._aextract(path or self.path_for(file_id)))
+        if self.text_cache is not None:
+            await asyncio.to_thread(self.text_cache.set, cache_key, text)
+        return text
+
+    async def aingest(self, content: bytes) -> Tuple[str, str]:
+        """Store an upload and return ``(file_id, text)``."""
+        file_id = await asyncio.to_thread(self.store, content)
+        return file_id, await self.aextract_text(file_id)
+
+    async def aload(self, cv_path: str) -> Tuple[str, str]:
+        """Return ``(file_id, text)`` for a previously uploaded CV."""
+        file_id, path = await asyncio.to_thread(self.resolve, cv_path)
+        return file_id, await self.aextract_text(file_id, path)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "uploads": self.uploads,
+            "duplicate_uploads": self.duplicate_uploads,
+            "extractions": self.extractions,
+            "text_cache": self.text_cache.stats() if self.text_cache is not None else None,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -1,5 +1,16 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from array import array
 from langchain_core.embeddings import Embeddings
-from typing import Optional
+from omegaconf import DictConfig
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from base.cache import SQLiteCache
+from utils.config import ensure_config_dict
+
+logger = logging.getLogger(__name__)
 
 
 class EmbedderFactory:
@@ -31,6 +42,146 @@ class EmbedderFactory:
                 raise ValueError(f"Unsupported model provider: {model_provider}")
 
 
+class LazyEmbeddings(Embeddings):
+    """Embeddings that build the wrapped model on first use.
+
+    Loading a local model takes seconds, so the application can start serving
+    before it is needed; :meth:`load` builds it ahead of time (e.g. from a
+    background warmup).
+    """
+
+    def __init__(self, factory: Callable[[], Embeddings]) -> None:
+        self._factory = factory
+        self._embedder: Optional[Embeddings] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._embedder is not None
+
+    def load(self) -> Embeddings:
+        if self._embedder is None:
+            with self._lock:
+                if self._embedder is None:
+                    self._embedder = self._factory()
+        return self._embedder
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.load().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.load().embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.load().aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.load().aembed_query(text)
+
+
+def _pack_vector(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack_vector(data: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(data)
+    return vector.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings backed by a persistent vector cache.
+
+    Vectors are stored as float32 blobs in a :class:`SQLiteCache`, keyed by
+    ``namespace`` (provider and model name) and the SHA-256 of the text. A batch
+    is looked up in one query and only the missing texts, each once, are sent
+    to the ``underlying`` model, so a chunk seen under another URL is never
+    re-encoded. Returned vectors always go through the float32 round trip, so
+    a text embeds identically whether or not it was cached. Queries and
+    documents are cached separately because some models embed them
+    differently.
+    """
+
+    def __init__(self, underlying: Embeddings, store: SQLiteCache, namespace: str) -> None:
+        self.underlying = underlying
+        self.store = store
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self.embedded = 0
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Union[DictConfig, Dict[str, Any]],
+        underlying: Embeddings,
+    ) -> Optional["CachedEmbeddings"]:
+        """Wrap ``underlying`` as configured in ``embedder.cache``, or return ``None`` when disabled."""
+        config = ensure_config_dict(config)
+        embedder_config = config.get("embedder", {}) or {}
+        cache_config = embedder_config.get("cache", {}) or {}
+        if not cache_config.get("enabled", True):
+            return None
+        store = SQLiteCache(
+            cache_config.get("db_path", "data/cache/embeddings.sqlite3"),
+            table="embeddings",
+            ttl=cache_config.get("ttl"),
+            max_entries=cache_config.get("max_entries", 200000),
+            max_bytes=cache_config.get("max_bytes", 512 * 1024 * 1024),
+            serializer=_pack_vector,
+            deserializer=_unpack_vector,
+        )
+        namespace = "{}:{}".format(
+            embedder_config.get("provider", "huggingface"),
+            embedder_config.get("model_name", "sentence-transformers/all-mpnet-base-v2"),
+        )
+        return cls(underlying, store, namespace)
+
+    def _key(self, kind: str, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    def _embed(self, kind: str, texts: List[str], embed: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        keys = [self._key(kind, text) for text in texts]
+        try:
+            vectors = self.store.get_many(keys)
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            vectors = {}
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        if missing:
+            computed = {key: _unpack_vector(_pack_vector(vector)) for key, vector in zip(missing, embed(list(missing.values())))}
+            with self._lock:
+                self.embedded += len(computed)
+            try:
+                self.store.set_many(computed)
+            except Exception as e:
+                logger.warning(f"Failed to cache embeddings: {e}")
+            vectors.update(computed)
+        return [vectors[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed("document", texts, self.underlying.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed("query", [text], lambda texts: [self.underlying.embed_query(texts[0])])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.to_thread(self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await asyncio.to_thread(self.embed_query, text)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            embedded = self.embedded
+        return {**self.store.stats(), "embedded": embedded}
+
+    def close(self) -> None:
+        self.store.close()
+
+
 if __name__ == "__main__":
     # Example usage
     embedder = EmbedderFactory.create(
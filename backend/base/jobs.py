@@ -0,0 +1,389 @@
+"""Background job execution for long-running generation requests.
+
+Jobs are persisted in a local SQLite table so their status, per-stage progress
+and results outlive the HTTP request that submitted them. A bounded pool of
+asyncio workers executes them in-process. Store calls run in worker threads;
+progress of a running job is kept in memory and written when its status
+changes.
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from omegaconf import DictConfig
+
+from utils.config import ensure_config_dict
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+ACTIVE_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED)
+
+ProgressReporter = Callable[[str, Any], None]
+JobHandler = Callable[[Dict[str, Any], ProgressReporter], Awaitable[Any]]
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when a job is submitted while the pending queue is at capacity."""
+
+
+class JobStore:
+    """SQLite-backed job table."""
+
+    def __init__(self, db_path: str = "data/jobs.sqlite3") -> None:
+        self.db_path = db_path
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    dedup_key TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dedup ON jobs (dedup_key, status)")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_progress (
+                    job_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    entry TEXT NOT NULL,
+                    PRIMARY KEY (job_id, seq)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def find_or_create(
+        self, kind: str, request: Dict[str, Any], dedup_key: str, max_age: float, max_pending: int
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Return ``(job, created)``: a reusable job with this key, else a newly queued one.
+
+        A job is reusable while queued or running, or for ``max_age`` seconds after it succeeds.
+        The lookup and the insert share one transaction, so identical concurrent submissions
+        coalesce onto a single job. Raises :class:`JobQueueFullError` when ``max_pending`` jobs
+        are already queued.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                """
+                SELECT * FROM jobs
+                WHERE dedup_key = ? AND (status IN (?, ?) OR (status = ? AND updated_at >= ?))
+                ORDER BY created_at DESC LIMIT 1
+                """,
+                (dedup_key, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, now - max_age),
+            ).fetchone()
+            if row is not None:
+                return self._row_to_dict(row), False
+            queued = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (JOB_QUEUED,)).fetchone()[0]
+            if queued >= max_pending:
+                raise JobQueueFullError(f"Job queue is full ({max_pending} pending).")
+            job_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, dedup_key, request, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, JOB_QUEUED, dedup_key, json.dumps(request, default=str), now, now),
+            )
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return self._row_to_dict(row), True
+
+    def get(self, job_id: str, include_request: bool = False) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return self._row_to_dict(row, include_request) if row else None
+
+    def list_active(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at", ACTIVE_STATUSES
+            ).fetchall()
+            return [self._row_to_dict(row, include_request=True) for row in rows]
+
+    def set_status(
+        self,
+        job_id: str,
+        status: str,
+        result: Any = None,
+        error: Optional[str] = None,
+        progress: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """Update a job's status; ``progress``, when given, is appended to its recorded progress."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result, default=str) if result is not None else None, error, time.time(), job_id),
+            )
+            if progress:
+                start = self._conn.execute(
+                    "SELECT COALESCE(MAX(seq) + 1, 0) FROM job_progress WHERE job_id = ?", (job_id,)
+                ).fetchone()[0]
+                self._conn.executemany(
+                    "INSERT INTO job_progress (job_id, seq, entry) VALUES (?, ?, ?)",
+                    [(job_id, start + i, json.dumps(entry, default=str)) for i, entry in enumerate(progress)],
+                )
+
+    def mark_running(self, job_id: str) -> None:
+        """Move a job to running, discarding progress recorded by an interrupted earlier attempt."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (JOB_RUNNING, time.time(), job_id))
+            self._conn.execute("DELETE FROM job_progress WHERE job_id = ?", (job_id,))
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs last updated more than ``older_than`` seconds ago."""
+        params = (*FINISHED_STATUSES, time.time() - older_than)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM job_progress WHERE job_id IN (SELECT id FROM jobs WHERE status IN (?, ?) AND updated_at < ?)",
+                params,
+            )
+            cursor = self._conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?", params)
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _row_to_dict(self, row: sqlite3.Row, include_request: bool = False) -> Dict[str, Any]:
+        # Called with ``_lock`` held.
+        entries = self._conn.execute(
+            "SELECT entry FROM job_progress WHERE job_id = ? ORDER BY seq", (row["id"],)
+        ).fetchall()
+        job = {
+            "job_id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "progress": [json.loads(entry["entry"]) for entry in entries],
+            "result": json.loads(row["result"]) if row["result"] is not None else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+        if include_request:
+            job["request"] = json.loads(row["request"])
+        return job
+
+
+class JobManager:
+    """Bounded in-process worker pool that executes persisted jobs.
+
+    Handlers are registered per job kind. Each receives the stored request dict
+    and a ``report(stage, data)`` callback that records progress and notifies
+    live subscribers. Identical submissions (same kind and canonical request)
+    are coalesced onto the active or recently succeeded job.
+
+    ``report`` never touches the database: a running job's progress lives in
+    memory (served by :meth:`get` and :meth:`subscribe`) and is written in one
+    batch with its final status.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        max_workers: int = 2,
+        max_pending: int = 100,
+        dedup_ttl: float = 3600.0,
+        retention: float = 7 * 24 * 3600.0,
+    ) -> None:
+        self.store = store
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = int(max_pending)
+        self.dedup_ttl = float(dedup_ttl)
+        self.retention = float(retention)
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._progress: Dict[str, List[Dict[str, Any]]] = {}
+        self._running = 0
+
+    @classmethod
+    def from_config(cls, config: Union[DictConfig, Dict[str, Any]]) -> "JobManager":
+        config = ensure_config_dict(config)
+        jobs_config = config.get("jobs", {}) or {}
+        store = JobStore(db_path=jobs_config.get("db_path", "data/jobs.sqlite3"))
+        return cls(
+            store=store,
+            max_workers=jobs_config.get("max_workers", 2),
+            max_pending=jobs_config.get("max_pending", 100),
+            dedup_ttl=jobs_config.get("dedup_ttl", 3600.0),
+            retention=jobs_config.get("retention", 7 * 24 * 3600.0),
+        )
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    async def start(self) -> None:
+        """Start the workers and requeue jobs left unfinished by a previous process."""
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue()
+        purged = await asyncio.to_thread(self.store.purge, self.retention)
+        if purged:
+            logger.info(f"Purged {purged} finished jobs past retention.")
+        for job in await asyncio.to_thread(self.store.list_active):
+            if job["kind"] not in self._handlers:
+                error = f"No handler registered for job kind '{job['kind']}'."
+                await asyncio.to_thread(self.store.set_status, job["job_id"], JOB_FAILED, error=error)
+                continue
+            await asyncio.to_thread(self.store.set_status, job["job_id"], JOB_QUEUED)
+            self._queue.put_nowait(job["job_id"])
+            logger.info(f"Requeued unfinished job {job['job_id']} ({job['kind']}).")
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.max_workers)]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def submit(self, kind: str, request: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Queue a job and return ``(job, created)``; ``created`` is False when deduplicated."""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if self._queue is None:
+            raise RuntimeError("JobManager is not started.")
+        dedup_key = self.dedup_key(kind, request)
+        job, created = await asyncio.to_thread(
+            self.store.find_or_create, kind, request, dedup_key, self.dedup_ttl, self.max_pending
+        )
+        if not created:
+            return self._with_live_progress(job), False
+        self._queue.put_nowait(job["job_id"])
+        return job, True
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = await asyncio.to_thread(self.store.get, job_id)
+        return self._with_live_progress(job) if job is not None else None
+
+    def _with_live_progress(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        live = self._progress.get(job["job_id"])
+        if live is not None:
+            job["progress"] = list(live)
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "workers": len(self._workers),
+        }
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Replay recorded progress, then yield live events until the job finishes."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(queue)
+        try:
+            # Snapshot in-memory progress together with subscribing, so no event is replayed twice or missed.
+            live = self._progress.get(job_id)
+            if live is not None:
+                replay = list(live)
+            else:
+                job = await asyncio.to_thread(self.store.get, job_id)
+                if job is None:
+                    return
+                if job["status"] in FINISHED_STATUSES:
+                    for entry in job["progress"]:
+                        yield {"event": "progress", "data": entry}
+                    yield self._final_event(job)
+                    return
+                # Queued: nothing recorded yet; everything from here on arrives through the queue.
+                replay = []
+            for entry in replay:
+                yield {"event": "progress", "data": entry}
+            while True:
+                event = await queue.get()
+                yield event
+                if event["event"] in ("done", "error"):
+                    return
+        finally:
+            subscribers = self._subscribers.get(job_id, [])
+            if queue in subscribers:
+                subscribers.remove(queue)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    @staticmethod
+    def dedup_key(kind: str, request: Dict[str, Any]) -> str:
+        canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(f"{kind}:{canonical}".encode("utf-8")).hexdigest()
+
+    async def _worker(self, worker_index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._running += 1
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Job worker {worker_index} failed on job {job_id}: {e}")
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = await asyncio.to_thread(self.store.get, job_id, True)
+        if job is None or job["status"] not in ACTIVE_STATUSES:
+            return
+        handler = self._handlers[job["kind"]]
+        progress: List[Dict[str, Any]] = []
+        self._progress[job_id] = progress
+        try:
+            await asyncio.to_thread(self.store.mark_running, job_id)
+            self._publish(job_id, {"event": "status", "data": {"status": JOB_RUNNING}})
+
+            def report(stage: str, data: Any = None) -> None:
+                entry = {"stage": stage, "data": data, "at": time.time()}
+                progress.append(entry)
+                self._publish(job_id, {"event": "progress", "data": entry})
+
+            try:
+                result = await handler(job["request"], report)
+            except asyncio.CancelledError:
+                # Leave the job queued so the next process start picks it up again; its progress is discarded then.
+                await asyncio.to_thread(self.store.set_status, job_id, JOB_QUEUED)
+                raise
+            except Exception as e:
+                logger.warning(f"Job {job_id} ({job['kind']}) failed: {e}")
+                await asyncio.to_thread(self.store.set_status, job_id, JOB_FAILED, None, str(e), progress)
+            else:
+                await asyncio.to_thread(self.store.set_status, job_id, JOB_SUCCEEDED, result, None, progress)
+            final = await asyncio.to_thread(self.store.get, job_id)
+        finally:
+            self._progress.pop(job_id, None)
+        self._publish(job_id, self._final_event(final))
+
+    def _publish(self, job_id: str, event: Dict[str, Any]) -> None:
+        for queue in self._subscribers.get(job_id, []):
+            queue.put_nowait(event)
+
+    @staticmethod
+    def _final_event(job: Dict[str, Any]) -> Dict[str, Any]:
+        if job["status"] == JOB_SUCCEEDED:
+            return {"event": "done", "data": {"status": job["status"], "result": job["result"]}}
+        return {"event": "error", "data": {"status": job["status"], "detail": job["error"]}}
@@ -0,0 +1,209 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+from omegaconf import DictConfig
+from langchain_core.language_models import BaseChatModel
+
+from base.llm_factory import LLMFactory
+from utils.config import ensure_config_dict
+
+logger = logging.getLogger(__name__)
+
+# Providers whose LangChain integrations are built on the OpenAI SDK and accept
+# injected ``http_client`` / ``http_async_client`` instances.
+HTTP_CLIENT_PROVIDERS = {"openai", "azure_openai", "deepseek"}
+
+# Providers whose chat models take a ``max_retries`` argument for their SDK's own retries.
+MAX_RETRIES_PROVIDERS = HTTP_CLIENT_PROVIDERS | {
+    "anthropic",
+    "mistralai",
+    "groq",
+    "together",
+    "fireworks",
+    "xai",
+    "google_genai",
+    "google_vertexai",
+}
+
+
+class LLMClientPool:
+    """Process-wide registry of chat model clients.
+
+    Clients are keyed by (provider, model, base_url, temperature, extra kwargs) so
+    every request asking for the same model reuses one client instead of calling
+    ``init_chat_model`` again. The registry is bounded (least recently used
+    entries are dropped first) and entries idle for longer than ``idle_timeout``
+    seconds are evicted. For OpenAI-compatible providers the clients also share
+    one keep-alive HTTP connection pool per base URL.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 8,
+        idle_timeout: float = 600.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        default_temperature: float = 0,
+        client_max_retries: Optional[int] = None,
+    ) -> None:
+        self.max_size = max(1, int(max_size))
+        self.idle_timeout = float(idle_timeout)
+        self.max_connections = int(max_connections)
+        self.max_keepalive_connections = int(max_keepalive_connections)
+        self.keepalive_expiry = float(keepalive_expiry)
+        self.default_temperature = default_temperature
+        # Retries are owned by the LLM scheduler; SDK-level retries would multiply them.
+        self.client_max_retries = client_max_retries
+        self._clients: "OrderedDict[Tuple, Tuple[BaseChatModel, float]]" = OrderedDict()
+        self._http_clients: Dict[Optional[str], Tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, config: Union[DictConfig, Dict[str, Any]]) -> "LLMClientPool":
+        config = ensure_config_dict(config)
+        llm_config = config.get("llm", {}) or {}
+        pool_config = llm_config.get("pool", {}) or {}
+        return cls(
+            max_size=pool_config.get("max_size", 8),
+            idle_timeout=pool_config.get("idle_timeout", 600.0),
+            max_connections=pool_config.get("max_connections", 100),
+            max_keepalive_connections=pool_config.get("max_keepalive_connections", 20),
+            keepalive_expiry=pool_config.get("keepalive_expiry", 30.0),
+            default_temperature=llm_config.get("temperature", 0) or 0,
+            client_max_retries=pool_config.get("client_max_retries"),
+        )
+
+    def get(
+        self,
+        model: Optional[str] = None,
+        model_provider: Optional[str] = None,
+        temperature: Optional[float] = None,
+        base_url: Optional[str] = None,
+        **kwargs: Any,
+    ) -> BaseChatModel:
+        """Return a pooled chat model, creating it on first use."""
+        if temperature is None:
+            temperature = self.default_temperature
+        key = self._make_key(model, model_provider, temperature, base_url, kwargs)
+        provider = (model_provider or "").lower()
+        create_kwargs = dict(kwargs)
+        with self._lock:
+            self._evict_idle(time.monotonic())
+            entry = self._clients.get(key)
+            if entry is not None:
+                self._clients[key] = (entry[0], time.monotonic())
+                self._clients.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            if provider in HTTP_CLIENT_PROVIDERS:
+                sync_client, async_client = self._get_http_clients(base_url)
+                create_kwargs.setdefault("http_client", sync_client)
+                create_kwargs.setdefault("http_async_client", async_client)
+        if self.client_max_retries is not None and provider in MAX_RETRIES_PROVIDERS:
+            create_kwargs.setdefault("max_retries", self.client_max_retries)
+        # Build outside the lock so a slow client construction does not block other lookups;
+        # a concurrent duplicate is harmless and the first one wins.
+        llm = LLMFactory.create(
+            model=model,
+            model_provider=model_provider,
+            temperature=temperature,
+            base_url=base_url,
+            **create_kwargs,
+        )
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None:
+                llm = entry[0]
+            self._clients[key] = (llm, time.monotonic())
+            self._clients.move_to_end(key)
+            while len(self._clients) > self.max_size:
+                evicted_key, _ = self._clients.popitem(last=False)
+                self.evictions += 1
+                logger.debug(f"Evicted LLM client {evicted_key[:3]} from the pool (size limit).")
+            if entry is None:
+                logger.info(f"Created pooled LLM client for {model_provider}/{model} (pool size: {len(self._clients)}).")
+        return llm
+
+    async def aping(self, base_url: str, timeout: float = 5.0) -> int:
+        """Send a GET to ``base_url`` through the shared async connection pool and return the status code.
+
+        Any HTTP response means the endpoint is reachable; the connection (and
+        its TLS session) then stays in the keep-alive pool for the first call.
+        """
+        with self._lock:
+            _, async_client = self._get_http_clients(base_url)
+        response = await async_client.get(base_url, timeout=timeout)
+        return response.status_code
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._clients),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "http_pools": len(self._http_clients),
+            }
+
+    def clear(self) -> None:
+        """Drop every pooled client and close the shared HTTP connection pools."""
+        with self._lock:
+            self._clients.clear()
+            http_clients = list(self._http_clients.values())
+            self._http_clients.clear()
+        for sync_client, _ in http_clients:
+            try:
+                sync_client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close pooled HTTP client: {e}")
+
+    async def aclose(self) -> None:
+        """Async variant of :meth:`clear` that also closes the async HTTP pools."""
+        with self._lock:
+            http_clients = list(self._http_clients.values())
+        self.clear()
+        for _, async_client in http_clients:
+            try:
+                await async_client.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close pooled async HTTP client: {e}")
+
+    @staticmethod
+    def _make_key(model, model_provider, temperature, base_url, kwargs: Dict[str, Any]) -> Tuple:
+        extra = tuple(sorted((k, repr(v)) for k, v in kwargs.items()))
+        return ((model_provider or "").lower(), model, base_url, float(temperature), extra)
+
+    def _evict_idle(self, now: float) -> None:
+        if self.idle_timeout <= 0:
+            return
+        expired = [key for key, (_, last_used) in self._clients.items() if now - last_used > self.idle_timeout]
+        for key in expired:
+            del self._clients[key]
+            self.evictions += 1
+            logger.debug(f"Evicted idle LLM client {key[:3]} from the pool.")
+
+    def _get_http_clients(self, base_url: Optional[str]) -> Tuple[Any, Any]:
+        clients = self._http_clients.get(base_url)
+        if clients is None:
+            import httpx
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            )
+            timeout = httpx.Timeout(600.0, connect=10.0)
+            clients = (
+                httpx.Client(limits=limits, timeout=timeout),
+                httpx.AsyncClient(limits=limits, timeout=timeout),
+            )
+            self._http_clients[base_url] = clients
+        return clients
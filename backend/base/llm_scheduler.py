@@ -0,0 +1,451 @@
+"""Process-wide admission control for LLM calls.
+
+Every :class:`~base.base_agent.BaseAgent` call goes through an
+:class:`LLMScheduler`, which keeps one :class:`ProviderLimiter` per
+(provider, model, base_url). A limiter combines
+
+- a token bucket bounding the request rate,
+- a concurrency cap adjusted with AIMD: it grows additively while calls
+  succeed within the latency target and shrinks multiplicatively on 429s,
+  timeouts or slow responses,
+- retries with full-jitter exponential backoff for transient failures.
+
+Fan-outs such as parallel knowledge drafting therefore share one view of each
+provider instead of each request firing its own burst.
+"""
+
+import time
+import random
+import asyncio
+import logging
+import threading
+import contextlib
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, TypeVar, Union
+
+from omegaconf import DictConfig
+
+from base.metrics import LLM_CALL_RETRIES
+from base.response_cache import model_identity
+from utils.config import ensure_config_dict
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+THROTTLED = "throttled"
+TRANSIENT = "transient"
+
+# Exception class names (matched anywhere in the MRO) of provider SDKs and
+# HTTP clients, so classification needs none of them installed.
+_THROTTLE_TYPES = {"RateLimitError", "APITimeoutError", "TimeoutException"}
+_TRANSIENT_TYPES = {
+    "APIConnectionError",
+    "InternalServerError",
+    "ServiceUnavailableError",
+    "OverloadedError",
+    "ConnectError",
+    "RemoteProtocolError",
+}
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """Return ``"throttled"`` (429 / timeout), ``"transient"`` (5xx / connection) or ``None`` (do not retry)."""
+    status = _status_code(error)
+    if status == 429:
+        return THROTTLED
+    if status is not None and status >= 500:
+        return TRANSIENT
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return THROTTLED
+    if isinstance(error, ConnectionError):
+        return TRANSIENT
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if names & _THROTTLE_TYPES:
+        return THROTTLED
+    if names & _TRANSIENT_TYPES:
+        return TRANSIENT
+    return None
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class _Waiter:
+    """A caller queued for admission; async waiters are woken through a future on their loop."""
+
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self.loop = loop
+        self.future: Optional[asyncio.Future] = loop.create_future() if loop is not None else None
+        self.granted = False
+
+    def signal(self) -> None:
+        # Sync waiters block on the limiter's condition, which the caller notifies.
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class ProviderLimiter:
+    """Rate limit, adaptive concurrency cap and retry policy for one provider/model.
+
+    Callers that cannot be admitted at once queue up and are admitted in FIFO
+    order: a finished call hands its slot straight to the head of the queue.
+    Only the head waits on a timer, and only while it waits for a token or for
+    a ``Retry-After`` pause to end.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float = 300.0,
+        burst: int = 20,
+        initial_concurrency: float = 8,
+        min_concurrency: float = 1,
+        max_concurrency: float = 32,
+        latency_target: float = 60.0,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+    ) -> None:
+        self.name = name
+        self.rate = max(float(requests_per_minute), 1e-3) / 60.0
+        self.burst = max(1, int(burst))
+        self.min_concurrency = max(1.0, float(min_concurrency))
+        self.max_concurrency = max(self.min_concurrency, float(max_concurrency))
+        self.limit = min(self.max_concurrency, max(self.min_concurrency, float(initial_concurrency)))
+        self.latency_target = float(latency_target)
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._waiters: "deque[_Waiter]" = deque()
+        # The queue head once it is found blocked, and how long it should sleep (None: until a release).
+        self._timed_head: Optional[_Waiter] = None
+        self._wake_in: Optional[float] = None
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+        self.throttled = 0
+        self.latency_ewma: Optional[float] = None
+
+    # -- admission -------------------------------------------------------
+
+    def _try_acquire(self) -> Optional[float]:
+        """Take a slot and a token if both are available. Caller holds the lock.
+
+        Returns ``0.0`` on success, the seconds until a token or the end of a
+        pause otherwise, or ``None`` when only a release can free a slot.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._in_flight >= int(self.limit):
+            return None
+        if self._tokens < 1:
+            return (1 - self._tokens) / self.rate
+        self._tokens -= 1
+        self._in_flight += 1
+        return 0.0
+
+    def _dispatch(self) -> None:
+        """Admit queued callers in order while capacity lasts. Caller holds the lock."""
+        changed = False
+        while self._waiters:
+            head = self._waiters[0]
+            wait = self._try_acquire()
+            if wait == 0.0:
+                self._waiters.popleft()
+                head.granted = True
+                head.signal()
+                changed = True
+                continue
+            self._wake_in = wait
+            if self._timed_head is not head:
+                # A new head: wake it so it starts waiting with the right timeout.
+                self._timed_head = head
+                head.signal()
+                changed = True
+            break
+        else:
+            self._timed_head = None
+        if changed:
+            self._cond.notify_all()
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """Withdraw a cancelled waiter, returning its slot if it was already admitted. Caller holds the lock."""
+        if waiter.granted:
+            self._in_flight -= 1
+            self._tokens = min(self.burst, self._tokens + 1)
+        else:
+            self._waiters.remove(waiter)
+            if self._timed_head is waiter:
+                self._timed_head = None
+        self._dispatch()
+
+    def acquire(self) -> None:
+        with self._cond:
+            if not self._waiters and self._try_acquire() == 0.0:
+                return
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+            self._dispatch()
+            while not waiter.granted:
+                self._cond.wait(timeout=self._wake_in if self._timed_head is waiter else None)
+                if not waiter.granted:
+                    self._dispatch()
+
+    async def aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if not self._waiters and self._try_acquire() == 0.0:
+                return
+            waiter = _Waiter(loop)
+            self._waiters.append(waiter)
+            self._dispatch()
+        try:
+            while True:
+                with self._cond:
+                    if waiter.granted:
+                        return
+                    timeout = self._wake_in if self._timed_head is waiter else None
+                    if waiter.future.done():
+                        waiter.future = loop.create_future()
+                    future = waiter.future
+                await asyncio.wait({future}, timeout=timeout)
+                with self._cond:
+                    if not waiter.granted:
+                        self._dispatch()
+        except BaseException:
+            with self._cond:
+                self._abandon(waiter)
+            raise
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._dispatch()
+
+    # -- AIMD feedback ---------------------------------------------------
+
+    def _decrease(self, factor: float) -> None:
+        # At most one multiplicative decrease per second so a burst of errors
+        # from calls started together counts as a single congestion signal.
+        now = time.monotonic()
+        if now - self._last_decrease >= 1.0:
+            self.limit = max(self.min_concurrency, self.limit * factor)
+            self._last_decrease = now
+
+    def on_success(self, latency: float) -> None:
+        with self._cond:
+            self.successes += 1
+            self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+            if latency > self.latency_target:
+                self._decrease(0.9)
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+            self._dispatch()
+
+    def on_failure(self, kind: Optional[str], retry_after: Optional[float] = None) -> None:
+        with self._cond:
+            if kind == THROTTLED:
+                self.throttled += 1
+                self._decrease(0.5)
+                # Drain the bucket so every caller backs off, not just this one.
+                self._tokens = 0.0
+                if retry_after:
+                    self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            elif kind == TRANSIENT:
+                self._decrease(0.75)
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(self.backoff_max, retry_after)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    # -- execution -------------------------------------------------------
+
+    def call(self, fn: Callable[[], T], label: Optional[str] = None) -> T:
+        attempt = 0
+        while True:
+            self.acquire()
+            started = time.monotonic()
+            try:
+                result = fn()
+            except Exception as e:
+                kind = classify_error(e)
+                self.on_failure(kind, _retry_after(e))
+                if kind is None or attempt >= self.max_retries:
+                    self.failures += 1
+                    raise
+                delay = self.backoff(attempt, e)
+                logger.warning(f"LLM call to {self.name} failed ({type(e).__name__}); retry {attempt + 1} in {delay:.1f}s.")
+            else:
+                self.on_success(time.monotonic() - started)
+                return result
+            finally:
+                self.release()
+            self.retries += 1
+            LLM_CALL_RETRIES.inc(agent=label or "", provider=self.name)
+            attempt += 1
+            time.sleep(delay)
+
+    async def acall(self, factory: Callable[[], Awaitable[T]], label: Optional[str] = None) -> T:
+        attempt = 0
+        while True:
+            await self.aacquire()
+            started = time.monotonic()
+            try:
+                result = await factory()
+            except Exception as e:
+                kind = classify_error(e)
+                self.on_failure(kind, _retry_after(e))
+                if kind is None or attempt >= self.max_retries:
+                    self.failures += 1
+                    raise
+                delay = self.backoff(attempt, e)
+                logger.warning(f"LLM call to {self.name} failed ({type(e).__name__}); retry {attempt + 1} in {delay:.1f}s.")
+            else:
+                self.on_success(time.monotonic() - started)
+                return result
+            finally:
+                self.release()
+            self.retries += 1
+            LLM_CALL_RETRIES.inc(agent=label or "", provider=self.name)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @contextlib.asynccontextmanager
+    async def aslot(self) -> AsyncIterator[None]:
+        """Hold one admission slot for a streamed call (no retries once output has started)."""
+        await self.aacquire()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.on_failure(classify_error(e), _retry_after(e))
+            self.failures += 1
+            raise
+        else:
+            self.on_success(time.monotonic() - started)
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiters),
+                "tokens": round(self._tokens, 2),
+                "successes": self.successes,
+                "failures": self.failures,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "latency_ewma": self.latency_ewma,
+            }
+
+
+class LLMScheduler:
+    """Registry of :class:`ProviderLimiter` instances keyed by provider, model and base URL.
+
+    ``overrides`` maps a model name to limiter settings that replace the
+    defaults for that model (e.g. a lower ``requests_per_minute`` for a
+    self-hosted endpoint).
+    """
+
+    def __init__(self, overrides: Optional[Dict[str, Dict[str, Any]]] = None, **defaults: Any) -> None:
+        self.defaults = defaults
+        self.overrides = dict(overrides or {})
+        self._limiters: Dict[Tuple[str, str, str], ProviderLimiter] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Union[DictConfig, Dict[str, Any]]) -> Optional["LLMScheduler"]:
+        """Build the scheduler from ``llm.scheduler``, or return ``None`` when disabled."""
+        config = ensure_config_dict(config)
+        scheduler_config = dict((config.get("llm", {}) or {}).get("scheduler", {}) or {})
+        if not scheduler_config.pop("enabled", True):
+            return None
+        overrides = scheduler_config.pop("overrides", None) or {}
+        return cls(overrides=overrides, **scheduler_config)
+
+    def limiter_for(self, model: Any) -> ProviderLimiter:
+        identity = model_identity(model)
+        key = (identity["class"], str(identity["model"]), identity["base_url"])
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(key)
+                if limiter is None:
+                    settings = {**self.defaults, **(self.overrides.get(str(identity["model"])) or {})}
+                    limiter = ProviderLimiter(f"{key[0]}/{key[1]}", **settings)
+                    self._limiters[key] = limiter
+        return limiter
+
+    def call(self, model: Any, fn: Callable[[], T], label: Optional[str] = None) -> T:
+        """Run ``fn`` under the limiter for ``model``; ``label`` (the agent name) tags retry metrics."""
+        return self.limiter_for(model).call(fn, label=label)
+
+    async def acall(self, model: Any, factory: Callable[[], Awaitable[T]], label: Optional[str] = None) -> T:
+        return await self.limiter_for(model).acall(factory, label=label)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return {limiter.name: limiter.stats() for limiter in limiters}
+
+
+_default_llm_scheduler: Optional[LLMScheduler] = None
+_default_llm_scheduler_loaded = False
+_default_llm_scheduler_lock = threading.Lock()
+
+
+def set_default_llm_scheduler(scheduler: Optional[LLMScheduler]) -> None:
+    """Register the scheduler that :class:`BaseAgent` routes calls through (``None`` disables it)."""
+    global _default_llm_scheduler, _default_llm_scheduler_loaded
+    with _default_llm_scheduler_lock:
+        _default_llm_scheduler = scheduler
+        _default_llm_scheduler_loaded = True
+
+
+def get_default_llm_scheduler() -> Optional[LLMScheduler]:
+    """Return the process-wide scheduler, building it from ``default_config`` on first use."""
+    global _default_llm_scheduler, _default_llm_scheduler_loaded
+    if _default_llm_scheduler_loaded:
+        return _default_llm_scheduler
+    with _default_llm_scheduler_lock:
+        if not _default_llm_scheduler_loaded:
+            from config import default_config
+            _default_llm_scheduler = LLMScheduler.from_config(default_config)
+            _default_llm_scheduler_loaded = True
+        return _default_llm_scheduler
@@ -0,0 +1,287 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+Metrics are kept in a :class:`MetricsRegistry` and rendered by the ``/metrics``
+endpoint; no client library or external service is involved. Values that
+other components already track (cache hit counts, scheduler state) are not
+duplicated. They are read from those components' ``stats()`` at scrape time
+through collectors registered with :meth:`MetricsRegistry.register_collector`.
+"""
+
+import math
+import time
+import logging
+import threading
+import contextlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# A collector yields (metric name, labels, value) samples, rendered as gauges.
+Sample = Tuple[str, Dict[str, Any], float]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, values: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._render_samples())
+        return lines
+
+    def _render_samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(key))} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        # Per label set: [per-bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            total[0] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the wall time of the ``with`` block, including when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        lines = []
+        for key, counts, total in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics plus scrape-time collectors, rendered as Prometheus text."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs: Any):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels.")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        collected: Dict[str, List[str]] = {}
+        for collector in collectors:
+            try:
+                for name, labels, value in collector():
+                    if value is None:
+                        continue
+                    collected.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        for name, samples in collected.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+default_registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = default_registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the last body chunk is sent, per route.",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = default_registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."
+)
+LLM_CALL_SECONDS = default_registry.histogram(
+    "llm_call_duration_seconds",
+    "Agent LLM call latency (including scheduler wait and retries), per agent class.",
+    ("agent", "mode"),
+)
+LLM_CALL_FAILURES = default_registry.counter(
+    "llm_call_failures_total", "Agent LLM calls that raised, per agent class and error type.", ("agent", "error")
+)
+LLM_CALL_RETRIES = default_registry.counter(
+    "llm_call_retries_total", "LLM call attempts retried by the scheduler.", ("agent", "provider")
+)
+LLM_TOKENS = default_registry.counter(
+    "llm_tokens_total", "Prompt and completion tokens per agent class (provider-reported or estimated).", ("agent", "direction")
+)
+SEARCH_RAG_STAGE_SECONDS = default_registry.histogram(
+    "search_rag_stage_duration_seconds",
+    "Search/RAG stage latency (search, fetch, split, embed, retrieve).",
+    ("stage",),
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording :data:`HTTP_REQUEST_SECONDS` and :data:`HTTP_REQUESTS_IN_FLIGHT`.
+
+    Timing stops when the final body chunk is sent, so streamed (SSE)
+    responses are measured end to end. Routes are labelled by their path
+    template (``/jobs/{job_id}``) to keep label cardinality bounded.
+    """
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = {"code": 500}
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope.get("method", ""),
+                route=getattr(route, "path", None) or "unmatched",
+                status=status["code"],
+            )
+
+
+def stats_samples(prefix: str, labels: Dict[str, Any], stats: Optional[Dict[str, Any]]) -> List[Sample]:
+    """Turn the numeric fields of a component's ``stats()`` dict into gauge samples.
+
+    A ``hit_ratio`` is derived from ``hits``/``misses`` when the component does
+    not report one.
+    """
+    if not stats:
+        return []
+    samples: List[Sample] = []
+    for key, value in stats.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        samples.append((f"{prefix}_{key}", labels, float(value)))
+    if "hit_ratio" not in stats and isinstance(stats.get("hits"), int) and isinstance(stats.get("misses"), int):
+        lookups = stats["hits"] + stats["misses"]
+        samples.append((f"{prefix}_hit_ratio", labels, stats["hits"] / lookups if lookups else 0.0))
+    return samples
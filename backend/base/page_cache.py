@@ -0,0 +1,152 @@
+import time
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from omegaconf import DictConfig
+from langchain_core.documents import Document
+
+from base.cache import SQLiteCache
+from utils.config import ensure_config_dict
+
+logger = logging.getLogger(__name__)
+
+_TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src"}
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL for cache keys: case of scheme/host, default ports, fragments and tracking parameters."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+class PageCache:
+    """Persistent cache of loaded web pages (extracted text and metadata).
+
+    Entries are keyed by loader type and canonical URL, so the ``web`` and
+    ``docling`` extractions of a page are cached separately. An entry younger
+    than ``fresh_ttl`` is used without touching the network. An older one is
+    revalidated with ``If-None-Match``/``If-Modified-Since`` when the server sent
+    validators: a ``304`` reuses the stored text, skipping download and
+    extraction, and a failed or late revalidation serves the stale text rather
+    than nothing. Entries are dropped after ``ttl`` and evicted least recently
+    used first beyond ``max_entries``/``max_bytes``.
+    """
+
+    def __init__(self, store: SQLiteCache, fresh_ttl: Optional[float] = 86400.0) -> None:
+        self.store = store
+        self.fresh_ttl = float(fresh_ttl) if fresh_ttl else 0.0
+        self._lock = threading.Lock()
+        self.fresh_hits = 0
+        self.revalidated = 0
+        self.refetched = 0
+        self.stale_served = 0
+
+    @classmethod
+    def from_config(cls, config: Union[DictConfig, Dict[str, Any]]) -> Optional["PageCache"]:
+        """Build the cache from ``search.page_cache``, or return ``None`` when disabled."""
+        config = ensure_config_dict(config)
+        cache_config = (config.get("search", {}) or {}).get("page_cache", {}) or {}
+        if not cache_config.get("enabled", True):
+            return None
+        store = SQLiteCache(
+            cache_config.get("db_path", "data/cache/pages.sqlite3"),
+            table="web_pages",
+            ttl=cache_config.get("ttl", 2592000),
+            max_entries=cache_config.get("max_entries", 20000),
+            max_bytes=cache_config.get("max_bytes", 512 * 1024 * 1024),
+        )
+        return cls(store, fresh_ttl=cache_config.get("fresh_ttl", 86400))
+
+    @staticmethod
+    def _key(url: str, loader_type: str) -> str:
+        return f"{loader_type}:{canonical_url(url)}"
+
+    @staticmethod
+    def _document(url: str, entry: Dict[str, Any]) -> Document:
+        return Document(page_content=entry["page_content"], metadata={**entry["metadata"], "source": url})
+
+    def lookup(self, urls: Iterable[str], loader_type: str) -> Tuple[Dict[str, Document], Dict[str, Dict[str, Any]]]:
+        """Split ``urls`` into fresh documents and stale entries that need revalidation.
+
+        Returns ``(documents, stale)``; URLs in neither must be fetched normally.
+        """
+        keys = {url: self._key(url, loader_type) for url in urls}
+        entries = self.store.get_many(set(keys.values()))
+        now = time.time()
+        documents: Dict[str, Document] = {}
+        stale: Dict[str, Dict[str, Any]] = {}
+        for url, key in keys.items():
+            entry = entries.get(key)
+            if entry is None:
+                continue
+            if now - entry["fetched_at"] < self.fresh_ttl:
+                documents[url] = self._document(url, entry)
+            else:
+                stale[url] = entry
+        with self._lock:
+            self.fresh_hits += len(documents)
+        return documents, stale
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def refresh(self, url: str, loader_type: str, entry: Dict[str, Any]) -> Document:
+        """Mark a stale entry as fresh again after a ``304 Not Modified``."""
+        entry = {**entry, "fetched_at": time.time()}
+        self.store.set(self._key(url, loader_type), entry)
+        with self._lock:
+            self.revalidated += 1
+        return self._document(url, entry)
+
+    def serve_stale(self, url: str, entry: Dict[str, Any]) -> Document:
+        """Return a stale entry as is, when its revalidation failed or did not finish in time."""
+        with self._lock:
+            self.stale_served += 1
+        return self._document(url, entry)
+
+    def put(self, url: str, loader_type: str, document: Document, headers: Dict[str, str], was_stale: bool = False) -> None:
+        entry = {
+            "page_content": document.page_content,
+            "metadata": {k: v for k, v in document.metadata.items() if k != "source"},
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "fetched_at": time.time(),
+        }
+        try:
+            self.store.set(self._key(url, loader_type), entry)
+        except Exception as e:
+            logger.warning(f"Failed to cache page {url}: {e}")
+            return
+        if was_stale:
+            with self._lock:
+                self.refetched += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                "fresh_hits": self.fresh_hits,
+                "revalidated": self.revalidated,
+                "refetched": self.refetched,
+                "stale_served": self.stale_served,
+            }
+        return {**self.store.stats(), **counters}
+
+    def close(self) -> None:
+        self.store.close()
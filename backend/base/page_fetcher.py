@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Union
+from urllib.parse import urlsplit
+
+from omegaconf import DictConfig
+
+from utils.config import ensure_config_dict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; GenMentor/1.0)"
+
+
+@dataclass
+class FetchedPage:
+    url: str
+    final_url: str
+    status_code: int
+    content: bytes = b""
+    content_type: str = ""
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+
+class PageFetcher:
+    """Concurrent page downloads over one shared keep-alive HTTP client.
+
+    The client and its connection pool live on a private event loop thread, so
+    synchronous callers (drafting threads) and async callers share it. At most
+    ``max_concurrency`` pages are downloaded at once and at most
+    ``per_host_concurrency`` per host. ``timeout`` bounds each page and
+    ``deadline`` bounds the whole batch: pages still loading at the deadline
+    are cancelled and left out, so one slow site cannot hold up a search.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        deadline: Optional[float] = 15.0,
+        max_concurrency: int = 16,
+        per_host_concurrency: int = 2,
+        max_bytes: Optional[int] = 5 * 1024 * 1024,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ) -> None:
+        self.timeout = float(timeout)
+        self.deadline = float(deadline) if deadline else None
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.per_host_concurrency = max(1, int(per_host_concurrency))
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self.user_agent = user_agent
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client = None
+        self._global_limit: Optional[asyncio.Semaphore] = None
+        # host -> [semaphore, pending requests]; dropped when no request for the host is pending.
+        self._host_limits: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+        self.fetched = 0
+        self.failed = 0
+        self.deadline_exceeded = 0
+        self.bytes = 0
+
+    @classmethod
+    def from_config(cls, config: Union[DictConfig, Dict[str, Any]]) -> "PageFetcher":
+        config = ensure_config_dict(config)
+        fetch_config = (config.get("search", {}) or {}).get("fetch", {}) or {}
+        return cls(
+            timeout=fetch_config.get("timeout", 10.0),
+            deadline=fetch_config.get("deadline", 15.0),
+            max_concurrency=fetch_config.get("max_concurrency", 16),
+            per_host_concurrency=fetch_config.get("per_host_concurrency", 2),
+            max_bytes=fetch_config.get("max_bytes", 5 * 1024 * 1024),
+            user_agent=fetch_config.get("user_agent") or DEFAULT_USER_AGENT,
+        )
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="page-fetcher", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def _get_client(self):
+        # Only called on the fetcher loop, so no locking is needed.
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                headers={"User-Agent": self.user_agent},
+                limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+                timeout=httpx.Timeout(self.timeout),
+            )
+            self._global_limit = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def _fetch_one(self, url: str, headers: Dict[str, str]) -> Optional[FetchedPage]:
+        client = self._get_client()
+        host = urlsplit(url).netloc.lower()
+        host_entry = self._host_limits.setdefault(host, [asyncio.Semaphore(self.per_host_concurrency), 0])
+        host_entry[1] += 1
+        try:
+            async with self._global_limit, host_entry[0]:
+                # The per-page timeout covers the whole download, not each socket read.
+                async with asyncio.timeout(self.timeout):
+                    async with client.stream("GET", url, headers=headers) as response:
+                        if response.status_code >= 400:
+                            raise ValueError(f"HTTP {response.status_code}")
+                        chunks: List[bytes] = []
+                        size = 0
+                        async for chunk in response.aiter_bytes():
+                            chunks.append(chunk)
+                            size += len(chunk)
+                            if self.max_bytes is not None and size >= self.max_bytes:
+                                logger.info(f"Truncated {url} at {self.max_bytes} bytes.")
+                                break
+                        page = FetchedPage(
+                            url=url,
+                            final_url=str(response.url),
+                            status_code=response.status_code,
+                            content=b"".join(chunks),
+                            content_type=response.headers.get("content-type", ""),
+                            headers=dict(response.headers),
+                        )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"Failed to fetch {url}: {type(e).__name__}: {e}")
+            return None
+        finally:
+            host_entry[1] -= 1
+            if host_entry[1] == 0:
+                self._host_limits.pop(host, None)
+        self.fetched += 1
+        self.bytes += len(page.content)
+        return page
+
+    async def _fetch_all(self, urls: List[str], headers: Dict[str, Dict[str, str]]) -> Dict[str, FetchedPage]:
+        if not urls:
+            return {}
+        tasks = {url: asyncio.ensure_future(self._fetch_one(url, headers.get(url, {}))) for url in urls}
+        _, pending = await asyncio.wait(tasks.values(), timeout=self.deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.deadline_exceeded += len(pending)
+            logger.info(f"Fetch deadline of {self.deadline}s reached; dropping {len(pending)} of {len(urls)} pages.")
+        return {url: task.result() for url, task in tasks.items() if task.done() and not task.cancelled() and task.result() is not None}
+
+    def _submit(self, urls: Iterable[str], headers: Optional[Dict[str, Dict[str, str]]]):
+        unique_urls = list(dict.fromkeys(url for url in urls if url))
+        return asyncio.run_coroutine_threadsafe(self._fetch_all(unique_urls, headers or {}), self._ensure_loop())
+
+    def fetch(self, urls: Iterable[str], headers: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, FetchedPage]:
+        """Download ``urls`` concurrently and return the pages that arrived, keyed by requested URL.
+
+        ``headers`` adds per-URL request headers (e.g. conditional request headers).
+        """
+        return self._submit(urls, headers).result()
+
+    async def afetch(self, urls: Iterable[str], headers: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, FetchedPage]:
+        """Async variant of :meth:`fetch`; the caller's event loop only awaits the result."""
+        return await asyncio.wrap_future(self._submit(urls, headers))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "fetched": self.fetched,
+            "failed": self.failed,
+            "deadline_exceeded": self.deadline_exceeded,
+            "bytes": self.bytes,
+            "active_hosts": len(self._host_limits),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+        if loop is None:
+            return
+        if self._client is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result(timeout=5)
+            except Exception as e:
+                logger.warning(f"Failed to close the page fetcher client: {e}")
+            self._client = None
+        self._global_limit = None
+        self._host_limits = {}
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
+_default_page_fetcher: Optional[PageFetcher] = None
+_default_page_fetcher_lock = threading.Lock()
+
+
+def set_default_page_fetcher(fetcher: Optional[PageFetcher]) -> None:
+    """Register the page fetcher that search runners use when none is injected."""
+    global _default_page_fetcher
+    with _default_page_fetcher_lock:
+        _default_page_fetcher = fetcher
+
+
+def get_default_page_fetcher() -> PageFetcher:
+    """Return the process-wide page fetcher, building it from ``default_config`` on first use."""
+    global _default_page_fetcher
+    if _default_page_fetcher is not None:
+        return _default_page_fetcher
+    with _default_page_fetcher_lock:
+        if _default_page_fetcher is None:
+            from config import default_config
+            _default_page_fetcher = PageFetcher.from_config(default_config)
+        return _default_page_fetcher
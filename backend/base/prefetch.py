@@ -0,0 +1,226 @@
+import time
+import json
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Sequence, Set, Tuple, Union
+
+from omegaconf import DictConfig
+
+from utils.config import ensure_config_dict
+
+logger = logging.getLogger(__name__)
+
+# Profile fields that shape generated content. Progress counters and behavioural
+# notes change after every session but do not warrant regenerating documents.
+DEFAULT_MATERIAL_FIELDS = (
+    "learning_goal",
+    "learner_information",
+    "cognitive_status.mastered_skills",
+    "cognitive_status.in_progress_skills",
+    "learning_preferences",
+)
+
+# Session fields that identify the content of a session (``if_learned`` is excluded).
+SESSION_KEY_FIELDS = ("id", "title", "abstract", "associated_skills", "desired_outcome_when_completed")
+
+PREFETCH_CACHED = "cached"
+PREFETCH_RUNNING = "running"
+PREFETCH_SCHEDULED = "scheduled"
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _lookup(data: Any, dotted: str) -> Any:
+    for part in dotted.split("."):
+        if not isinstance(data, Mapping):
+            return None
+        data = data.get(part)
+    return data
+
+
+class ContentPrefetcher:
+    """Speculatively generate learning content and keep the results in memory.
+
+    Entries are keyed by the *material* fingerprint of the learner profile, the
+    session and the generation options. Content generated for one profile is
+    therefore never served for a materially different one, and
+    :meth:`invalidate_profile` drops (and cancels) everything produced for a
+    profile that has since changed. Only :meth:`schedule` fills the cache;
+    :meth:`invalidate` drops a single entry when the learner asks to
+    regenerate it. Prefetches run in the background, at most
+    ``max_concurrent`` at a time, so they stay a low-priority trickle next to
+    interactive requests. The cache is bounded by ``max_entries`` (least
+    recently used first) and ``ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 64,
+        ttl: float = 3600.0,
+        max_concurrent: int = 1,
+        material_fields: Sequence[str] = DEFAULT_MATERIAL_FIELDS,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl)
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.material_fields = tuple(material_fields)
+        self._entries: "OrderedDict[str, Tuple[str, Any, float]]" = OrderedDict()
+        self._tasks: Dict[str, Tuple[str, asyncio.Task]] = {}
+        # Keys whose prefetch got past the concurrency limit and is generating.
+        self._started: Set[str] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_config(cls, config: Union[DictConfig, Dict[str, Any]]) -> "ContentPrefetcher":
+        config = ensure_config_dict(config)
+        prefetch_config = config.get("prefetch", {}) or {}
+        return cls(
+            max_entries=prefetch_config.get("max_entries", 64),
+            ttl=prefetch_config.get("ttl", 3600.0),
+            max_concurrent=prefetch_config.get("max_concurrent", 1),
+            material_fields=prefetch_config.get("material_fields") or DEFAULT_MATERIAL_FIELDS,
+        )
+
+    def profile_fingerprint(self, learner_profile: Any) -> str:
+        """Hash of the profile fields that affect generated content."""
+        if isinstance(learner_profile, Mapping):
+            material = {field: _lookup(learner_profile, field) for field in self.material_fields}
+        else:
+            material = learner_profile
+        return hashlib.sha256(_canonical(material).encode("utf-8")).hexdigest()
+
+    def make_key(self, learner_profile: Any, learning_session: Any, options: Optional[Mapping[str, Any]] = None) -> str:
+        if isinstance(learning_session, Mapping):
+            session = {field: learning_session.get(field) for field in SESSION_KEY_FIELDS}
+        else:
+            session = learning_session
+        payload = [self.profile_fingerprint(learner_profile), session, dict(options or {})]
+        return hashlib.sha256(_canonical(payload).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached result, or ``None`` if absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        fingerprint, value, created_at = entry
+        if self.ttl > 0 and time.time() - created_at > self.ttl:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Like :meth:`get`, but waits for a prefetch of ``key`` that is already generating.
+
+        A prefetch still queued behind other prefetches could take several
+        generations to start, so it counts as a miss and is cancelled: the
+        caller is about to generate the content itself.
+        """
+        pending = self._tasks.get(key)
+        if pending is not None and key not in self._started:
+            self._tasks.pop(key)
+            pending[1].cancel()
+            logger.info(f"Prefetch {key[:12]} was still queued; cancelled in favour of an interactive request.")
+        elif pending is not None:
+            task = pending[1]
+            try:
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # An invalidated prefetch is just a miss; re-raise only if we were cancelled.
+                if not task.cancelled():
+                    raise
+        return self.get(key)
+
+    def put(self, key: str, fingerprint: str, value: Any) -> None:
+        self._entries[key] = (fingerprint, value, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def schedule(self, key: str, fingerprint: str, factory: Callable[[], Awaitable[Any]]) -> str:
+        """Start generating ``key`` in the background unless it is cached or already running."""
+        if key in self._entries:
+            return PREFETCH_CACHED
+        if key in self._tasks:
+            return PREFETCH_RUNNING
+        task = asyncio.ensure_future(self._run(key, fingerprint, factory))
+        self._tasks[key] = (fingerprint, task)
+        return PREFETCH_SCHEDULED
+
+    async def _run(self, key: str, fingerprint: str, factory: Callable[[], Awaitable[Any]]) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        try:
+            async with self._semaphore:
+                if self._tasks.get(key, (None, None))[1] is asyncio.current_task():
+                    self._started.add(key)
+                started = time.perf_counter()
+                value = await factory()
+                self.put(key, fingerprint, value)
+                logger.info(f"Prefetched learning content {key[:12]} in {time.perf_counter() - started:.1f}s.")
+        except asyncio.CancelledError:
+            logger.info(f"Prefetch {key[:12]} cancelled.")
+            raise
+        except Exception as e:
+            logger.warning(f"Prefetch {key[:12]} failed: {e}")
+        finally:
+            if self._tasks.get(key, (None, None))[1] is asyncio.current_task():
+                self._tasks.pop(key)
+                self._started.discard(key)
+
+    def invalidate(self, key: str) -> int:
+        """Drop the cached entry for ``key`` and cancel its running prefetch, e.g. on an explicit regenerate."""
+        count = int(self._entries.pop(key, None) is not None)
+        # Pop here: a task cancelled before it starts never reaches its ``finally``.
+        pending = self._tasks.pop(key, None)
+        self._started.discard(key)
+        if pending is not None:
+            pending[1].cancel()
+            count += 1
+        self.invalidations += count
+        return count
+
+    def invalidate_profile(self, fingerprint: str) -> int:
+        """Drop cached entries and cancel running prefetches produced for ``fingerprint``."""
+        stale = [key for key, entry in self._entries.items() if entry[0] == fingerprint]
+        for key in stale:
+            del self._entries[key]
+        running = [key for key, (fp, _) in self._tasks.items() if fp == fingerprint]
+        for key in running:
+            self._tasks.pop(key)[1].cancel()
+            self._started.discard(key)
+        count = len(stale) + len(running)
+        self.invalidations += count
+        if count:
+            logger.info(f"Invalidated {count} prefetched entries after a learner profile change.")
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "running": len(self._started),
+            "queued": len(self._tasks) - len(self._started),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+    async def aclose(self) -> None:
+        tasks = [task for _, task in self._tasks.values()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._entries.clear()
+        self._started.clear()
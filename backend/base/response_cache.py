@@ -0,0 +1,136 @@
+import json
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional, Union
+
+from omegaconf import DictConfig
+
+from base.cache import SQLiteCache
+from utils.config import ensure_config_dict
+
+logger = logging.getLogger(__name__)
+
+
+def model_identity(model: Any) -> Dict[str, Any]:
+    """Describe a chat model by the settings that determine its output."""
+    return {
+        "class": type(model).__name__,
+        "model": getattr(model, "model_name", None) or getattr(model, "model", None),
+        "base_url": str(getattr(model, "openai_api_base", None) or getattr(model, "base_url", None) or ""),
+        "temperature": getattr(model, "temperature", None),
+    }
+
+
+class AgentResponseCache:
+    """Content-addressed cache of post-processed agent outputs.
+
+    Keys are a SHA-256 over the canonical JSON of the model identity, system
+    prompt, task prompt, prompt variables and output options, so any change to
+    one of them is a different entry. Values live in a :class:`SQLiteCache`
+    and outlive the process. Only calls made at temperature 0 are cached unless
+    ``require_zero_temperature`` is disabled; agents listed in ``exclude_agents``
+    are never cached. Hits and misses are counted per agent.
+    """
+
+    def __init__(
+        self,
+        store: SQLiteCache,
+        require_zero_temperature: bool = True,
+        exclude_agents: Iterable[str] = (),
+    ) -> None:
+        self.store = store
+        self.require_zero_temperature = require_zero_temperature
+        self.exclude_agents = set(exclude_agents or ())
+        self._agent_counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Union[DictConfig, Dict[str, Any]]) -> Optional["AgentResponseCache"]:
+        """Build the cache from the ``response_cache`` section, or return ``None`` when disabled."""
+        config = ensure_config_dict(config)
+        cache_config = config.get("response_cache", {}) or {}
+        if not cache_config.get("enabled", False):
+            return None
+        store = SQLiteCache(
+            cache_config.get("db_path", "data/cache/responses.sqlite3"),
+            table="agent_responses",
+            ttl=cache_config.get("ttl", 604800),
+            max_entries=cache_config.get("max_entries", 10000),
+        )
+        return cls(
+            store,
+            require_zero_temperature=cache_config.get("require_zero_temperature", True),
+            exclude_agents=cache_config.get("exclude_agents") or (),
+        )
+
+    def accepts(self, agent_name: str, model: Any) -> bool:
+        if agent_name in self.exclude_agents:
+            return False
+        if self.require_zero_temperature and getattr(model, "temperature", None) not in (0, 0.0):
+            return False
+        return True
+
+    @staticmethod
+    def make_key(model: Any, system_prompt: Optional[str], task_prompt: Optional[str], variables: Dict[str, Any], **options: Any) -> str:
+        payload = {
+            "model": model_identity(model),
+            "system_prompt": system_prompt,
+            "task_prompt": task_prompt,
+            "variables": variables,
+            "options": options,
+        }
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, agent_name: str, key: str) -> Optional[Any]:
+        value = self.store.get(key)
+        with self._lock:
+            self._agent_counters[agent_name]["hits" if value is not None else "misses"] += 1
+        if value is not None:
+            logger.debug(f"Response cache hit for {agent_name} ({key[:12]}).")
+        return value
+
+    def set(self, agent_name: str, key: str, value: Any) -> None:
+        if value is None:
+            return
+        try:
+            self.store.set(key, value)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Not caching {agent_name} output: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_agent = {name: dict(counters) for name, counters in self._agent_counters.items()}
+        return {**self.store.stats(), "by_agent": by_agent}
+
+
+_default_response_cache: Optional[AgentResponseCache] = None
+_default_response_cache_loaded = False
+_default_response_cache_lock = threading.Lock()
+
+
+def set_default_response_cache(cache: Optional[AgentResponseCache]) -> None:
+    """Register the response cache that :class:`BaseAgent` consults (``None`` disables caching)."""
+    global _default_response_cache, _default_response_cache_loaded
+    with _default_response_cache_lock:
+        _default_response_cache = cache
+        _default_response_cache_loaded = True
+
+
+def get_default_response_cache() -> Optional[AgentResponseCache]:
+    """Return the process-wide response cache, building it from ``default_config`` on first use."""
+    global _default_response_cache, _default_response_cache_loaded
+    if _default_response_cache_loaded:
+        return _default_response_cache
+    with _default_response_cache_lock:
+        if not _default_response_cache_loaded:
+            from config import default_config
+            try:
+                _default_response_cache = AgentResponseCache.from_config(default_config)
+            except Exception as e:
+                logger.warning(f"Response cache disabled: {e}")
+                _default_response_cache = None
+            _default_response_cache_loaded = True
+        return _default_response_cache
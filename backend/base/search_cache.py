@@ -0,0 +1,71 @@
+import json
+import hashlib
+import logging
+import unicodedata
+from typing import Any, Dict, List, Optional, Union
+
+from omegaconf import DictConfig
+
+from base.cache import SQLiteCache
+from utils.config import ensure_config_dict
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Fold a search query to the form used in cache keys: NFKC, case-folded, single spaces."""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+class SearchResultCache:
+    """Persistent cache of raw search provider results.
+
+    Keyed by provider, ``max_results`` and the normalized query, so the same
+    ``"<session> <knowledge point>"`` query from different learners costs one
+    provider round-trip per ``ttl``. Result lists without any link (provider
+    errors, "no results" placeholders) are not cached.
+    """
+
+    def __init__(self, store: SQLiteCache) -> None:
+        self.store = store
+
+    @classmethod
+    def from_config(cls, config: Union[DictConfig, Dict[str, Any]]) -> Optional["SearchResultCache"]:
+        """Build the cache from ``search.result_cache``, or return ``None`` when disabled."""
+        config = ensure_config_dict(config)
+        cache_config = (config.get("search", {}) or {}).get("result_cache", {}) or {}
+        if not cache_config.get("enabled", True):
+            return None
+        store = SQLiteCache(
+            cache_config.get("db_path", "data/cache/search_results.sqlite3"),
+            table="search_results",
+            ttl=cache_config.get("ttl", 86400),
+            max_entries=cache_config.get("max_entries", 50000),
+        )
+        return cls(store)
+
+    @staticmethod
+    def make_key(provider: str, query: str, max_results: int) -> str:
+        payload = json.dumps([provider, int(max_results), normalize_query(query)], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, provider: str, query: str, max_results: int) -> Optional[List[Dict[str, Any]]]:
+        try:
+            return self.store.get(self.make_key(provider, query, max_results))
+        except Exception as e:
+            logger.warning(f"Search result cache lookup failed: {e}")
+            return None
+
+    def set(self, provider: str, query: str, max_results: int, results: List[Dict[str, Any]]) -> None:
+        if not any(isinstance(item, dict) and item.get("link") for item in results):
+            return
+        try:
+            self.store.set(self.make_key(provider, query, max_results), results)
+        except Exception as e:
+            logger.warning(f"Failed to cache search results: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return self.store.stats()
+
+    def close(self) -> None:
+        self.store.close()
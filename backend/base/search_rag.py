@@ -1,6 +1,9 @@
 import os
+import asyncio
+import hashlib
 import logging
-from typing import List, Optional, Dict, Any, Union
+import threading
+from typing import Callable, List, Optional, Dict, Any, Union
 from omegaconf import DictConfig
 
 from langchain_core.documents import Document
@@ -9,14 +12,27 @@ from langchain_core.vectorstores import VectorStore
 from langchain_text_splitters.base import TextSplitter
 
 from base.dataclass import SearchResult
-from base.embedder_factory import EmbedderFactory
+from base.embedder_factory import CachedEmbeddings, EmbedderFactory, LazyEmbeddings
 from base.searcher_factory import SearcherFactory, SearchRunner
 from base.rag_factory import TextSplitterFactory, VectorStoreFactory
+from base.metrics import SEARCH_RAG_STAGE_SECONDS
+from base.page_cache import canonical_url
+from base.single_flight import coalesce
+from base.tracing import span
 from utils.config import ensure_config_dict
 
 logger = logging.getLogger(__name__)
 
 
+def chunk_id(document: Document) -> str:
+    """Deterministic vectorstore id of a chunk: its source URL plus the hash of its text."""
+    source = str((document.metadata or {}).get("source", ""))
+    if source.startswith(("http://", "https://")):
+        source = canonical_url(source)
+    content_hash = hashlib.sha256(document.page_content.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{source}\n{content_hash}".encode("utf-8")).hexdigest()
+
+
 class SearchRagManager:
 
     def __init__(
@@ -26,22 +42,46 @@ class SearchRagManager:
         vectorstore: Optional[VectorStore] = None,
         search_runner: Optional[SearchRunner] = None,
         max_retrieval_results: int = 5,
+        vectorstore_factory: Optional[Callable[[], VectorStore]] = None,
     ):
         self.embedder = embedder
         self.text_splitter = text_splitter
-        self.vectorstore = vectorstore
+        self._vectorstore = vectorstore
+        self._vectorstore_factory = vectorstore_factory
+        self._vectorstore_lock = threading.Lock()
         self.search_runner = search_runner
         self.max_retrieval_results = max_retrieval_results
+        self._stats_lock = threading.Lock()
+        self.chunks_seen = 0
+        self.chunks_added = 0
+        self.chunks_skipped = 0
+
+    @property
+    def vectorstore(self) -> Optional[VectorStore]:
+        """The vectorstore, opened by ``vectorstore_factory`` on first access when one was given."""
+        if self._vectorstore is None and self._vectorstore_factory is not None:
+            with self._vectorstore_lock:
+                if self._vectorstore is None:
+                    self._vectorstore = self._vectorstore_factory()
+        return self._vectorstore
+
+    @vectorstore.setter
+    def vectorstore(self, vectorstore: Optional[VectorStore]) -> None:
+        self._vectorstore = vectorstore
 
     @staticmethod
     def from_config(
         config: Union[DictConfig, Dict[str, Any]],
     ) -> "SearchRagManager":
         config = ensure_config_dict(config)
-        embedder = EmbedderFactory.create(
+        # The embedding model and the vectorstore are only built on first use
+        # (or by the startup warmup), which keeps them off the import path.
+        embedder = LazyEmbeddings(lambda: EmbedderFactory.create(
             model=config.get("embedder", {}).get("model_name", "sentence-transformers/all-mpnet-base-v2"),
             model_provider=config.get("embedder", {}).get("provider", "huggingface"),
-        )
+        ))
+        # Outside the lazy wrapper, so texts that are all cached never load the model.
+        embedder = CachedEmbeddings.from_config(config, embedder) or embedder
 
         text_splitter = TextSplitterFactory.create(
             splitter_type=config.get("rag", {}).get("text_splitter_type", "recursive_character"),
@@ -49,7 +89,7 @@ class SearchRagManager:
             chunk_overlap=config.get("rag", {}).get("chunk_overlap", 0),
         )
 
-        vectorstore = VectorStoreFactory.create(
+        vectorstore_factory = lambda: VectorStoreFactory.create(
             vectorstore_type=config.get("vectorstore", {}).get("type", "chroma"),
             collection_name=config.get("vectorstore", {}).get("collection_name", "default_collection"),
             persist_directory=config.get("vectorstore", {}).get("persist_directory", "./data/vectorstore"),
@@ -63,7 +103,7 @@ class SearchRagManager:
         return SearchRagManager(
             embedder=embedder,
             text_splitter=text_splitter,
-            vectorstore=vectorstore,
+            vectorstore_factory=vectorstore_factory,
             search_runner=search_runner,
             max_retrieval_results=config.get("rag", {}).get("num_retrieval_results", 5),
         )
@@ -75,35 +115,138 @@ class SearchRagManager:
         results = self.search_runner.invoke(query)
         return results
 
-    def add_documents(self, documents: List[Document]) -> None:
+    async def asearch(self, query: str) -> List[SearchResult]:
+        if not self.search_runner:
+            raise ValueError("SearcherRunner is not initialized.")
+        return await self.search_runner.ainvoke(query)
+
+    def _existing_ids(self, ids: List[str]) -> set:
+        try:
+            return {doc.id for doc in self.vectorstore.get_by_ids(ids)}
+        except NotImplementedError:
+            # Ids still make the write an upsert; only the embedding work is not saved.
+            return set()
+
+    def add_documents(self, documents: List[Document], upsert: bool = False) -> None:
+        """Split, embed and store ``documents`` under content-hash chunk ids.
+
+        Chunks already in the vectorstore are skipped before embedding unless
+        ``upsert`` is set, in which case they are embedded and overwritten.
+        """
         if len(documents) == 0:
             logger.warning("No documents to add to the vectorstore.")
             return
         if not self.vectorstore:
             raise ValueError("VectorStore is not initialized.")
         documents = [doc for doc in documents if len(doc.page_content.strip()) > 0]
-        if self.text_splitter:
-            split_docs = self.text_splitter.split_documents(documents)
-        else:
-            split_docs = documents
-        self.vectorstore.add_documents(split_docs, embedding_function=self.embedder)
-        logger.info(f"Added {len(split_docs)} documents to the vectorstore.")
+        with span("add_documents", documents=len(documents)) as current:
+            if self.text_splitter:
+                with SEARCH_RAG_STAGE_SECONDS.time(stage="split"), span("split"):
+                    split_docs = self.text_splitter.split_documents(documents)
+            else:
+                split_docs = documents
+            chunks = {chunk_id(doc): doc for doc in split_docs}
+            existing = set() if upsert or not chunks else self._existing_ids(list(chunks))
+            new_chunks = {id_: doc for id_, doc in chunks.items() if id_ not in existing}
+            if current is not None:
+                current.set(chunks=len(split_docs), new=len(new_chunks))
+            if new_chunks:
+                # Chroma embeds the chunks inside add_documents, so this covers embedding and the write.
+                with SEARCH_RAG_STAGE_SECONDS.time(stage="embed"), span("embed", chunks=len(new_chunks)):
+                    self.vectorstore.add_documents(
+                        list(new_chunks.values()), ids=list(new_chunks), embedding_function=self.embedder
+                    )
+        with self._stats_lock:
+            self.chunks_seen += len(split_docs)
+            self.chunks_added += len(new_chunks)
+            self.chunks_skipped += len(split_docs) - len(new_chunks)
+        logger.info(f"Added {len(new_chunks)} of {len(split_docs)} chunks to the vectorstore.")
+
+    def upsert_documents(self, documents: List[Document]) -> None:
+        """Re-embed and overwrite ``documents``' chunks, e.g. after a page changed."""
+        self.add_documents(documents, upsert=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            seen, added, skipped = self.chunks_seen, self.chunks_added, self.chunks_skipped
+        return {
+            "chunks_seen": seen,
+            "chunks_added": added,
+            "chunks_skipped": skipped,
+            "dedup_ratio": skipped / seen if seen else 0.0,
+        }
+
+    async def aadd_documents(self, documents: List[Document]) -> None:
+        # Splitting, embedding and the Chroma write are CPU/disk bound; keep them off the event loop.
+        await asyncio.to_thread(self.add_documents, documents)
 
     def retrieve(self, query: str, k: Optional[int] = None) -> List[Document]:
         k = k or self.max_retrieval_results
         if not self.vectorstore:
             raise ValueError("VectorStore is not initialized.")
-        retrieval = self.vectorstore.similarity_search(query, k=k)
+        with SEARCH_RAG_STAGE_SECONDS.time(stage="retrieve"), span("retrieve", k=k):
+            retrieval = self.vectorstore.similarity_search(query, k=k)
         return retrieval
 
+    @coalesce
     def invoke(self, query: str) -> List[Document]:
-        results = self.search(query)
-        documents = [res.document for res in results if res.document is not None]
-        self.add_documents(documents=documents)
-        retrieved_docs = self.retrieve(query)
+        with span("search_rag", query=query):
+            results = self.search(query)
+            documents = [res.document for res in results if res.document is not None]
+            self.add_documents(documents=documents)
+            retrieved_docs = self.retrieve(query)
+        return retrieved_docs
+
+    async def aretrieve(self, query: str, k: Optional[int] = None) -> List[Document]:
+        return await asyncio.to_thread(self.retrieve, query, k)
+
+    @coalesce
+    async def ainvoke(self, query: str) -> List[Document]:
+        with span("search_rag", query=query):
+            results = await self.asearch(query)
+            documents = [res.document for res in results if res.document is not None]
+            await self.aadd_documents(documents=documents)
+            retrieved_docs = await self.aretrieve(query)
         return retrieved_docs
 
 
+_default_search_rag_manager: Optional[SearchRagManager] = None
+_default_search_rag_manager_lock = threading.Lock()
+
+
+def set_default_search_rag_manager(manager: Optional[SearchRagManager]) -> None:
+    """Register the long-lived manager that agents fall back to when none is injected."""
+    global _default_search_rag_manager
+    with _default_search_rag_manager_lock:
+        _default_search_rag_manager = manager
+
+
+def get_default_search_rag_manager(
+    config: Optional[Union[DictConfig, Dict[str, Any]]] = None,
+) -> SearchRagManager:
+    """Return the process-wide manager, building it from config only once as a fallback.
+
+    Building a manager loads the embedding model and opens the vectorstore, so the
+    application should register its own instance at startup via
+    :func:`set_default_search_rag_manager`. Hitting the config fallback is logged
+    as a warning because it means a request paid for that initialization.
+    """
+    global _default_search_rag_manager
+    if _default_search_rag_manager is not None:
+        return _default_search_rag_manager
+    with _default_search_rag_manager_lock:
+        if _default_search_rag_manager is None:
+            logger.warning(
+                "No SearchRagManager was injected; building one from config. "
+                "Register a shared instance with set_default_search_rag_manager() at startup."
+            )
+            if config is None:
+                from config import default_config
+                config = default_config
+            _default_search_rag_manager = SearchRagManager.from_config(config)
+        return _default_search_rag_manager
+
+
 def format_docs(docs: List[Document]) -> str:
     formatted_chunks: List[str] = []
     for idx, doc in enumerate(docs):
@@ -6,14 +6,24 @@ instead of hand-written HTTP code. It supports Bing, Tavily, and Serper.dev.
 
 from __future__ import annotations
 
-from pydoc import doc
-from typing import Any, Dict, List, Union, cast
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Union, cast
+from urllib.parse import urlsplit
 from langchain_core.documents import Document
 from .dataclass import SearchResult
+from .page_cache import PageCache
+from .search_cache import SearchResultCache
+from .page_fetcher import FetchedPage, PageFetcher, get_default_page_fetcher
+from .metrics import SEARCH_RAG_STAGE_SECONDS
+from .tracing import span
 from pydantic import BaseModel
 from omegaconf import OmegaConf, DictConfig
 from utils.config import ensure_config_dict
 
+logger = logging.getLogger(__name__)
+
 
 class SearcherFactory:
     """Create concise searchers backed by LangChain community utilities."""
@@ -42,28 +52,133 @@ class SearcherFactory:
         return wrapper
 
 
+def _html_to_document(url: str, content: bytes) -> Document:
+    """Extract text and metadata from an HTML page the way ``WebBaseLoader`` does."""
+    import bs4
+    soup = bs4.BeautifulSoup(content, "html.parser")
+    metadata: Dict[str, Any] = {"source": url}
+    if soup.title and soup.title.string:
+        metadata["title"] = soup.title.string.strip()
+    description = soup.find("meta", attrs={"name": "description"})
+    if description is not None and description.get("content"):
+        metadata["description"] = description.get("content")
+    html = soup.find("html")
+    if html is not None and html.get("lang"):
+        metadata["language"] = html.get("lang")
+    return Document(page_content=soup.get_text(), metadata=metadata)
+
+
+_docling_converter = None
+# Guards creating and using the shared converter; pages are converted from several loader threads.
+_docling_lock = threading.Lock()
+
+
+def _docling_to_document(url: str, page: FetchedPage) -> Document:
+    """Convert a downloaded page with Docling, reusing one converter per process."""
+    global _docling_converter
+    from io import BytesIO
+    from docling.datamodel.base_models import DocumentStream
+    from docling.document_converter import DocumentConverter
+    name = urlsplit(page.final_url).path.rsplit("/", 1)[-1] or "index.html"
+    if "." not in name:
+        name += ".pdf" if "pdf" in page.content_type else ".html"
+    with _docling_lock:
+        if _docling_converter is None:
+            _docling_converter = DocumentConverter()
+        result = _docling_converter.convert(DocumentStream(name=name, stream=BytesIO(page.content)))
+    return Document(page_content=result.document.export_to_markdown(), metadata={"source": url, "title": result.document.name})
+
+
 class WebDocumentLoader:
 
     @staticmethod
-    def invoke(urls: List[str], loader_type: str = "web") -> List[Document]:
-        """Load documents from the provided URLs using the specified loader."""
+    def _to_documents(pages: Dict[str, FetchedPage], loader_type: str) -> Dict[str, Document]:
+        if loader_type not in ("web", "docling"):
+            raise ValueError(f"Unsupported loader type: {loader_type}")
+        documents: Dict[str, Document] = {}
+        for url, page in pages.items():
+            try:
+                if loader_type == "docling":
+                    documents[url] = _docling_to_document(url, page)
+                elif page.content_type and "html" not in page.content_type and "text" not in page.content_type:
+                    logger.debug(f"Skipping {url}: unsupported content type {page.content_type}.")
+                else:
+                    documents[url] = _html_to_document(url, page.content)
+            except Exception as e:
+                logger.warning(f"Error loading document from {url}: {e}")
+        return documents
+
+    @staticmethod
+    def _merge(
+            pages: Dict[str, FetchedPage],
+            loader_type: str,
+            page_cache: Optional[PageCache],
+            stale: Dict[str, Dict[str, Any]],
+        ) -> Dict[str, Document]:
+        """Reuse revalidated (304) cache entries, extract the downloaded pages and cache them.
+
+        A stale entry whose revalidation failed or missed the deadline is served as is.
+        """
+        documents: Dict[str, Document] = {}
+        downloaded: Dict[str, FetchedPage] = {}
+        for url, page in pages.items():
+            if page.not_modified:
+                if page_cache is not None and url in stale:
+                    documents[url] = page_cache.refresh(url, loader_type, stale[url])
+            else:
+                downloaded[url] = page
+        extracted = WebDocumentLoader._to_documents(downloaded, loader_type)
+        if page_cache is not None:
+            for url, document in extracted.items():
+                page_cache.put(url, loader_type, document, downloaded[url].headers, was_stale=url in stale)
+        documents.update(extracted)
+        if page_cache is not None:
+            for url, entry in stale.items():
+                if url not in documents:
+                    documents[url] = page_cache.serve_stale(url, entry)
+        return documents
+
+    @staticmethod
+    def invoke(
+            urls: List[str],
+            loader_type: str = "web",
+            fetcher: Optional[PageFetcher] = None,
+            page_cache: Optional[PageCache] = None,
+        ) -> Dict[str, Document]:
+        """Load ``urls`` and return one document per page that is cached or arrived in time, keyed by URL.
+
+        Pages not in ``page_cache`` are downloaded concurrently; stale entries
+        are revalidated with conditional requests.
+        """
+        if not urls:
+            return {}
+        documents, stale = page_cache.lookup(urls, loader_type) if page_cache is not None else ({}, {})
+        missing = [url for url in urls if url not in documents]
+        if missing:
+            headers = {url: PageCache.conditional_headers(entry) for url, entry in stale.items()}
+            pages = (fetcher or get_default_page_fetcher()).fetch(missing, headers=headers)
+            documents.update(WebDocumentLoader._merge(pages, loader_type, page_cache, stale))
+        return documents
+
+    @staticmethod
+    async def ainvoke(
+            urls: List[str],
+            loader_type: str = "web",
+            fetcher: Optional[PageFetcher] = None,
+            page_cache: Optional[PageCache] = None,
+        ) -> Dict[str, Document]:
+        """Async variant of :meth:`invoke`; cache access and parsing run in worker threads."""
         if not urls:
-            return []
-        if loader_type == "docling":
-            from langchain_docling import DoclingLoader
-            loader = DoclingLoader(urls)
-        elif loader_type == "web":
-            from langchain_community.document_loaders import WebBaseLoader
-            import bs4
-            # bs4_strainer = bs4.SoupStrainer(class_=("post-title", "post-header", "post-content"))
-            # loader = WebBaseLoader(urls, bs_kwargs={"parse_only": bs4_strainer},)
-            # 'verify':False, 
-            loader = WebBaseLoader(urls, requests_kwargs={'timeout':10})
-        try:
-            documents = loader.load()
-        except Exception as e:
-            print(f"Error loading documents from URLs: {e}")
-            documents = []
+            return {}
+        if page_cache is not None:
+            documents, stale = await asyncio.to_thread(page_cache.lookup, urls, loader_type)
+        else:
+            documents, stale = {}, {}
+        missing = [url for url in urls if url not in documents]
+        if missing:
+            headers = {url: PageCache.conditional_headers(entry) for url, entry in stale.items()}
+            pages = await (fetcher or get_default_page_fetcher()).afetch(missing, headers=headers)
+            documents.update(await asyncio.to_thread(WebDocumentLoader._merge, pages, loader_type, page_cache, stale))
         return documents
 
 
@@ -75,11 +190,20 @@ class SearchRunner:
             searcher: BaseModel,
             loader_type: str = "web",
             max_search_results: int = 5,
+            fetcher: Optional[PageFetcher] = None,
+            page_cache: Optional[PageCache] = None,
+            result_cache: Optional[SearchResultCache] = None,
+            provider: Optional[str] = None,
             **kwargs: Any
         ) -> None:
         self.searcher = searcher
+        self.provider = provider or type(searcher).__name__
         self.loader_type = loader_type
         self.max_search_results = max_search_results
+        # None means the process-wide fetcher registered at startup.
+        self.fetcher = fetcher
+        self.page_cache = page_cache
+        self.result_cache = result_cache
 
     @staticmethod
     def from_config(
@@ -87,22 +211,59 @@ class SearchRunner:
         ) -> "SearchRunner":
   
         config_dict = ensure_config_dict(config)
+        provider = config_dict.get("search", {}).get("provider", "duckduckgo")
         searcher = SearcherFactory.create(
-            provider=config_dict.get("search", {}).get("provider", "duckduckgo"),
+            provider=provider,
             **config_dict,
         )
         return SearchRunner(
             searcher=searcher,
+            provider=provider,
+            result_cache=SearchResultCache.from_config(config_dict),
             loader_type=config_dict.get("search", {}).get("loader_type", "web"),
             max_search_results=config_dict.get("search", {}).get("max_results", 5),
+            page_cache=PageCache.from_config(config_dict),
         )
 
+    def _search(self, query: str) -> List[Dict[str, Any]]:
+        """Return the provider's raw results, from the result cache when possible."""
+        with SEARCH_RAG_STAGE_SECONDS.time(stage="search"), span("search") as current:
+            if self.result_cache is not None:
+                cached = self.result_cache.get(self.provider, query, self.max_search_results)
+                if cached is not None:
+                    if current is not None:
+                        current.set(cached=True)
+                    return cached
+            raw_results = self.searcher.results(query, max_results=self.max_search_results)
+            if self.result_cache is not None:
+                self.result_cache.set(self.provider, query, self.max_search_results, raw_results)
+        return raw_results
+
     def invoke(self, query: str) -> List[SearchResult]:
         """Perform a search and return structured results."""
-        raw_results = self.searcher.results(query, max_results=self.max_search_results)
+        raw_results = self._search(query)
+        urls = [item.get("link", "") for item in raw_results if item.get("link")]
+        with SEARCH_RAG_STAGE_SECONDS.time(stage="fetch"), span("fetch", urls=len(urls)):
+            url_docs = WebDocumentLoader.invoke(urls, loader_type=self.loader_type, fetcher=self.fetcher, page_cache=self.page_cache)
+        return self._structure_results(raw_results, url_docs)
+
+    async def ainvoke(self, query: str) -> List[SearchResult]:
+        """Asynchronously perform a search and return structured results."""
+        raw_results = await asyncio.to_thread(self._search, query)
         urls = [item.get("link", "") for item in raw_results if item.get("link")]
-        url_contents = WebDocumentLoader.invoke(urls, loader_type=self.loader_type)
-        url_docs_dict = {url: doc for url, doc in zip(urls, url_contents)}
+        with SEARCH_RAG_STAGE_SECONDS.time(stage="fetch"), span("fetch", urls=len(urls)):
+            url_docs = await WebDocumentLoader.ainvoke(
+                urls, loader_type=self.loader_type, fetcher=self.fetcher, page_cache=self.page_cache
+            )
+        return self._structure_results(raw_results, url_docs)
+
+    @staticmethod
+    def _structure_results(
+            raw_results: List[Dict[str, Any]],
+            url_docs_dict: Dict[str, Document],
+        ) -> List[SearchResult]:
+        # Documents are keyed by the URL they were fetched for, so a failed or
+        # dropped page leaves only its own result without content.
         url_content_dict = {url: doc.page_content for url, doc in url_docs_dict.items()}
 
         structured_results: List[SearchResult] = []
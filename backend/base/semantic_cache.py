@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from omegaconf import DictConfig
+
+from base.cache import SQLiteCache
+from utils.config import ensure_config_dict
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(str(text).lower().split())
+
+
+class SemanticCache:
+    """Cache results by the meaning of a short text rather than its exact wording.
+
+    Each entry stores the query embedding next to the result in a
+    :class:`SQLiteCache`. Lookups first try the normalized text exactly, then
+    compare the query embedding with every cached one (cosine similarity,
+    in-memory matrix) and return the closest result scoring at least
+    ``threshold``. Entries are partitioned by ``namespace`` (e.g. the model
+    that produced them) and evicted by the store's TTL / LRU limits.
+    """
+
+    def __init__(self, embedder: Embeddings, store: SQLiteCache, threshold: float = 0.9) -> None:
+        self.embedder = embedder
+        self.store = store
+        self.threshold = float(threshold)
+        self._index: Dict[str, Dict[str, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._recent_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._load_index()
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Union[DictConfig, Dict[str, Any]],
+        embedder: Embeddings,
+        section: str = "skill_requirement_cache",
+    ) -> Optional["SemanticCache"]:
+        """Build the cache described by ``config[section]``, or return ``None`` when disabled."""
+        config = ensure_config_dict(config)
+        cache_config = config.get(section, {}) or {}
+        if not cache_config.get("enabled", False):
+            return None
+        store = SQLiteCache(
+            cache_config.get("db_path", "data/cache/semantic.sqlite3"),
+            table=cache_config.get("table", section),
+            ttl=cache_config.get("ttl"),
+            max_entries=cache_config.get("max_entries", 2000),
+        )
+        return cls(embedder, store, threshold=cache_config.get("threshold", 0.9))
+
+    @staticmethod
+    def _key(namespace: str, text: str) -> str:
+        return hashlib.sha256(f"{namespace}\n{normalize_query(text)}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _unit(vector: List[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _embed(self, text: str) -> List[float]:
+        """Embed ``text``, reusing the vector of a recent lookup (a miss is usually followed by ``add``)."""
+        normalized = normalize_query(text)
+        with self._lock:
+            embedding = self._recent_embeddings.get(normalized)
+        if embedding is None:
+            embedding = [float(x) for x in self.embedder.embed_query(normalized)]
+            with self._lock:
+                self._recent_embeddings[normalized] = embedding
+                while len(self._recent_embeddings) > 64:
+                    self._recent_embeddings.popitem(last=False)
+        return embedding
+
+    def _load_index(self) -> None:
+        """Rebuild the in-memory embedding index from the persistent store."""
+        index: Dict[str, Dict[str, np.ndarray]] = {}
+        for key, entry in self.store.items():
+            try:
+                index.setdefault(entry["namespace"], {})[key] = self._unit(entry["embedding"])
+            except (KeyError, TypeError, ValueError):
+                continue
+        with self._lock:
+            self._index = index
+
+    def _nearest(self, namespace: str, embedding: np.ndarray) -> Tuple[Optional[str], float]:
+        with self._lock:
+            entries = self._index.get(namespace) or {}
+            if not entries:
+                return None, 0.0
+            keys = list(entries)
+            matrix = np.stack([entries[key] for key in keys])
+        scores = matrix @ embedding
+        best = int(np.argmax(scores))
+        return keys[best], float(scores[best])
+
+    def lookup(self, namespace: str, text: str) -> Optional[Any]:
+        """Return the cached result for ``text`` or a close paraphrase of it."""
+        entry = self.store.get(self._key(namespace, text))
+        if entry is not None:
+            self.exact_hits += 1
+            return entry["value"]
+        key, score = self._nearest(namespace, self._unit(self._embed(text)))
+        if key is not None and score >= self.threshold:
+            entry = self.store.get(key)
+            if entry is not None:
+                self.semantic_hits += 1
+                logger.info(f"Semantic cache hit ({score:.3f}) for {text!r} -> {entry.get('text')!r}.")
+                return entry["value"]
+            # Expired or evicted from the store; drop it from the index too.
+            with self._lock:
+                self._index.get(namespace, {}).pop(key, None)
+        self.misses += 1
+        return None
+
+    def add(self, namespace: str, text: str, value: Any) -> None:
+        embedding = self._embed(text)
+        key = self._key(namespace, text)
+        self.store.set(key, {"namespace": namespace, "text": text, "embedding": embedding, "value": value})
+        with self._lock:
+            self._index.setdefault(namespace, {})[key] = self._unit(embedding)
+            indexed = sum(len(entries) for entries in self._index.values())
+        if self.store.max_entries and indexed > self.store.max_entries:
+            self._load_index()
+
+    async def alookup(self, namespace: str, text: str) -> Optional[Any]:
+        return await asyncio.to_thread(self.lookup, namespace, text)
+
+    async def aadd(self, namespace: str, text: str, value: Any) -> None:
+        await asyncio.to_thread(self.add, namespace, text, value)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "entries": len(self.store),
+            "threshold": self.threshold,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+        }
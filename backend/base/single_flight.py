@@ -0,0 +1,149 @@
+"""Coalesce identical concurrent calls into one in-flight computation.
+
+When several requests ask for the same thing at the same moment (a class
+opening the same session), only the first caller runs the function; the
+others wait for its result. Nothing is cached once the call finishes, so
+this complements rather than replaces the response caches.
+"""
+
+import copy
+import json
+import asyncio
+import hashlib
+import logging
+import functools
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(value: Any) -> Any:
+    # Objects such as chat models or managers are identified by instance: pooled
+    # clients and the shared SearchRagManager are the same object across requests.
+    return f"<{type(value).__name__}@{id(value):x}>"
+
+
+def make_call_key(name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+    canonical = json.dumps([name, list(args), kwargs], sort_keys=True, ensure_ascii=False, default=_encode)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time, sharing its outcome with concurrent callers.
+
+    Sync callers are coalesced across threads; async callers are coalesced
+    within their event loop. Callers that join an in-flight call receive a deep
+    copy of the result so they can mutate it freely. A shared async call is
+    cancelled only when every caller waiting on it has been cancelled.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._tasks: Dict[Tuple[int, str], list] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    async def ado(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            entry = self._tasks.get(loop_key)
+            leader = entry is None
+            if leader:
+                task = asyncio.ensure_future(factory())
+                entry = self._tasks[loop_key] = [task, 0]
+                task.add_done_callback(lambda _t: self._forget(loop_key, _t))
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+            entry[1] += 1
+        task = entry[0]
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                raise
+            with self._lock:
+                entry[1] -= 1
+                abandoned = entry[1] == 0
+            if abandoned:
+                task.cancel()
+            raise
+        return result if leader else copy.deepcopy(result)
+
+    def _forget(self, loop_key: Tuple[int, str], task: asyncio.Future) -> None:
+        with self._lock:
+            entry = self._tasks.get(loop_key)
+            if entry is not None and entry[0] is task:
+                del self._tasks[loop_key]
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here so an exception seen only by cancelled waiters is not reported as unhandled.
+            logger.debug(f"Coalesced call failed: {task.exception()}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls) + len(self._tasks),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+            }
+
+
+default_single_flight = SingleFlight()
+
+
+def coalesce(fn: Callable) -> Callable:
+    """Decorator: concurrent calls of ``fn`` with equal arguments share one execution.
+
+    Works for both plain and ``async`` functions. Arguments are compared by
+    their canonical JSON; non-JSON objects (models, managers) by identity.
+    """
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            key = make_call_key(name, args, kwargs)
+            return await default_single_flight.ado(key, lambda: fn(*args, **kwargs))
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = make_call_key(name, args, kwargs)
+        return default_single_flight.do(key, lambda: fn(*args, **kwargs))
+    return wrapper
@@ -0,0 +1,134 @@
+"""Opt-in per-request span traces for the content pipelines.
+
+A trace is started by the endpoint (``start_trace``) and stages open child
+spans with ``span(name)``. The current span lives in a ``contextvars``
+variable, so nesting follows ``await``, ``asyncio`` tasks and
+``asyncio.to_thread`` automatically; ``ThreadPoolExecutor`` workers need
+:func:`bind_context`. Outside a trace ``span`` is a cheap no-op.
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import contextlib
+import contextvars
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "attributes", "thread", "started", "ended", "children", "trace")
+
+    def __init__(self, name: str, trace: "Trace", attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.trace = trace
+        self.attributes = attributes
+        self.thread = threading.current_thread().name
+        self.started = time.perf_counter()
+        self.ended: Optional[float] = None
+        self.children: List["Span"] = []
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def child(self, name: str, attributes: Dict[str, Any]) -> "Span":
+        span = Span(name, self.trace, attributes)
+        with self.trace.lock:
+            self.children.append(span)
+        return span
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        ended = self.ended if self.ended is not None else time.perf_counter()
+        with self.trace.lock:
+            children = sorted(self.children, key=lambda span: span.started)
+        return {
+            "name": self.name,
+            "start_ms": round((self.started - origin) * 1000, 3),
+            "duration_ms": round((ended - self.started) * 1000, 3),
+            "thread": self.thread,
+            "attributes": self.attributes,
+            "children": [child.to_dict(origin) for child in children],
+        }
+
+
+class Trace:
+    """Span tree of one request, with wall times relative to the trace start."""
+
+    def __init__(self, name: str, **attributes: Any) -> None:
+        self.trace_id = uuid.uuid4().hex
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+        self.root = Span(name, self, attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "started_at": self.started_at,
+            "root": self.root.to_dict(self.root.started),
+        }
+
+
+@contextlib.contextmanager
+def start_trace(name: str, **attributes: Any) -> Iterator[Trace]:
+    """Make a new trace current for the duration of the block."""
+    trace = Trace(name, **attributes)
+    token = _current_span.set(trace.root)
+    try:
+        yield trace
+    finally:
+        trace.root.ended = time.perf_counter()
+        _current_span.reset(token)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Record ``name`` as a child of the current span; yields ``None`` when no trace is active.
+
+    Do not ``yield`` from an async generator inside this block: the span would
+    stay current for the consumer of the generator.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    current = parent.child(name, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set(error=type(e).__name__)
+        raise
+    finally:
+        current.ended = time.perf_counter()
+        _current_span.reset(token)
+
+
+def bind_context(fn: Callable) -> Callable:
+    """Wrap ``fn`` so it runs in a copy of the caller's context, e.g. inside a thread pool worker.
+
+    Each call gets its own copy because one context cannot be entered by two
+    threads at once.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args: Any, **kwargs: Any) -> Any:
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+_write_lock = threading.Lock()
+
+
+def write_trace_jsonl(path: str, trace: Dict[str, Any]) -> None:
+    """Append an exported trace to a JSONL file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    line = json.dumps(trace, ensure_ascii=False, default=str)
+    with _write_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
@@ -0,0 +1,204 @@
+"""Token usage and prompt-size accounting for agent calls.
+
+:class:`BaseAgent` reports every model call to the process-wide
+:class:`UsageTracker` with the provider-reported token counts, or a local
+estimate when the provider returns none, and the formatted size of each
+prompt variable. Totals are kept per agent and per endpoint. For one request
+the same records are also collected in a :class:`RequestUsage`, which the
+API can attach to its response as a ``usage`` block.
+"""
+
+import math
+import logging
+import threading
+import contextvars
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import parse_qs
+
+from base.metrics import LLM_TOKENS
+
+logger = logging.getLogger(__name__)
+
+_encoding = None
+_encoding_loaded = False
+
+
+def estimate_tokens(text: str) -> int:
+    """Count tokens with ``tiktoken`` when it is installed, else approximate as four characters per token."""
+    global _encoding, _encoding_loaded
+    if not text:
+        return 0
+    if not _encoding_loaded:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = None
+        _encoding_loaded = True
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def usage_from_messages(messages: Iterable[Any]) -> Optional[Dict[str, int]]:
+    """Sum the provider-reported ``usage_metadata`` of the AI messages in a reply, if any."""
+    totals = {"input_tokens": 0, "output_tokens": 0}
+    reported = False
+    for message in messages:
+        metadata = getattr(message, "usage_metadata", None)
+        if metadata:
+            reported = True
+            totals["input_tokens"] += int(metadata.get("input_tokens", 0) or 0)
+            totals["output_tokens"] += int(metadata.get("output_tokens", 0) or 0)
+    return totals if reported else None
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {"calls": 0, "estimated_calls": 0, "input_tokens": 0, "output_tokens": 0, "prompt_chars": 0}
+
+
+class RequestUsage:
+    """Usage records of a single API request."""
+
+    def __init__(self, endpoint: Callable[[], str], include_in_response: bool = False) -> None:
+        self._endpoint = endpoint
+        self.include_in_response = include_in_response
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def endpoint(self) -> str:
+        return self._endpoint()
+
+    def add(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self.calls.append(record)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = list(self.calls)
+        by_agent: Dict[str, Dict[str, Any]] = defaultdict(_empty_totals)
+        for record in calls:
+            totals = by_agent[record["agent"]]
+            totals["calls"] += 1
+            totals["estimated_calls"] += int(record["estimated"])
+            totals["input_tokens"] += record["input_tokens"]
+            totals["output_tokens"] += record["output_tokens"]
+            totals["prompt_chars"] += record["prompt_chars"]
+        return {
+            "input_tokens": sum(record["input_tokens"] for record in calls),
+            "output_tokens": sum(record["output_tokens"] for record in calls),
+            "calls": len(calls),
+            "estimated": any(record["estimated"] for record in calls),
+            "by_agent": dict(by_agent),
+        }
+
+
+_request_usage: contextvars.ContextVar[Optional[RequestUsage]] = contextvars.ContextVar("request_usage", default=None)
+
+
+def current_request_usage() -> Optional[RequestUsage]:
+    return _request_usage.get()
+
+
+class UsageTracker:
+    """Process-wide token and prompt-size totals per agent, per endpoint and per prompt variable."""
+
+    def __init__(self) -> None:
+        self._by_agent: Dict[str, Dict[str, Any]] = defaultdict(_empty_totals)
+        self._by_endpoint: Dict[str, Dict[str, Any]] = defaultdict(_empty_totals)
+        # agent -> variable -> {"calls", "chars", "max_chars"}
+        self._variables: Dict[str, Dict[str, Dict[str, int]]] = defaultdict(
+            lambda: defaultdict(lambda: {"calls": 0, "chars": 0, "max_chars": 0})
+        )
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        agent: str,
+        input_tokens: int,
+        output_tokens: int,
+        estimated: bool,
+        prompt_chars: int,
+        variable_chars: Dict[str, int],
+    ) -> Dict[str, Any]:
+        request_usage = _request_usage.get()
+        endpoint = request_usage.endpoint if request_usage is not None else "background"
+        record = {
+            "agent": agent,
+            "input_tokens": int(input_tokens),
+            "output_tokens": int(output_tokens),
+            "estimated": bool(estimated),
+            "prompt_chars": int(prompt_chars),
+            "variable_chars": variable_chars,
+        }
+        with self._lock:
+            for totals in (self._by_agent[agent], self._by_endpoint[endpoint]):
+                totals["calls"] += 1
+                totals["estimated_calls"] += int(estimated)
+                totals["input_tokens"] += record["input_tokens"]
+                totals["output_tokens"] += record["output_tokens"]
+                totals["prompt_chars"] += record["prompt_chars"]
+            for variable, chars in variable_chars.items():
+                stats = self._variables[agent][variable]
+                stats["calls"] += 1
+                stats["chars"] += chars
+                stats["max_chars"] = max(stats["max_chars"], chars)
+        LLM_TOKENS.inc(record["input_tokens"], agent=agent, direction="input")
+        LLM_TOKENS.inc(record["output_tokens"], agent=agent, direction="output")
+        if request_usage is not None:
+            request_usage.add(record)
+        return record
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "by_agent": {agent: dict(totals) for agent, totals in self._by_agent.items()},
+                "by_endpoint": {endpoint: dict(totals) for endpoint, totals in self._by_endpoint.items()},
+                "prompt_variables": {
+                    agent: {
+                        variable: {**stats, "mean_chars": stats["chars"] / stats["calls"] if stats["calls"] else 0}
+                        for variable, stats in sorted(variables.items(), key=lambda item: -item[1]["chars"])
+                    }
+                    for agent, variables in self._variables.items()
+                },
+            }
+
+
+default_usage_tracker = UsageTracker()
+
+
+_TRUTHY = ("1", "true", "yes")
+
+
+class UsageMiddleware:
+    """ASGI middleware giving each HTTP request its own :class:`RequestUsage`.
+
+    Usage is attributed to the route template once routing has happened. A
+    request asks for the ``usage`` block in its JSON response with the
+    ``X-Include-Usage: 1`` header or ``?include_usage=1`` (``true`` also accepted).
+    """
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        flag = headers.get(b"x-include-usage", b"").decode("latin-1").strip().lower()
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        values = [value.strip().lower() for value in query.get("include_usage", [])]
+        include = flag in _TRUTHY or any(value in _TRUTHY for value in values)
+
+        def endpoint() -> str:
+            route = scope.get("route")
+            return getattr(route, "path", None) or scope.get("path", "")
+
+        token = _request_usage.set(RequestUsage(endpoint, include_in_response=include))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_usage.reset(token)
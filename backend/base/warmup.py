@@ -0,0 +1,194 @@
+import time
+import asyncio
+import inspect
+import logging
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from omegaconf import DictConfig
+
+from base.base_agent import BaseAgent, default_agent_registry
+from utils.config import ensure_config_dict
+
+logger = logging.getLogger(__name__)
+
+
+def agent_classes() -> List[type]:
+    """Every imported, concrete subclass of :class:`BaseAgent`, in definition order."""
+    classes: List[type] = []
+    pending = list(BaseAgent.__subclasses__())
+    while pending:
+        cls = pending.pop(0)
+        if cls in classes:
+            continue
+        classes.append(cls)
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+class Warmup:
+    """Startup warmup that gates the readiness probe.
+
+    Runs once after startup: a dummy embed (which loads the embedding model),
+    opening the vectorstore, compiling and registering the shared instance of
+    every :class:`BaseAgent` subclass that runs through a graph and,
+    optionally, a request to the LLM ``base_url`` through the pooled HTTP
+    client so the first call finds a warm connection. A failed step is logged
+    and reported; it only keeps the worker unready when ``strict`` is set.
+    """
+
+    def __init__(
+        self,
+        search_rag_manager: Optional[Any] = None,
+        llm_factory: Optional[Callable[[], Any]] = None,
+        llm_pool: Optional[Any] = None,
+        agent_kwargs: Optional[Dict[str, Any]] = None,
+        enabled: bool = True,
+        embedder: bool = True,
+        vectorstore: bool = True,
+        agents: bool = True,
+        ping_url: Optional[str] = None,
+        ping_timeout: float = 5.0,
+        strict: bool = False,
+    ) -> None:
+        self.search_rag_manager = search_rag_manager
+        self.llm_factory = llm_factory
+        self.llm_pool = llm_pool
+        self.agent_kwargs = dict(agent_kwargs or {})
+        self.enabled = enabled
+        self.embedder = embedder
+        self.vectorstore = vectorstore
+        self.agents = agents
+        self.ping_url = ping_url
+        self.ping_timeout = float(ping_timeout)
+        self.strict = strict
+        self.state = "pending" if enabled else "disabled"
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.seconds: Optional[float] = None
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Union[DictConfig, Dict[str, Any]],
+        search_rag_manager: Optional[Any] = None,
+        llm_factory: Optional[Callable[[], Any]] = None,
+        llm_pool: Optional[Any] = None,
+        agent_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> "Warmup":
+        config = ensure_config_dict(config)
+        startup_config = config.get("startup", {}) or {}
+        warmup_config = startup_config.get("warmup", {}) or {}
+        ping_url = None
+        if warmup_config.get("ping_llm", False):
+            ping_url = (config.get("llm", {}) or {}).get("base_url")
+            if not ping_url:
+                logger.warning("startup.warmup.ping_llm is set but llm.base_url is empty; skipping the ping.")
+        return cls(
+            search_rag_manager=search_rag_manager,
+            llm_factory=llm_factory,
+            llm_pool=llm_pool,
+            agent_kwargs=agent_kwargs,
+            enabled=startup_config.get("background_warmup", True),
+            embedder=warmup_config.get("embedder", True),
+            vectorstore=warmup_config.get("vectorstore", True),
+            agents=warmup_config.get("agents", True),
+            ping_url=ping_url,
+            ping_timeout=warmup_config.get("ping_timeout", 5.0),
+            strict=warmup_config.get("strict", False),
+        )
+
+    @property
+    def ready(self) -> bool:
+        return self.state in ("ready", "disabled")
+
+    def _embed(self) -> None:
+        embedder = self.search_rag_manager.embedder
+        # Bypass the embedding cache: a cached dummy vector would not load the model.
+        getattr(embedder, "underlying", embedder).embed_query("warmup")
+
+    def _open_vectorstore(self) -> None:
+        if self.search_rag_manager.vectorstore is None:
+            raise ValueError("SearchRagManager has no vectorstore configured.")
+
+    def _shared_kwargs(self, cls: type) -> Dict[str, Any]:
+        """The keyword-only constructor arguments helpers pass to ``cls.shared``.
+
+        Shared components come from ``agent_kwargs``; other keyword-only
+        parameters take their defaults. This way the warmed instance lands on
+        the same registry key as the helpers' calls.
+        """
+        kwargs = {}
+        for name, parameter in inspect.signature(cls.__init__).parameters.items():
+            if parameter.kind is not inspect.Parameter.KEYWORD_ONLY:
+                continue
+            if name in self.agent_kwargs:
+                kwargs[name] = self.agent_kwargs[name]
+            elif parameter.default is not inspect.Parameter.empty:
+                kwargs[name] = parameter.default
+        return kwargs
+
+    def _build_agents(self) -> Dict[str, Any]:
+        model = self.llm_factory()
+        built, direct, failed = [], [], {}
+        for cls in agent_classes():
+            try:
+                kwargs = self._shared_kwargs(cls)
+                agent = cls(model, **kwargs)
+                # Direct-call agents are cheap to build; registering them would only fill the registry.
+                if not agent.uses_graph:
+                    direct.append(cls.__name__)
+                    continue
+                default_agent_registry.add(agent, model, **kwargs)
+                built.append(cls.__name__)
+            except Exception as e:
+                failed[cls.__name__] = f"{type(e).__name__}: {e}"
+        if failed:
+            logger.warning(f"Could not pre-build agents: {failed}")
+        return {"built": built, "direct": direct, "failed": failed}
+
+    async def _ping(self) -> Dict[str, Any]:
+        return {"status_code": await self.llm_pool.aping(self.ping_url, timeout=self.ping_timeout)}
+
+    async def _run_step(self, name: str, step: Callable[[], Any]) -> bool:
+        started = time.perf_counter()
+        record: Dict[str, Any] = {}
+        try:
+            result = step()
+            if asyncio.iscoroutine(result):
+                result = await result
+            if isinstance(result, dict):
+                record.update(result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            logger.warning(f"Warmup step {name} failed: {record['error']}")
+        record["seconds"] = round(time.perf_counter() - started, 3)
+        self.steps[name] = record
+        return "error" not in record
+
+    async def arun(self) -> bool:
+        """Run the configured steps in order and return whether the worker is ready."""
+        if not self.enabled:
+            return True
+        self.state = "running"
+        started = time.perf_counter()
+        steps: List[tuple] = []
+        if self.search_rag_manager is not None:
+            if self.embedder:
+                steps.append(("embedder", lambda: asyncio.to_thread(self._embed)))
+            if self.vectorstore:
+                steps.append(("vectorstore", lambda: asyncio.to_thread(self._open_vectorstore)))
+        if self.agents and self.llm_factory is not None:
+            steps.append(("agents", lambda: asyncio.to_thread(self._build_agents)))
+        if self.ping_url and self.llm_pool is not None:
+            steps.append(("llm_ping", self._ping))
+        ok = True
+        for name, step in steps:
+            ok = await self._run_step(name, step) and ok
+        self.seconds = round(time.perf_counter() - started, 3)
+        self.state = "ready" if ok or not self.strict else "failed"
+        logger.info(f"Warmup finished in {self.seconds}s: {self.state}.")
+        return self.ready
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "ready": self.ready, "seconds": self.seconds, "steps": dict(self.steps)}
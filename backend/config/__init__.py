@@ -1 +1,9 @@
-from .loader import load_config, default_config
\ No newline at end of file
+from typing import Any
+
+from .loader import load_config
+
+
+def __getattr__(name: str) -> Any:
+    if name == "default_config":
+        return load_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
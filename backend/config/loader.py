@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import os
+import threading
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 from omegaconf import OmegaConf, DictConfig
 from hydra import compose, initialize_config_module
@@ -19,15 +20,30 @@ def load_config(
     """Compose Hydra config from a config module with optional env overrides.
 
     Uses hydra.initialize_config_module to avoid relative-path issues.
+    Composition is memoized per arguments, so repeated loads (and
+    ``default_config``) share one composed config.
     """
 
     if env_overrides:
         os.environ.update(env_overrides)
 
-    with initialize_config_module(version_base=None, config_module=config_module):
-        cfg = compose(config_name=config_name)
-        _ = OmegaConf.structured(AppConfig)
+    key = (config_name, config_module, tuple(sorted((env_overrides or {}).items())))
+    with _load_lock:
+        cfg = _loaded.get(key)
+        if cfg is None:
+            with initialize_config_module(version_base=None, config_module=config_module):
+                cfg = compose(config_name=config_name)
+                _ = OmegaConf.structured(AppConfig)
+            _loaded[key] = cfg
         return cfg
 
 
-default_config = load_config()
+_loaded: Dict[Tuple[Any, ...], DictConfig] = {}
+_load_lock = threading.RLock()
+
+
+def __getattr__(name: str) -> Any:
+    # ``default_config`` is composed on first access rather than at import time.
+    if name == "default_config":
+        return load_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
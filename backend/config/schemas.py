@@ -1,7 +1,32 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class LLMPoolConfig:
+    max_size: int = 8
+    idle_timeout: float = 600.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    client_max_retries: Optional[int] = 0
+
+
+@dataclass
+class LLMSchedulerConfig:
+    enabled: bool = True
+    requests_per_minute: float = 300.0
+    burst: int = 20
+    initial_concurrency: float = 8
+    min_concurrency: float = 1
+    max_concurrency: float = 32
+    latency_target: float = 60.0
+    max_retries: int = 4
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
+    overrides: Dict[str, Any] = field(default_factory=dict)
 
 
 @dataclass
@@ -10,6 +35,9 @@ class LLMConfig:
     provider: str = "openai"  # e.g., openai, azure-openai, ollama, anthropic, groq
     model_name: str = "gpt-4o"
     base_url: Optional[str] = None
+    temperature: float = 0
+    pool: LLMPoolConfig = field(default_factory=LLMPoolConfig)
+    scheduler: LLMSchedulerConfig = field(default_factory=LLMSchedulerConfig)
 
 
 @dataclass
@@ -18,10 +46,58 @@ class EmbeddingConfig:
     model_name: str = "sentence-transformers/all-mpnet-base-v2"
 
 
+@dataclass
+class FetchConfig:
+    timeout: float = 10.0
+    deadline: Optional[float] = 15.0
+    max_concurrency: int = 16
+    per_host_concurrency: int = 2
+    max_bytes: Optional[int] = 5 * 1024 * 1024
+    user_agent: Optional[str] = None
+
+
+@dataclass
+class SearchResultCacheConfig:
+    enabled: bool = True
+    db_path: str = "data/cache/search_results.sqlite3"
+    ttl: Optional[float] = 86400
+    max_entries: Optional[int] = 50000
+
+
+@dataclass
+class PageCacheConfig:
+    enabled: bool = True
+    db_path: str = "data/cache/pages.sqlite3"
+    fresh_ttl: Optional[float] = 86400
+    ttl: Optional[float] = 2592000
+    max_entries: Optional[int] = 20000
+    max_bytes: Optional[int] = 512 * 1024 * 1024
+
+
 @dataclass
 class SearchConfig:
     provider: str = "duckduckgo"  # tavily, serper, bing, duckduckgo, brave, searx, you
     max_results: int = 5
+    loader_type: str = "web"
+    fetch: FetchConfig = field(default_factory=FetchConfig)
+    result_cache: SearchResultCacheConfig = field(default_factory=SearchResultCacheConfig)
+    page_cache: PageCacheConfig = field(default_factory=PageCacheConfig)
+
+
+@dataclass
+class EmbeddingCacheConfig:
+    enabled: bool = True
+    db_path: str = "data/cache/embeddings.sqlite3"
+    ttl: Optional[float] = None
+    max_entries: Optional[int] = 200000
+    max_bytes: Optional[int] = 512 * 1024 * 1024
+
+
+@dataclass
+class EmbedderConfig:
+    provider: str = "huggingface"
+    model_name: str = "sentence-transformers/all-mpnet-base-v2"
+    cache: EmbeddingCacheConfig = field(default_factory=EmbeddingCacheConfig)
 
 
 @dataclass
@@ -37,6 +113,96 @@ class RAGConfig:
     max_workers: int = 3
 
 
+@dataclass
+class JobsConfig:
+    db_path: str = "data/jobs.sqlite3"
+    max_workers: int = 2
+    max_pending: int = 100
+    dedup_ttl: float = 3600.0
+    retention: float = 604800.0
+
+
+@dataclass
+class BatchConfig:
+    max_concurrency: int = 8
+    max_concurrent_sessions: int = 4
+
+
+@dataclass
+class PrefetchConfig:
+    enabled: bool = True
+    max_entries: int = 64
+    ttl: float = 3600.0
+    max_concurrent: int = 1
+    max_workers: int = 2
+    material_fields: List[str] = field(default_factory=lambda: [
+        "learning_goal",
+        "learner_information",
+        "cognitive_status.mastered_skills",
+        "cognitive_status.in_progress_skills",
+        "learning_preferences",
+    ])
+    quiz_counts: Dict[str, int] = field(default_factory=lambda: {
+        "single_choice_count": 3,
+        "multiple_choice_count": 1,
+        "true_false_count": 1,
+        "short_answer_count": 1,
+    })
+
+
+@dataclass
+class ResponseCacheConfig:
+    enabled: bool = True
+    db_path: str = "data/cache/responses.sqlite3"
+    ttl: float = 604800.0
+    max_entries: int = 10000
+    require_zero_temperature: bool = True
+    exclude_agents: List[str] = field(default_factory=list)
+
+
+@dataclass
+class SemanticCacheConfig:
+    enabled: bool = True
+    db_path: str = "data/cache/semantic.sqlite3"
+    threshold: float = 0.9
+    ttl: Optional[float] = 2592000.0
+    max_entries: int = 2000
+
+
+@dataclass
+class CVConfig:
+    upload_dir: str = "data/cv"
+    max_upload_bytes: int = 20 * 1024 * 1024
+    max_pages: Optional[int] = 30
+    max_workers: int = 2
+    pages_per_task: int = 4
+    text_cache_enabled: bool = True
+    text_cache_path: str = "data/cache/cv_text.sqlite3"
+    text_cache_ttl: Optional[float] = None
+    text_cache_max_entries: int = 1000
+
+
+@dataclass
+class TracingConfig:
+    output_path: Optional[str] = None
+
+
+@dataclass
+class WarmupConfig:
+    embedder: bool = True
+    vectorstore: bool = True
+    agents: bool = True
+    ping_llm: bool = False
+    ping_timeout: float = 5.0
+    strict: bool = False
+
+
+@dataclass
+class StartupConfig:
+    background_warmup: bool = True
+    warmup: WarmupConfig = field(default_factory=WarmupConfig)
+
+
 @dataclass
 class AppConfig:
     environment: str = "dev"  # dev | staging | prod
@@ -45,5 +211,14 @@ class AppConfig:
 
     llm: LLMConfig = field(default_factory=LLMConfig)
     search: SearchConfig = field(default_factory=SearchConfig)
+    embedder: EmbedderConfig = field(default_factory=EmbedderConfig)
     vectorstore: VectorstoreConfig = field(default_factory=VectorstoreConfig)
     rag: RAGConfig = field(default_factory=RAGConfig)
+    jobs: JobsConfig = field(default_factory=JobsConfig)
+    batch: BatchConfig = field(default_factory=BatchConfig)
+    prefetch: PrefetchConfig = field(default_factory=PrefetchConfig)
+    response_cache: ResponseCacheConfig = field(default_factory=ResponseCacheConfig)
+    skill_requirement_cache: SemanticCacheConfig = field(default_factory=SemanticCacheConfig)
+    cv: CVConfig = field(default_factory=CVConfig)
+    tracing: TracingConfig = field(default_factory=TracingConfig)
+    startup: StartupConfig = field(default_factory=StartupConfig)
@@ -1,27 +1,112 @@
-import ast
-import json
-import time
-import uvicorn
-import hydra
-from omegaconf import DictConfig, OmegaConf
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, HTTPException, File, UploadFile, Form
-from base.llm_factory import LLMFactory
-from base.searcher_factory import SearchRunner
-from base.search_rag import SearchRagManager
-from utils.preprocess import extract_text_from_pdf
-from fastapi.responses import JSONResponse
-from modules.skill_gap_identification import *
-from modules.adaptive_learner_modeling import *
-from modules.personalized_resource_delivery import *
-from modules.ai_chatbot_tutor import chat_with_tutor_with_llm
-from api_schemas import *
-from config import load_config
-
-app_config = load_config(config_name="main")
-search_rag_manager = SearchRagManager.from_config(app_config)
-
-app = FastAPI()
+from utils.startup_profile import phase, phases as startup_phases, log_report as log_startup_report
+
+with phase("imports"):
+    import json
+    import asyncio
+    import logging
+    import contextlib
+    import time
+    import uvicorn
+    import hydra
+    from omegaconf import DictConfig, OmegaConf
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Header
+    from base.llm_pool import LLMClientPool
+    from base.searcher_factory import SearchRunner
+    from base.search_rag import SearchRagManager, set_default_search_rag_manager
+    from base.jobs import JobManager, JobQueueFullError
+    from base.prefetch import ContentPrefetcher
+    from base.response_cache import AgentResponseCache, set_default_response_cache
+    from base.llm_scheduler import LLMScheduler, set_default_llm_scheduler
+    from base.semantic_cache import SemanticCache
+    from base.cv_store import CVRejectedError, CVStore
+    from base.metrics import MetricsMiddleware, default_registry as metrics_registry, stats_samples
+    from base.single_flight import default_single_flight
+    from base.tracing import start_trace, write_trace_jsonl
+    from base.usage import UsageMiddleware, default_usage_tracker
+    from base.warmup import Warmup
+    from base.base_agent import default_agent_registry
+    from base.page_fetcher import PageFetcher, set_default_page_fetcher
+    from base.embedder_factory import CachedEmbeddings
+    from utils.sse import format_sse_event
+    from utils.payload import parse_legacy_payload
+    from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+    from utils.json_response import FastJSONResponse
+    from modules.skill_gap_identification import *
+    from modules.adaptive_learner_modeling import *
+    from modules.personalized_resource_delivery import *
+    from modules.ai_chatbot_tutor import achat_with_tutor_with_llm, astream_chat_with_tutor_with_llm
+    from api_schemas import *
+    from config import load_config
+
+logger = logging.getLogger(__name__)
+
+with phase("config"):
+    app_config = load_config(config_name="main")
+with phase("components"):
+    page_fetcher = PageFetcher.from_config(app_config)
+    set_default_page_fetcher(page_fetcher)
+    # Cheap to construct: the embedding model and vectorstore load on first use or in the startup warmup.
+    search_rag_manager = SearchRagManager.from_config(app_config)
+    set_default_search_rag_manager(search_rag_manager)
+    skill_requirement_cache = SemanticCache.from_config(app_config, search_rag_manager.embedder)
+    llm_pool = LLMClientPool.from_config(app_config)
+    response_cache = AgentResponseCache.from_config(app_config)
+    set_default_response_cache(response_cache)
+    llm_scheduler = LLMScheduler.from_config(app_config)
+    set_default_llm_scheduler(llm_scheduler)
+    job_manager = JobManager.from_config(app_config)
+    content_prefetcher = ContentPrefetcher.from_config(app_config)
+    cv_store = CVStore.from_config(app_config)
+
+
+def get_llm(model_provider: str | None = None, model_name: str | None = None, **kwargs):
+    model_provider = model_provider or app_config.llm.provider
+    model_name = model_name or app_config.llm.model_name
+    if "base_url" not in kwargs and getattr(app_config.llm, "base_url", None):
+        kwargs["base_url"] = app_config.llm.base_url
+    return llm_pool.get(model=model_name, model_provider=model_provider, **kwargs)
+
+
+warmup = Warmup.from_config(
+    app_config,
+    search_rag_manager=search_rag_manager,
+    llm_factory=get_llm,
+    llm_pool=llm_pool,
+    agent_kwargs={"search_rag_manager": search_rag_manager, "semantic_cache": skill_requirement_cache},
+)
+
+
+async def _warmup():
+    with phase("warmup"):
+        await warmup.arun()
+    log_startup_report()
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the background components and warmup, and close everything on shutdown."""
+    warmup_task: asyncio.Task | None = None
+    with phase("startup"):
+        cv_store.start()
+        await job_manager.start()
+    if warmup.enabled:
+        warmup_task = asyncio.create_task(_warmup())
+    else:
+        log_startup_report()
+    try:
+        yield
+    finally:
+        if warmup_task is not None and not warmup_task.done():
+            warmup_task.cancel()
+        await job_manager.stop()
+        await content_prefetcher.aclose()
+        cv_store.close()
+        page_fetcher.close()
+        await llm_pool.aclose()
+
+
+app = FastAPI(default_response_class=FastJSONResponse, lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -29,15 +114,99 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(UsageMiddleware)
 
-def get_llm(model_provider: str | None = None, model_name: str | None = None, **kwargs):
-    model_provider = model_provider or app_config.llm.provider
-    model_name = model_name or app_config.llm.model_name
-    if "base_url" not in kwargs and getattr(app_config.llm, "base_url", None):
-        kwargs["base_url"] = app_config.llm.base_url
-    return LLMFactory.create(model=model_name, model_provider=model_provider, **kwargs)
 
-UPLOAD_LOCATION = "/mnt/datadrive/tfwang/code/llm-mentor/data/cv/"
+def _collect_component_metrics():
+    """Expose the counters the shared components already keep as gauges at scrape time."""
+    samples = []
+    if response_cache is not None:
+        response_stats = response_cache.stats()
+        samples += stats_samples("cache", {"cache": "agent_responses"}, response_stats)
+        for agent, counters in response_stats.get("by_agent", {}).items():
+            samples += stats_samples("agent_response_cache", {"agent": agent}, counters)
+    if skill_requirement_cache is not None:
+        samples += stats_samples("cache", {"cache": "skill_requirements"}, skill_requirement_cache.stats())
+    samples += stats_samples("cache", {"cache": "cv_text"}, cv_store.stats()["text_cache"])
+    samples += stats_samples("cache", {"cache": "prefetch"}, content_prefetcher.stats())
+    samples += stats_samples("cache", {"cache": "llm_clients"}, llm_pool.stats())
+    samples += stats_samples("cache", {"cache": "agents"}, default_agent_registry.stats())
+    samples += stats_samples("page_fetcher", {}, page_fetcher.stats())
+    samples += stats_samples("search_rag", {}, search_rag_manager.stats())
+    if isinstance(search_rag_manager.embedder, CachedEmbeddings):
+        samples += stats_samples("cache", {"cache": "embeddings"}, search_rag_manager.embedder.stats())
+    search_runner = search_rag_manager.search_runner
+    if search_runner is not None and search_runner.result_cache is not None:
+        samples += stats_samples("cache", {"cache": "search_results"}, search_runner.result_cache.stats())
+    if search_runner is not None and search_runner.page_cache is not None:
+        samples += stats_samples("cache", {"cache": "pages"}, search_runner.page_cache.stats())
+    samples += stats_samples("single_flight", {}, default_single_flight.stats())
+    samples += stats_samples("jobs", {}, job_manager.stats())
+    samples += [("startup_phase_seconds", {"phase": name}, seconds) for name, seconds in startup_phases().items()]
+    samples.append(("warmup_ready", {}, float(warmup.ready)))
+    if llm_scheduler is not None:
+        for provider, limiter_stats in llm_scheduler.stats().items():
+            samples += stats_samples("llm_scheduler", {"provider": provider}, limiter_stats)
+    return samples
+
+
+metrics_registry.register_collector(_collect_component_metrics)
+
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _content_cache_key(learner_profile, learning_session, use_search=True, with_quiz=True, quiz_counts=None):
+    options = {"use_search": use_search, "with_quiz": with_quiz}
+    if with_quiz:
+        options["quiz_counts"] = resolve_quiz_counts(quiz_counts)
+    return content_prefetcher.make_key(learner_profile, learning_session, options)
+
+
+def _schedule_content_prefetch(learner_profile, learning_path, learning_session, use_search=True, with_quiz=True, quiz_counts=None):
+    """Generate ``learning_session`` in the background so the content endpoints can serve it from cache."""
+    prefetch_config = app_config.get("prefetch", {}) or {}
+    if not prefetch_config.get("enabled", True):
+        return "disabled"
+    # Prefetched content must match what the interactive pipeline would show, quiz mix included.
+    quiz_counts = resolve_quiz_counts({**(prefetch_config.get("quiz_counts") or {}), **{k: v for k, v in (quiz_counts or {}).items() if v is not None}})
+    key = _content_cache_key(learner_profile, learning_session, use_search, with_quiz, quiz_counts)
+
+    def generate():
+        return acreate_learning_content_with_llm(
+            get_llm(), learner_profile, learning_path, learning_session,
+            with_quiz=with_quiz, use_search=use_search, max_workers=prefetch_config.get("max_workers", 2),
+            search_rag_manager=search_rag_manager, quiz_counts=quiz_counts,
+        )
+
+    return content_prefetcher.schedule(key, content_prefetcher.profile_fingerprint(learner_profile), generate)
+
+
+def _trace_requested(flag: bool, header: str | None) -> bool:
+    return flag or (header or "").strip().lower() in ("1", "true", "yes")
+
+
+def _request_trace(name: str, enabled: bool):
+    """Start a span trace for this request when opted in; otherwise a no-op context yielding None."""
+    return start_trace(name) if enabled else contextlib.nullcontext()
+
+
+def _export_trace(trace) -> dict:
+    exported = trace.to_dict()
+    output_path = (app_config.get("tracing", {}) or {}).get("output_path")
+    if output_path:
+        write_trace_jsonl(output_path, exported)
+    return exported
+
+
+async def _sse_stream(events):
+    """Encode typed ``{"event", "data"}`` dicts as SSE, reporting failures as an ``error`` event."""
+    try:
+        async for event in events:
+            yield format_sse_event(event["event"], event["data"])
+    except Exception as e:
+        yield format_sse_event("error", {"detail": str(e)})
 
 @app.get("/list-llm-models")
 async def list_llm_models():
@@ -51,18 +220,37 @@ async def list_llm_models():
     except Exception as e:
         return JSONResponse(status_code=500, content={"detail": str(e)})
 
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: 503 until the startup warmup has finished, so traffic only reaches warm workers."""
+    if not warmup.ready:
+        return JSONResponse(status_code=503, content={"status": warmup.state, "warmup": warmup.stats()})
+    return {"status": "ready", "warmup": warmup.stats()}
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/usage")
+async def usage():
+    """Token and prompt-size totals per agent, per endpoint and per prompt variable since startup."""
+    return default_usage_tracker.stats()
+
 @app.post("/chat-with-tutor")
 async def chat_with_autor(request: ChatWithAutorRequest):
     llm = get_llm(request.model_provider, request.model_name)
     learner_profile = request.learner_profile
+    if not isinstance(request.messages, list):
+        return JSONResponse(status_code=400, content={"detail": "messages must be a JSON array"})
     try:
-        if isinstance(request.messages, str) and request.messages.strip().startswith("["):
-            converted_messages = ast.literal_eval(request.messages)
-        else:
-            return JSONResponse(status_code=400, content={"detail": "messages must be a JSON array string"})
-        response = chat_with_tutor_with_llm(
+        response = await achat_with_tutor_with_llm(
             llm,
-            converted_messages,
+            request.messages,
             learner_profile,
             search_rag_manager=search_rag_manager,
             use_search=True,
@@ -71,11 +259,25 @@ async def chat_with_autor(request: ChatWithAutorRequest):
     except Exception as e:
         return JSONResponse(status_code=500, content={"detail": str(e)})
 
+@app.post("/chat-with-tutor/stream")
+async def chat_with_tutor_stream(request: ChatWithAutorRequest):
+    llm = get_llm(request.model_provider, request.model_name)
+    if not isinstance(request.messages, list):
+        return JSONResponse(status_code=400, content={"detail": "messages must be a JSON array"})
+    events = astream_chat_with_tutor_with_llm(
+        llm,
+        request.messages,
+        request.learner_profile,
+        search_rag_manager=search_rag_manager,
+        use_search=True,
+    )
+    return StreamingResponse(_sse_stream(events), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @app.post("/refine-learning-goal")
 async def refine_learning_goal(request: LearningGoalRefinementRequest):
     llm = get_llm(request.model_provider, request.model_name)
     try:
-        refined_learning_goal = refine_learning_goal_with_llm(llm, request.learning_goal, request.learner_information)
+        refined_learning_goal = await arefine_learning_goal_with_llm(llm, request.learning_goal, request.learner_information)
         return refined_learning_goal
     except Exception as e:
         return JSONResponse(status_code=500, content={"detail": str(e)})
@@ -87,43 +289,37 @@ async def identify_skill_gap_with_info(request: SkillGapIdentificationRequest):
     learner_information = request.learner_information
     skill_requirements = request.skill_requirements
     try:
-        if isinstance(skill_requirements, str) and skill_requirements.strip():
-            skill_requirements = ast.literal_eval(skill_requirements)
         if not isinstance(skill_requirements, dict):
             skill_requirements = None
-        skill_gaps, skill_requirements = identify_skill_gap_with_llm(
-            llm, learning_goal, learner_information, skill_requirements
+        skill_gaps, skill_requirements = await aidentify_skill_gap_with_llm(
+            llm, learning_goal, learner_information, skill_requirements, semantic_cache=skill_requirement_cache
         )
         results = {**skill_gaps, **skill_requirements}
         return results
     except Exception as e:
-        print(e)
+        logger.exception("Skill gap identification failed.")
         return JSONResponse(status_code=500, content={"detail": str(e)})
 
 
 @app.post("/identify-skill-gap")
 async def identify_skill_gap(goal: str = Form(...), cv: UploadFile = File(...), model_provider: str = Form("openai"), model_name: str = Form("gpt-4o")):
     llm = get_llm(model_provider, model_name)
-    mapper = SkillRequirementMapper(llm)
-    skill_gap_identifier = SkillGapIdentifier(llm)
+    mapper = SkillRequirementMapper.shared(llm, semantic_cache=skill_requirement_cache)
+    skill_gap_identifier = SkillGapIdentifier.shared(llm)
     try:
-        file_location = f"{UPLOAD_LOCATION}{cv.filename}"
-#         with open(file_location, "wb") as file_object:
-#             file_object.write(await cv.read())
-        with open(file_location, "wb") as file_object:
-            file_object.write(await cv.read())
-        # print(file_location)
-        cv_text = extract_text_from_pdf(file_location)  
-        skill_requirements = mapper.map_goal_to_skill({
+        cv_id, cv_text = await cv_store.aingest(await cv.read())
+        skill_requirements = await mapper.amap_goal_to_skill({
             "learning_goal": goal
         })
-        skill_gaps = skill_gap_identifier.identify_skill_gap({
+        skill_gaps = await skill_gap_identifier.aidentify_skill_gap({
             "learning_goal": goal,
             "skill_requirements": skill_requirements,
             "learner_information": cv_text
         })
-        results = {**skill_gaps, **skill_requirements}
+        results = {**skill_gaps, **skill_requirements, "cv_id": cv_id}
         return results
+    except CVRejectedError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
     except Exception as e:
         return JSONResponse(status_code=500, content={"detail": str(e)})
 
@@ -135,16 +331,10 @@ async def create_learner_profile_with_info(request: LearnerProfileInitialization
     skill_gaps = request.skill_gaps
     try:
         if isinstance(learner_information, str):
-            try:
-                learner_information = ast.literal_eval(learner_information)
-            except Exception:
-                learner_information = {"raw": learner_information}
+            learner_information = {"raw": learner_information}
         if isinstance(skill_gaps, str):
-            try:
-                skill_gaps = ast.literal_eval(skill_gaps)
-            except Exception:
-                skill_gaps = {"raw": skill_gaps}
-        learner_profile = initialize_learner_profile_with_llm(
+            skill_gaps = {"raw": skill_gaps}
+        learner_profile = await ainitialize_learner_profile_with_llm(
             llm, learning_goal, learner_information, skill_gaps
         )
         return {"learner_profile": learner_profile}
@@ -154,17 +344,16 @@ async def create_learner_profile_with_info(request: LearnerProfileInitialization
 @app.post("/create-learner-profile")
 async def create_learner_profile(request: LearnerProfileInitializationRequest):
     llm = get_llm(request.model_provider, request.model_name)
-    file_location = f"{UPLOAD_LOCATION}{request.cv_path}"
-    learner_information = extract_text_from_pdf(file_location)
+    try:
+        _, learner_information = await cv_store.aload(request.cv_path)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     learning_goal = request.learning_goal
     skill_gaps = request.skill_gaps
     try:
         if isinstance(skill_gaps, str):
-            try:
-                skill_gaps = ast.literal_eval(skill_gaps)
-            except Exception:
-                skill_gaps = {"raw": skill_gaps}
-        learner_profile = initialize_learner_profile_with_llm(
+            skill_gaps = {"raw": skill_gaps}
+        learner_profile = await ainitialize_learner_profile_with_llm(
             llm, learning_goal, {"raw": learner_information}, skill_gaps
         )
         return {"learner_profile": learner_profile}
@@ -179,21 +368,27 @@ async def update_learner_profile(request: LearnerProfileUpdateRequest):
     learner_information = request.learner_information
     session_information = request.session_information
     try:
-        for name in ("learner_profile", "learner_interactions", "learner_information", "session_information"):
-            val = locals()[name]
-            if isinstance(val, str) and val.strip():
-                try:
-                    locals()[name] = ast.literal_eval(val)
-                except Exception:
-                    if name != "session_information":
-                        locals()[name] = {"raw": val}
-        learner_profile = update_learner_profile_with_llm(
+        if isinstance(learner_profile, str) and learner_profile.strip():
+            learner_profile = {"raw": learner_profile}
+        if isinstance(learner_interactions, str) and learner_interactions.strip():
+            learner_interactions = {"raw": learner_interactions}
+        if isinstance(learner_information, str) and learner_information.strip():
+            learner_information = {"raw": learner_information}
+        previous_fingerprint = content_prefetcher.profile_fingerprint(learner_profile)
+        learner_profile = await aupdate_learner_profile_with_llm(
             llm,
-            locals()["learner_profile"],
-            locals()["learner_interactions"],
-            locals()["learner_information"],
-            locals()["session_information"],
+            learner_profile,
+            learner_interactions,
+            learner_information,
+            session_information,
         )
+        if content_prefetcher.profile_fingerprint(learner_profile) != previous_fingerprint:
+            content_prefetcher.invalidate_profile(previous_fingerprint)
+        if request.learning_path:
+            current_session_id = session_information.get("id") if isinstance(session_information, dict) else None
+            next_session = next_learning_path_session(request.learning_path, current_session_id)
+            if next_session is not None:
+                _schedule_content_prefetch(learner_profile, request.learning_path, next_session)
         return {"learner_profile": learner_profile}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -204,11 +399,9 @@ async def schedule_learning_path(request: LearningPathSchedulingRequest):
     learner_profile = request.learner_profile
     session_count = request.session_count
     try:
-        if isinstance(learner_profile, str) and learner_profile.strip():
-            learner_profile = ast.literal_eval(learner_profile)
         if not isinstance(learner_profile, dict):
             learner_profile = {}
-        learning_path = schedule_learning_path_with_llm(llm, learner_profile, session_count)
+        learning_path = await aschedule_learning_path_with_llm(llm, learner_profile, session_count)
         return learning_path
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -221,18 +414,9 @@ async def reschedule_learning_path(request: LearningPathReschedulingRequest):
     session_count = request.session_count
     other_feedback = request.other_feedback
     try:
-        if isinstance(learner_profile, str) and learner_profile.strip():
-            learner_profile = ast.literal_eval(learner_profile)
         if not isinstance(learner_profile, dict):
             learner_profile = {}
-        if isinstance(learning_path, str) and learning_path.strip():
-            learning_path = ast.literal_eval(learning_path)
-        if isinstance(other_feedback, str) and other_feedback.strip():
-            try:
-                other_feedback = ast.literal_eval(other_feedback)
-            except Exception:
-                pass
-        learning_path = reschedule_learning_path_with_llm(
+        learning_path = await areschedule_learning_path_with_llm(
             llm, learning_path, learner_profile, session_count, other_feedback
         )
         return learning_path
@@ -245,14 +429,8 @@ async def explore_knowledge_points(request: KnowledgePointExplorationRequest):
     learner_profile = request.learner_profile
     learning_path = request.learning_path
     learning_session = request.learning_session
-    if isinstance(learner_profile, str) and learner_profile.strip():
-        learner_profile = ast.literal_eval(learner_profile)
-    if isinstance(learning_path, str) and learning_path.strip():
-        learning_path = ast.literal_eval(learning_path)
-    if isinstance(learning_session, str) and learning_session.strip():
-        learning_session = ast.literal_eval(learning_session)
     try:
-        knowledge_points = explore_knowledge_points_with_llm(llm, learner_profile, learning_path, learning_session)
+        knowledge_points = await aexplore_knowledge_points_with_llm(llm, learner_profile, learning_path, learning_session)
         return knowledge_points
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -267,13 +445,16 @@ async def draft_knowledge_point(request: KnowledgePointDraftingRequest):
     knowledge_point = request.knowledge_point
     use_search = request.use_search
     try:
-        knowledge_draft = draft_knowledge_point_with_llm(llm, learner_profile, learning_path, learning_session, knowledge_points, knowledge_point, use_search)
+        knowledge_draft = await adraft_knowledge_point_with_llm(
+            llm, learner_profile, learning_path, learning_session, knowledge_points, knowledge_point, use_search,
+            search_rag_manager=search_rag_manager,
+        )
         return {"knowledge_draft": knowledge_draft}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/draft-knowledge-points")
-async def draft_knowledge_points(request: KnowledgePointsDraftingRequest):
+async def draft_knowledge_points(request: KnowledgePointsDraftingRequest, x_trace: str | None = Header(None)):
     llm = get_llm()
     learner_profile = request.learner_profile
     learning_path = request.learning_path
@@ -282,8 +463,15 @@ async def draft_knowledge_points(request: KnowledgePointsDraftingRequest):
     use_search = request.use_search
     allow_parallel = request.allow_parallel
     try:
-        knowledge_drafts = draft_knowledge_points_with_llm(llm, learner_profile, learning_path, learning_session, knowledge_points, allow_parallel, use_search)
-        return {"knowledge_drafts": knowledge_drafts}
+        with _request_trace("draft-knowledge-points", _trace_requested(request.trace, x_trace)) as trace:
+            knowledge_drafts = await adraft_knowledge_points_with_llm(
+                llm, learner_profile, learning_path, learning_session, knowledge_points, allow_parallel, use_search,
+                search_rag_manager=search_rag_manager,
+            )
+        response = {"knowledge_drafts": knowledge_drafts}
+        if trace is not None:
+            response["trace"] = _export_trace(trace)
+        return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -297,7 +485,7 @@ async def integrate_learning_document(request: LearningDocumentIntegrationReques
     knowledge_drafts = request.knowledge_drafts
     output_markdown = request.output_markdown
     try:
-        learning_document = integrate_learning_document_with_llm(llm, learner_profile, learning_path, learning_session, knowledge_points, knowledge_drafts, output_markdown)
+        learning_document = await aintegrate_learning_document_with_llm(llm, learner_profile, learning_path, learning_session, knowledge_points, knowledge_drafts, output_markdown)
         return {"learning_document": learning_document}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -312,13 +500,13 @@ async def generate_document_quizzes(request: KnowledgeQuizGenerationRequest):
     true_false_count = request.true_false_count
     short_answer_count = request.short_answer_count
     try:
-        document_quiz = generate_document_quizzes_with_llm(llm, learner_profile, learning_document, single_choice_count, multiple_choice_count, true_false_count, short_answer_count)
+        document_quiz = await agenerate_document_quizzes_with_llm(llm, learner_profile, learning_document, single_choice_count, multiple_choice_count, true_false_count, short_answer_count)
         return {"document_quiz": document_quiz}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/tailor-knowledge-content")
-async def tailor_knowledge_content(request: TailoredContentGenerationRequest):
+async def tailor_knowledge_content(request: TailoredContentGenerationRequest, x_trace: str | None = Header(None)):
     llm = get_llm()
     learning_path = request.learning_path
     learner_profile = request.learner_profile
@@ -326,14 +514,193 @@ async def tailor_knowledge_content(request: TailoredContentGenerationRequest):
     use_search = request.use_search
     allow_parallel = request.allow_parallel
     with_quiz = request.with_quiz
+    quiz_counts = resolve_quiz_counts(request.model_dump())
+    cache_key = _content_cache_key(learner_profile, learning_session, use_search, with_quiz, quiz_counts)
     try:
-        tailored_content = create_learning_content_with_llm(
-            llm, learner_profile, learning_path, learning_session, allow_parallel=allow_parallel, with_quiz=with_quiz, use_search=use_search
-        )
-        return {"tailored_content": tailored_content}
+        with _request_trace("tailor-knowledge-content", _trace_requested(request.trace, x_trace)) as trace:
+            if request.regenerate:
+                content_prefetcher.invalidate(cache_key)
+                cached_content = None
+            else:
+                cached_content = await content_prefetcher.aget(cache_key)
+            if cached_content is not None or request.prefetched_only:
+                response = {"tailored_content": cached_content, "prefetched": cached_content is not None}
+            else:
+                tailored_content = await acreate_learning_content_with_llm(
+                    llm, learner_profile, learning_path, learning_session, allow_parallel=allow_parallel, with_quiz=with_quiz, use_search=use_search,
+                    search_rag_manager=search_rag_manager, quiz_counts=quiz_counts,
+                )
+                response = {"tailored_content": tailored_content, "prefetched": False}
+        if trace is not None:
+            response["trace"] = _export_trace(trace)
+        return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    
+
+@app.post("/tailor-knowledge-content/stream")
+async def tailor_knowledge_content_stream(request: TailoredContentGenerationRequest):
+    llm = get_llm()
+    quiz_counts = resolve_quiz_counts(request.model_dump())
+    cache_key = _content_cache_key(request.learner_profile, request.learning_session, request.use_search, request.with_quiz, quiz_counts)
+    if request.regenerate:
+        content_prefetcher.invalidate(cache_key)
+        cached_content = None
+    else:
+        cached_content = await content_prefetcher.aget(cache_key)
+    if cached_content is not None:
+        async def cached_events():
+            yield {"event": "done", "data": {"tailored_content": cached_content}}
+        return StreamingResponse(_sse_stream(cached_events()), media_type="text/event-stream", headers=SSE_HEADERS)
+    events = astream_learning_content_with_llm(
+        llm,
+        request.learner_profile,
+        request.learning_path,
+        request.learning_session,
+        allow_parallel=request.allow_parallel,
+        with_quiz=request.with_quiz,
+        use_search=request.use_search,
+        search_rag_manager=search_rag_manager,
+        quiz_counts=quiz_counts,
+    )
+    return StreamingResponse(_sse_stream(events), media_type="text/event-stream", headers=SSE_HEADERS)
+
+def _learning_path_content_events(request: dict):
+    batch_config = app_config.get("batch", {}) or {}
+    return astream_learning_path_content_with_llm(
+        get_llm(),
+        request["learner_profile"],
+        request["learning_path"],
+        session_ids=request.get("session_ids"),
+        include_learned=request.get("include_learned", False),
+        allow_parallel=request.get("allow_parallel", True),
+        with_quiz=request.get("with_quiz", True),
+        use_search=request.get("use_search", True),
+        max_concurrency=request.get("max_concurrency") or batch_config.get("max_concurrency", 8),
+        max_concurrent_sessions=batch_config.get("max_concurrent_sessions"),
+        search_rag_manager=search_rag_manager,
+    )
+
+@app.post("/tailor-learning-path-content")
+async def tailor_learning_path_content(request: LearningPathContentGenerationRequest):
+    try:
+        select_learning_path_sessions(request.learning_path, request.session_ids, request.include_learned)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        results = []
+        async for event in _learning_path_content_events(request.model_dump()):
+            if event["event"] == "done":
+                results = event["data"]["results"]
+        return {"results": results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/tailor-learning-path-content/stream")
+async def tailor_learning_path_content_stream(request: LearningPathContentGenerationRequest):
+    events = _learning_path_content_events(request.model_dump())
+    return StreamingResponse(_sse_stream(events), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.post("/prefetch-learning-content")
+async def prefetch_learning_content(request: LearningContentPrefetchRequest):
+    try:
+        if request.session_id is not None:
+            sessions = select_learning_path_sessions(request.learning_path, [request.session_id])
+            session = sessions[0] if sessions else None
+        else:
+            session = next_learning_path_session(request.learning_path, request.current_session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if session is None:
+        return {"status": "none", "session_id": None}
+    status = _schedule_content_prefetch(
+        request.learner_profile, request.learning_path, session, request.use_search, request.with_quiz,
+        request.model_dump(include={"single_choice_count", "multiple_choice_count", "true_false_count", "short_answer_count"}),
+    )
+    return {"status": status, "session_id": session.get("id")}
+
+async def _run_tailor_knowledge_content_job(request: dict, report):
+    llm = get_llm()
+    result = None
+    async for event in astream_learning_content_with_llm(
+        llm,
+        request["learner_profile"],
+        request["learning_path"],
+        request["learning_session"],
+        allow_parallel=request.get("allow_parallel", True),
+        with_quiz=request.get("with_quiz", True),
+        use_search=request.get("use_search", True),
+        search_rag_manager=search_rag_manager,
+        quiz_counts=resolve_quiz_counts(request),
+    ):
+        if event["event"] == "done":
+            result = event["data"]
+        else:
+            report(event["event"], event["data"])
+    return result
+
+async def _run_tailor_learning_path_content_job(request: dict, report):
+    result = None
+    async for event in _learning_path_content_events(request):
+        if event["event"] == "done":
+            result = event["data"]
+        else:
+            report(event["event"], event["data"])
+    return result
+
+async def _run_draft_knowledge_points_job(request: dict, report):
+    llm = get_llm()
+    knowledge_points = parse_legacy_payload(request["knowledge_points"])
+    knowledge_drafts = [None] * len(knowledge_points)
+    async for index, draft in astream_knowledge_drafts_with_llm(
+        llm,
+        request["learner_profile"],
+        request["learning_path"],
+        request["learning_session"],
+        knowledge_points,
+        allow_parallel=request.get("allow_parallel", True),
+        use_search=request.get("use_search", True),
+        search_rag_manager=search_rag_manager,
+    ):
+        knowledge_drafts[index] = draft
+        report("knowledge_draft", {"index": index, "knowledge_draft": draft})
+    return {"knowledge_drafts": knowledge_drafts}
+
+job_manager.register("tailor_knowledge_content", _run_tailor_knowledge_content_job)
+job_manager.register("draft_knowledge_points", _run_draft_knowledge_points_job)
+job_manager.register("tailor_learning_path_content", _run_tailor_learning_path_content_job)
+
+async def _submit_job(kind: str, request):
+    try:
+        job, created = await job_manager.submit(kind, request.model_dump())
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"job_id": job["job_id"], "status": job["status"], "deduplicated": not created}
+
+@app.post("/jobs/tailor-knowledge-content")
+async def submit_tailor_knowledge_content_job(request: TailoredContentGenerationRequest):
+    return await _submit_job("tailor_knowledge_content", request)
+
+@app.post("/jobs/tailor-learning-path-content")
+async def submit_tailor_learning_path_content_job(request: LearningPathContentGenerationRequest):
+    return await _submit_job("tailor_learning_path_content", request)
+
+@app.post("/jobs/draft-knowledge-points")
+async def submit_draft_knowledge_points_job(request: KnowledgePointsDraftingRequest):
+    return await _submit_job("draft_knowledge_points", request)
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    if await job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return StreamingResponse(_sse_stream(job_manager.subscribe(job_id)), media_type="text/event-stream", headers=SSE_HEADERS)
+
 if __name__ == "__main__":
     server_cfg = app_config.get("server", {})
     host = app_config.get("server", {}).get("host", "127.0.0.1")
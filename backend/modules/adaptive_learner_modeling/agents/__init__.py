@@ -2,10 +2,14 @@ from .adaptive_learning_profiler import (
     AdaptiveLearnerProfiler,
     initialize_learner_profile_with_llm,
     update_learner_profile_with_llm,
+    ainitialize_learner_profile_with_llm,
+    aupdate_learner_profile_with_llm,
 )
 
 __all__ = [
     "AdaptiveLearnerProfiler",
     "initialize_learner_profile_with_llm",
     "update_learner_profile_with_llm",
+    "ainitialize_learner_profile_with_llm",
+    "aupdate_learner_profile_with_llm",
 ]
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import ast
-from typing import Any, List, Mapping, Optional, Sequence
+import time
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Sequence
 
 from pydantic import BaseModel, field_validator
 
 from base import BaseAgent
 from base.search_rag import SearchRagManager, format_docs
+from utils.payload import parse_legacy_payload
 from modules.ai_chatbot_tutor.prompts.ai_chatbot_tutor import (
 	ai_tutor_chatbot_system_prompt,
 	ai_tutor_chatbot_task_prompt,
@@ -16,11 +17,9 @@ from modules.ai_chatbot_tutor.prompts.ai_chatbot_tutor import (
 def _stringify_history(messages: Any) -> str:
 	if messages is None or len(messages) == 0:
 		return ""
+	messages = parse_legacy_payload(messages)
 	if isinstance(messages, str):
-		try:
-			messages = ast.literal_eval(messages)
-		except Exception:
-			return messages
+		return messages
 	lines: List[str] = []
 	for m in list(messages or []):
 		if isinstance(m, Mapping):
@@ -36,11 +35,9 @@ def _stringify_history(messages: Any) -> str:
 def _last_user_query(messages: Any) -> str:
 	if messages is None:
 		return ""
+	messages = parse_legacy_payload(messages)
 	if isinstance(messages, str):
-		try:
-			messages = ast.literal_eval(messages)
-		except Exception:
-			return messages
+		return messages
 	for m in reversed(list(messages or [])):
 		if isinstance(m, Mapping) and str(m.get("role", "")).lower() == "user":
 			return str(m.get("content", "")).strip()
@@ -72,6 +69,8 @@ class TutorChatPayload(BaseModel):
 
 class AITutorChatbot(BaseAgent):
 	name: str = "AITutorChatbot"
+	# Replies depend on live retrieval and conversation state; never replay them from the response cache.
+	cache_responses: bool = False
 
 	def __init__(self, model: Any, *, search_rag_manager: Optional[SearchRagManager] = None):
 		super().__init__(model=model, system_prompt=ai_tutor_chatbot_system_prompt, jsonalize_output=False)
@@ -108,6 +107,77 @@ class AITutorChatbot(BaseAgent):
 		raw_reply = self.invoke(input_vars, task_prompt=ai_tutor_chatbot_task_prompt)
 		return raw_reply
 
+	async def achat(self, payload: TutorChatPayload | Mapping[str, Any] | str):
+		"""Async twin of :meth:`chat`; retrieval and generation do not block the event loop."""
+		input_vars, _ = await self._aprepare_inputs(payload)
+		return await self.ainvoke(input_vars, task_prompt=ai_tutor_chatbot_task_prompt)
+
+	async def astream_chat(self, payload: TutorChatPayload | Mapping[str, Any] | str) -> AsyncIterator[Dict[str, Any]]:
+		"""Stream a chat turn as typed events.
+
+		Retrieval completes before generation starts, then one ``token`` event is
+		yielded per text delta and a final ``done`` event carries the retrieval
+		sources and timing (milliseconds).
+		"""
+		started = time.perf_counter()
+		input_vars, docs = await self._aprepare_inputs(payload)
+		retrieved = time.perf_counter()
+		first_token = None
+		async for delta in self.astream(input_vars, task_prompt=ai_tutor_chatbot_task_prompt):
+			if first_token is None:
+				first_token = time.perf_counter()
+			yield {"event": "token", "data": {"delta": delta}}
+		finished = time.perf_counter()
+		yield {
+			"event": "done",
+			"data": {
+				"sources": _describe_sources(docs),
+				"timing": {
+					"retrieval_ms": round((retrieved - started) * 1000, 1),
+					"first_token_ms": round((first_token - started) * 1000, 1) if first_token else None,
+					"total_ms": round((finished - started) * 1000, 1),
+				},
+			},
+		}
+
+	async def _aprepare_inputs(self, payload: TutorChatPayload | Mapping[str, Any] | str):
+		if not isinstance(payload, TutorChatPayload):
+			payload = TutorChatPayload.model_validate(payload)
+
+		data = payload.model_dump()
+		messages = data.get("messages")
+		history_text = _stringify_history(messages)
+		query = _last_user_query(messages)
+
+		docs: List[Any] = []
+		external_context = data.get("external_resources") or ""
+		if self.search_rag_manager is not None and query:
+			try:
+				if data.get("use_search", True):
+					docs = await self.search_rag_manager.ainvoke(query)
+				else:
+					docs = await self.search_rag_manager.aretrieve(query, k=max(1, int(data.get("top_k", 5))))
+				context = format_docs(docs)
+				if context:
+					external_context = f"{external_context}\n{context}" if external_context else context
+			except Exception:
+				docs = []
+
+		input_vars = {
+			"learner_profile": data.get("learner_profile", ""),
+			"messages": history_text,
+			"external_resources": external_context,
+		}
+		return input_vars, docs
+
+
+def _describe_sources(docs: Sequence[Any]) -> List[Dict[str, Any]]:
+	sources: List[Dict[str, Any]] = []
+	for doc in docs or []:
+		metadata = getattr(doc, "metadata", None) or {}
+		sources.append({"title": metadata.get("title"), "source": metadata.get("source")})
+	return sources
+
 
 def chat_with_tutor_with_llm(
 	llm: Any,
@@ -124,7 +194,7 @@ def chat_with_tutor_with_llm(
 	- If provided and use_search=False, performs vectorstore-only retrieval.
 	- If not provided, replies without external context.
 	"""
-	agent = AITutorChatbot(llm, search_rag_manager=search_rag_manager)
+	agent = AITutorChatbot.shared(llm, search_rag_manager=search_rag_manager)
 	payload = {
 		"learner_profile": learner_profile,
 		"messages": messages,
@@ -132,3 +202,43 @@ def chat_with_tutor_with_llm(
 		"top_k": top_k,
 	}
 	return agent.chat(payload)
+
+
+async def achat_with_tutor_with_llm(
+	llm: Any,
+	messages: Optional[Sequence[Mapping[str, Any]]] | str = None,
+	learner_profile: Any = "",
+	*,
+	search_rag_manager: Optional[SearchRagManager] = None,
+	use_search: bool = True,
+	top_k: int = 5,
+):
+	"""Async twin of :func:`chat_with_tutor_with_llm`."""
+	agent = AITutorChatbot.shared(llm, search_rag_manager=search_rag_manager)
+	payload = {
+		"learner_profile": learner_profile,
+		"messages": messages,
+		"use_search": use_search,
+		"top_k": top_k,
+	}
+	return await agent.achat(payload)
+
+
+def astream_chat_with_tutor_with_llm(
+	llm: Any,
+	messages: Optional[Sequence[Mapping[str, Any]]] | str = None,
+	learner_profile: Any = "",
+	*,
+	search_rag_manager: Optional[SearchRagManager] = None,
+	use_search: bool = True,
+	top_k: int = 5,
+) -> AsyncIterator[Dict[str, Any]]:
+	"""Streaming variant of :func:`achat_with_tutor_with_llm`; see :meth:`AITutorChatbot.astream_chat`."""
+	agent = AITutorChatbot.shared(llm, search_rag_manager=search_rag_manager)
+	payload = {
+		"learner_profile": learner_profile,
+		"messages": messages,
+		"use_search": use_search,
+		"top_k": top_k,
+	}
+	return agent.astream_chat(payload)
@@ -99,7 +99,7 @@ def create_ground_truth_profile_with_llm(
     learner_information: Union[str, Mapping[str, Any]] = "",
     skill_requirements: Optional[Union[str, Mapping[str, Any]]] = None,
 ) -> Dict[str, Any]:
-    creator = GroundTruthProfileCreator(llm)
+    creator = GroundTruthProfileCreator.shared(llm)
     return creator.create_profile(
         {
             "learning_goal": learning_goal,
@@ -72,7 +72,7 @@ def simulate_learner_interactions_with_llm(
     """Simulate interactions for multiple sessions and persist logs."""
 
     print("==== Step 2: Simulate Learner Interactions ====")
-    learner_behavior_simulator = LearnerInteractionSimulator(llm)
+    learner_behavior_simulator = LearnerInteractionSimulator.shared(llm)
     behavior_logs: list[Dict[str, Any]] = []
 
     for session in range(1, session_count + 1):
@@ -6,21 +6,27 @@ from .learning_path_scheduler import (
 	schedule_learning_path_with_llm,
 	refine_learning_path_with_llm,
 	reschedule_learning_path_with_llm,
+	aschedule_learning_path_with_llm,
+	arefine_learning_path_with_llm,
+	areschedule_learning_path_with_llm,
 )
 from .document_quiz_generator import (
 	DocumentQuizGenerator,
 	DocumentQuizPayload,
 	generate_document_quizzes_with_llm,
+	agenerate_document_quizzes_with_llm,
 )
 from .goal_oriented_knowledge_explorer import (
 	GoalOrientedKnowledgeExplorer,
 	KnowledgeExplorePayload,
 	explore_knowledge_points_with_llm,
+	aexplore_knowledge_points_with_llm,
 )
 from .learning_document_integrator import (
 	LearningDocumentIntegrator,
 	IntegratedDocPayload,
 	integrate_learning_document_with_llm,
+	aintegrate_learning_document_with_llm,
 	prepare_markdown_document,
 )
 from .learning_content_creator import (
@@ -29,12 +35,23 @@ from .learning_content_creator import (
 	ContentDraftPayload,
 	prepare_content_outline_with_llm,
 	create_learning_content_with_llm,
+	aprepare_content_outline_with_llm,
+	acreate_learning_content_with_llm,
+	astream_learning_content_with_llm,
+	resolve_quiz_counts,
+	select_learning_path_sessions,
+	next_learning_path_session,
+	acreate_learning_path_content_with_llm,
+	astream_learning_path_content_with_llm,
 )
 from .search_enhanced_knowledge_drafter import (
 	SearchEnhancedKnowledgeDrafter,
 	KnowledgeDraftPayload,
 	draft_knowledge_point_with_llm,
 	draft_knowledge_points_with_llm,
+	adraft_knowledge_point_with_llm,
+	adraft_knowledge_points_with_llm,
+	astream_knowledge_drafts_with_llm,
 )
 
 __all__ = [
@@ -46,24 +63,41 @@ __all__ = [
 	"schedule_learning_path_with_llm",
 	"refine_learning_path_with_llm",
 	"reschedule_learning_path_with_llm",
+	"aschedule_learning_path_with_llm",
+	"arefine_learning_path_with_llm",
+	"areschedule_learning_path_with_llm",
 	# Content creation pipeline
 	"GoalOrientedKnowledgeExplorer",
 	"KnowledgeExplorePayload",
 	"explore_knowledge_points_with_llm",
+	"aexplore_knowledge_points_with_llm",
 	"SearchEnhancedKnowledgeDrafter",
 	"KnowledgeDraftPayload",
 	"draft_knowledge_point_with_llm",
 	"draft_knowledge_points_with_llm",
+	"adraft_knowledge_point_with_llm",
+	"adraft_knowledge_points_with_llm",
+	"astream_knowledge_drafts_with_llm",
 	"LearningDocumentIntegrator",
 	"IntegratedDocPayload",
 	"integrate_learning_document_with_llm",
+	"aintegrate_learning_document_with_llm",
 	"prepare_markdown_document",
 	"DocumentQuizGenerator",
 	"DocumentQuizPayload",
 	"generate_document_quizzes_with_llm",
+	"agenerate_document_quizzes_with_llm",
 	"LearningContentCreator",
 	"ContentBasePayload",
 	"ContentDraftPayload",
 	"prepare_content_outline_with_llm",
 	"create_learning_content_with_llm",
+	"aprepare_content_outline_with_llm",
+	"acreate_learning_content_with_llm",
+	"astream_learning_content_with_llm",
+	"resolve_quiz_counts",
+	"select_learning_path_sessions",
+	"next_learning_path_session",
+	"acreate_learning_path_content_with_llm",
+	"astream_learning_path_content_with_llm",
 ]
@@ -5,6 +5,7 @@ from typing import Any, Mapping
 from pydantic import BaseModel, Field, field_validator
 
 from base import BaseAgent
+from base.single_flight import coalesce
 from modules.personalized_resource_delivery.prompts.document_quiz_generator import (
     document_quiz_generator_system_prompt,
     document_quiz_generator_task_prompt,
@@ -45,7 +46,15 @@ class DocumentQuizGenerator(BaseAgent):
         validated_output = DocumentQuiz.model_validate(raw_output)
         return validated_output.model_dump()
 
+    async def agenerate(self, payload: DocumentQuizPayload | Mapping[str, Any] | str):
+        if not isinstance(payload, DocumentQuizPayload):
+            payload = DocumentQuizPayload.model_validate(payload)
+        raw_output = await self.ainvoke(payload.model_dump(), task_prompt=document_quiz_generator_task_prompt)
+        validated_output = DocumentQuiz.model_validate(raw_output)
+        return validated_output.model_dump()
+
 
+@coalesce
 def generate_document_quizzes_with_llm(
     llm,
     learner_profile,
@@ -63,5 +72,28 @@ def generate_document_quizzes_with_llm(
         "true_false_count": true_false_count,
         "short_answer_count": short_answer_count,
     }
-    gen = DocumentQuizGenerator(llm)
+    gen = DocumentQuizGenerator.shared(llm)
     return gen.generate(payload)
+
+
+@coalesce
+async def agenerate_document_quizzes_with_llm(
+    llm,
+    learner_profile,
+    learning_document,
+    single_choice_count: int = 3,
+    multiple_choice_count: int = 0,
+    true_false_count: int = 0,
+    short_answer_count: int = 0,
+):
+    """Async twin of :func:`generate_document_quizzes_with_llm`."""
+    payload = {
+        "learner_profile": learner_profile,
+        "learning_document": learning_document,
+        "single_choice_count": single_choice_count,
+        "multiple_choice_count": multiple_choice_count,
+        "true_false_count": true_false_count,
+        "short_answer_count": short_answer_count,
+    }
+    gen = DocumentQuizGenerator.shared(llm)
+    return await gen.agenerate(payload)
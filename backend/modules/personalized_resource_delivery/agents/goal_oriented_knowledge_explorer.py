@@ -5,6 +5,7 @@ from typing import Any, Mapping
 from pydantic import BaseModel, Field, field_validator
 
 from base import BaseAgent
+from base.single_flight import coalesce
 from modules.personalized_resource_delivery.prompts.goal_oriented_knowledge_explorer import (
     goal_oriented_knowledge_explorer_system_prompt,
     goal_oriented_knowledge_explorer_task_prompt,
@@ -30,7 +31,15 @@ class GoalOrientedKnowledgeExplorer(BaseAgent):
         validated_output = KnowledgePoints.model_validate(raw_output)
         return validated_output.model_dump()
 
+    async def aexplore(self, payload: KnowledgeExplorePayload | Mapping[str, Any] | str | dict):
+        if not isinstance(payload, KnowledgeExplorePayload):
+            payload = KnowledgeExplorePayload.model_validate(payload)
+        raw_output = await self.ainvoke(payload.model_dump(), task_prompt=goal_oriented_knowledge_explorer_task_prompt)
+        validated_output = KnowledgePoints.model_validate(raw_output)
+        return validated_output.model_dump()
+
 
+@coalesce
 def explore_knowledge_points_with_llm(llm, learner_profile, learning_path, learning_session):
     """Convenience wrapper to explore knowledge points for a session using the agent.
 
@@ -41,5 +50,17 @@ def explore_knowledge_points_with_llm(llm, learner_profile, learning_path, learn
         "learning_path": learning_path,
         "learning_session": learning_session,
     }
-    explorer = GoalOrientedKnowledgeExplorer(llm)
+    explorer = GoalOrientedKnowledgeExplorer.shared(llm)
     return explorer.explore(input_dict)
+
+
+@coalesce
+async def aexplore_knowledge_points_with_llm(llm, learner_profile, learning_path, learning_session):
+    """Async twin of :func:`explore_knowledge_points_with_llm`."""
+    input_dict = {
+        "learner_profile": learner_profile,
+        "learning_path": learning_path,
+        "learning_session": learning_session,
+    }
+    explorer = GoalOrientedKnowledgeExplorer.shared(llm)
+    return await explorer.aexplore(input_dict)
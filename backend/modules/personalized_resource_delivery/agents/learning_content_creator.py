@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from typing import Any, Mapping, Optional
+import asyncio
+import contextlib
+import logging
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Sequence
 
 from pydantic import BaseModel, Field, field_validator
 
 from base import BaseAgent
 from base.search_rag import SearchRagManager, format_docs
+from base.tracing import span
 from modules.personalized_resource_delivery.prompts.learning_content_creator import (
     learning_content_creator_system_prompt,
     learning_content_creator_task_prompt_content,
@@ -13,6 +17,25 @@ from modules.personalized_resource_delivery.prompts.learning_content_creator imp
     learning_content_creator_task_prompt_outline,
 )
 from modules.personalized_resource_delivery.schemas import ContentOutline, KnowledgeDraft, LearningContent
+from utils.payload import parse_legacy_payload
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUIZ_COUNTS = {
+    "single_choice_count": 3,
+    "multiple_choice_count": 0,
+    "true_false_count": 0,
+    "short_answer_count": 0,
+}
+
+
+def resolve_quiz_counts(quiz_counts: Optional[Mapping[str, int]] = None) -> Dict[str, int]:
+    """Fill in :data:`DEFAULT_QUIZ_COUNTS` for question types missing (or ``None``) in ``quiz_counts``.
+
+    Keys other than the four ``*_count`` fields are ignored, so a whole request dict can be passed.
+    """
+    counts = {k: int(v) for k, v in (quiz_counts or {}).items() if k in DEFAULT_QUIZ_COUNTS and v is not None}
+    return {**DEFAULT_QUIZ_COUNTS, **counts}
 
 
 class ContentBasePayload(BaseModel):
@@ -54,9 +77,30 @@ class LearningContentCreator(BaseAgent):
         validated_output = LearningContent.model_validate(raw_output)
         return validated_output.model_dump()
 
+    async def aprepare_outline(self, payload: ContentBasePayload | Mapping[str, Any] | str):
+        if not isinstance(payload, ContentBasePayload):
+            payload = ContentBasePayload.model_validate(payload)
+        raw_output = await self.ainvoke(payload.model_dump(), task_prompt=learning_content_creator_task_prompt_outline)
+        validated_output = ContentOutline.model_validate(raw_output)
+        return validated_output.model_dump()
+
+    async def adraft_section(self, payload: ContentDraftPayload | Mapping[str, Any] | str):
+        if not isinstance(payload, ContentDraftPayload):
+            payload = ContentDraftPayload.model_validate(payload)
+        raw_output = await self.ainvoke(payload.model_dump(), task_prompt=learning_content_creator_task_prompt_draft)
+        validated_output = KnowledgeDraft.model_validate(raw_output)
+        return validated_output.model_dump()
+
+    async def acreate_content(self, payload: ContentBasePayload | Mapping[str, Any] | str):
+        if not isinstance(payload, ContentBasePayload):
+            payload = ContentBasePayload.model_validate(payload)
+        raw_output = await self.ainvoke(payload.model_dump(), task_prompt=learning_content_creator_task_prompt_content)
+        validated_output = LearningContent.model_validate(raw_output)
+        return validated_output.model_dump()
+
 
 def prepare_content_outline_with_llm(llm, learner_profile, learning_path, learning_session, *, search_rag_manager: Optional[SearchRagManager] = None):
-    creator = LearningContentCreator(llm, search_rag_manager=search_rag_manager)
+    creator = LearningContentCreator.shared(llm, search_rag_manager=search_rag_manager)
     payload = {
         "learner_profile": learner_profile,
         "learning_path": learning_path,
@@ -65,6 +109,17 @@ def prepare_content_outline_with_llm(llm, learner_profile, learning_path, learni
     return creator.prepare_outline(payload)
 
 
+async def aprepare_content_outline_with_llm(llm, learner_profile, learning_path, learning_session, *, search_rag_manager: Optional[SearchRagManager] = None):
+    """Async twin of :func:`prepare_content_outline_with_llm`."""
+    creator = LearningContentCreator.shared(llm, search_rag_manager=search_rag_manager)
+    payload = {
+        "learner_profile": learner_profile,
+        "learning_path": learning_path,
+        "learning_session": learning_session,
+    }
+    return await creator.aprepare_outline(payload)
+
+
 def create_learning_content_with_llm(
     llm,
     learner_profile,
@@ -79,6 +134,7 @@ def create_learning_content_with_llm(
     method_name="genmentor",
     *,
     search_rag_manager: Optional[SearchRagManager] = None,
+    quiz_counts: Optional[Mapping[str, int]] = None,
 ):
     from .goal_oriented_knowledge_explorer import explore_knowledge_points_with_llm
     from .search_enhanced_knowledge_drafter import draft_knowledge_points_with_llm
@@ -86,9 +142,10 @@ def create_learning_content_with_llm(
     from .document_quiz_generator import generate_document_quizzes_with_llm
 
     if method_name == "genmentor":
-        knowledge_points = explore_knowledge_points_with_llm(
-            llm, learner_profile, learning_path, learning_session
-        )
+        with span("explore"):
+            knowledge_points = _unwrap_knowledge_points(explore_knowledge_points_with_llm(
+                llm, learner_profile, learning_path, learning_session
+            ))
         knowledge_drafts = draft_knowledge_points_with_llm(
             llm,
             learner_profile,
@@ -100,31 +157,30 @@ def create_learning_content_with_llm(
             max_workers=max_workers,
             search_rag_manager=search_rag_manager,
         )
-        learning_document = integrate_learning_document_with_llm(
-            llm,
-            learner_profile,
-            learning_path,
-            learning_session,
-            knowledge_points,
-            knowledge_drafts,
-            output_markdown=output_markdown,
-        )
+        with span("integrate"):
+            learning_document = integrate_learning_document_with_llm(
+                llm,
+                learner_profile,
+                learning_path,
+                learning_session,
+                knowledge_points,
+                knowledge_drafts,
+                output_markdown=output_markdown,
+            )
         learning_content = {"document": learning_document}
         if not with_quiz:
             return learning_content
-        document_quiz = generate_document_quizzes_with_llm(
-            llm,
-            learner_profile,
-            learning_document,
-            single_choice_count=3,
-            multiple_choice_count=0,
-            true_false_count=0,
-            short_answer_count=0,
-        )
+        with span("quiz"):
+            document_quiz = generate_document_quizzes_with_llm(
+                llm,
+                learner_profile,
+                learning_document,
+                **resolve_quiz_counts(quiz_counts),
+            )
         learning_content["quizzes"] = document_quiz
         return learning_content
     else:
-        creator = LearningContentCreator(llm, search_rag_manager=search_rag_manager)
+        creator = LearningContentCreator.shared(llm, search_rag_manager=search_rag_manager)
         if document_outline is None:
             document_outline = prepare_content_outline_with_llm(
                 llm,
@@ -141,3 +197,320 @@ def create_learning_content_with_llm(
             "external_resources": "",
         }
         return creator.create_content(payload)
+
+
+async def acreate_learning_content_with_llm(
+    llm,
+    learner_profile,
+    learning_path,
+    learning_session,
+    document_outline=None,
+    allow_parallel=True,
+    with_quiz=True,
+    max_workers=3,
+    use_search=True,
+    output_markdown=True,
+    method_name="genmentor",
+    *,
+    search_rag_manager: Optional[SearchRagManager] = None,
+    quiz_counts: Optional[Mapping[str, int]] = None,
+):
+    """Async twin of :func:`create_learning_content_with_llm`."""
+    if method_name == "genmentor":
+        learning_content: Dict[str, Any] = {}
+        async for event in astream_learning_content_with_llm(
+            llm,
+            learner_profile,
+            learning_path,
+            learning_session,
+            allow_parallel=allow_parallel,
+            with_quiz=with_quiz,
+            max_workers=max_workers,
+            use_search=use_search,
+            output_markdown=output_markdown,
+            search_rag_manager=search_rag_manager,
+            quiz_counts=quiz_counts,
+        ):
+            if event["event"] == "done":
+                learning_content = event["data"]["tailored_content"]
+        return learning_content
+    else:
+        creator = LearningContentCreator.shared(llm, search_rag_manager=search_rag_manager)
+        if document_outline is None:
+            document_outline = await aprepare_content_outline_with_llm(
+                llm,
+                learner_profile,
+                learning_path,
+                learning_session,
+                search_rag_manager=search_rag_manager,
+            )
+        payload = {
+            "learner_profile": learner_profile,
+            "learning_path": learning_path,
+            "learning_session": learning_session,
+            "external_resources": "",
+        }
+        return await creator.acreate_content(payload)
+
+
+async def astream_learning_content_with_llm(
+    llm,
+    learner_profile,
+    learning_path,
+    learning_session,
+    allow_parallel=True,
+    with_quiz=True,
+    max_workers=3,
+    use_search=True,
+    output_markdown=True,
+    *,
+    search_rag_manager: Optional[SearchRagManager] = None,
+    concurrency_budget: Optional[asyncio.Semaphore] = None,
+    quiz_counts: Optional[Mapping[str, int]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run the explore -> draft -> integrate -> quiz pipeline, yielding typed events as stages finish.
+
+    Events, in order:
+
+    - ``knowledge_points``: ``{"knowledge_points": [...]}``
+    - ``knowledge_draft``: ``{"index": i, "knowledge_draft": {...}}``, once per point, in completion order
+    - ``document``: ``{"document_structure": {...}, "learning_document": ...}``
+    - ``quizzes``: ``{"document_quiz": {...}}`` (only when ``with_quiz``)
+    - ``done``: ``{"tailored_content": {...}}``, the same value the non-streaming helper returns
+
+    ``quiz_counts`` overrides the number of questions per type (see
+    :data:`DEFAULT_QUIZ_COUNTS`).
+
+    When ``concurrency_budget`` is given, every LLM stage (and every individual
+    draft) holds one slot of it while running, so several pipelines can share a
+    single limit on in-flight model calls.
+    """
+    from .goal_oriented_knowledge_explorer import aexplore_knowledge_points_with_llm
+    from .search_enhanced_knowledge_drafter import astream_knowledge_drafts_with_llm
+    from .learning_document_integrator import aintegrate_learning_document_with_llm, prepare_markdown_document
+    from .document_quiz_generator import agenerate_document_quizzes_with_llm
+
+    budget = concurrency_budget or contextlib.nullcontext()
+    async with budget:
+        with span("explore"):
+            knowledge_points = _unwrap_knowledge_points(await aexplore_knowledge_points_with_llm(
+                llm, learner_profile, learning_path, learning_session
+            ))
+    yield {"event": "knowledge_points", "data": {"knowledge_points": knowledge_points}}
+
+    knowledge_drafts: list = [None] * len(knowledge_points)
+    async for index, draft in astream_knowledge_drafts_with_llm(
+        llm,
+        learner_profile,
+        learning_path,
+        learning_session,
+        knowledge_points,
+        allow_parallel=allow_parallel,
+        use_search=use_search,
+        max_workers=max_workers,
+        search_rag_manager=search_rag_manager,
+        concurrency_budget=concurrency_budget,
+    ):
+        knowledge_drafts[index] = draft
+        yield {"event": "knowledge_draft", "data": {"index": index, "knowledge_draft": draft}}
+
+    async with budget:
+        with span("integrate"):
+            document_structure = await aintegrate_learning_document_with_llm(
+                llm,
+                learner_profile,
+                learning_path,
+                learning_session,
+                knowledge_points,
+                knowledge_drafts,
+                output_markdown=False,
+            )
+    if output_markdown:
+        learning_document = prepare_markdown_document(document_structure, knowledge_points, knowledge_drafts)
+    else:
+        learning_document = document_structure
+    yield {"event": "document", "data": {"document_structure": document_structure, "learning_document": learning_document}}
+
+    learning_content = {"document": learning_document}
+    if with_quiz:
+        async with budget:
+            with span("quiz"):
+                document_quiz = await agenerate_document_quizzes_with_llm(
+                    llm,
+                    learner_profile,
+                    learning_document,
+                    **resolve_quiz_counts(quiz_counts),
+                )
+        learning_content["quizzes"] = document_quiz
+        yield {"event": "quizzes", "data": {"document_quiz": document_quiz}}
+    yield {"event": "done", "data": {"tailored_content": learning_content}}
+
+
+def select_learning_path_sessions(
+    learning_path,
+    session_ids: Optional[Sequence[str]] = None,
+    include_learned: bool = False,
+) -> List[Dict[str, Any]]:
+    """Return the sessions of ``learning_path`` to generate content for.
+
+    Accepts either a ``LearningPath`` dict (``{"learning_path": [...]}``) or the bare
+    list of sessions. With ``session_ids`` only those sessions are kept (in path
+    order); otherwise every session not yet marked ``if_learned`` is selected.
+    """
+    learning_path = parse_legacy_payload(learning_path)
+    if isinstance(learning_path, Mapping):
+        learning_path = learning_path.get("learning_path", [])
+    if not isinstance(learning_path, list):
+        raise ValueError("learning_path must be a list of sessions or a {'learning_path': [...]} object")
+    sessions = [session for session in learning_path if isinstance(session, Mapping)]
+    if session_ids is not None:
+        wanted = {str(session_id) for session_id in session_ids}
+        return [dict(session) for session in sessions if str(session.get("id")) in wanted]
+    return [dict(session) for session in sessions if include_learned or not session.get("if_learned", False)]
+
+
+def next_learning_path_session(learning_path, current_session_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Return the first unlearned session after ``current_session_id`` (or the first unlearned one overall)."""
+    sessions = select_learning_path_sessions(learning_path, include_learned=True)
+    start = 0
+    if current_session_id is not None:
+        for i, session in enumerate(sessions):
+            if str(session.get("id")) == str(current_session_id):
+                start = i + 1
+                break
+    for session in sessions[start:] + sessions[:start]:
+        if not session.get("if_learned", False) and str(session.get("id")) != str(current_session_id):
+            return session
+    return None
+
+
+async def astream_learning_path_content_with_llm(
+    llm,
+    learner_profile,
+    learning_path,
+    session_ids: Optional[Sequence[str]] = None,
+    include_learned: bool = False,
+    allow_parallel=True,
+    with_quiz=True,
+    max_workers=3,
+    use_search=True,
+    output_markdown=True,
+    max_concurrency: int = 8,
+    max_concurrent_sessions: Optional[int] = None,
+    *,
+    search_rag_manager: Optional[SearchRagManager] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Generate content for many sessions of a learning path concurrently.
+
+    All sessions run :func:`astream_learning_content_with_llm` against one shared
+    budget of ``max_concurrency`` in-flight LLM calls; at most
+    ``max_concurrent_sessions`` pipelines are active at once (defaults to
+    ``max_concurrency``). Events from different sessions are interleaved:
+
+    - ``sessions``: ``{"sessions": [{"session_index", "session_id", "title"}, ...]}``
+    - every per-session pipeline event except ``done``, with ``session_index`` and
+      ``session_id`` added to its data
+    - ``session_done``: ``{"session_index", "session_id", "tailored_content"}``
+    - ``session_error``: ``{"session_index", "session_id", "detail"}``; the other
+      sessions keep running
+    - ``done``: ``{"results": [...]}``, one entry per session in path order with
+      either ``tailored_content`` or ``error``
+    """
+    sessions = select_learning_path_sessions(learning_path, session_ids, include_learned)
+    yield {"event": "sessions", "data": {"sessions": [
+        {"session_index": i, "session_id": session.get("id"), "title": session.get("title")}
+        for i, session in enumerate(sessions)
+    ]}}
+
+    budget = asyncio.Semaphore(max(1, int(max_concurrency)))
+    session_slots = asyncio.Semaphore(max(1, int(max_concurrent_sessions or max_concurrency)))
+    queue: asyncio.Queue = asyncio.Queue()
+    results: List[Dict[str, Any]] = [
+        {"session_index": i, "session_id": session.get("id")} for i, session in enumerate(sessions)
+    ]
+
+    async def run_session(index: int, session: Dict[str, Any]) -> None:
+        tag = {"session_index": index, "session_id": session.get("id")}
+        try:
+            async with session_slots:
+                async for event in astream_learning_content_with_llm(
+                    llm,
+                    learner_profile,
+                    learning_path,
+                    session,
+                    allow_parallel=allow_parallel,
+                    with_quiz=with_quiz,
+                    max_workers=max_workers,
+                    use_search=use_search,
+                    output_markdown=output_markdown,
+                    search_rag_manager=search_rag_manager,
+                    concurrency_budget=budget,
+                ):
+                    if event["event"] == "done":
+                        results[index]["tailored_content"] = event["data"]["tailored_content"]
+                        await queue.put({"event": "session_done", "data": {**tag, **event["data"]}})
+                    else:
+                        await queue.put({"event": event["event"], "data": {**tag, **event["data"]}})
+        except Exception as e:
+            logger.warning(f"Content generation failed for session {session.get('id')}: {e}")
+            results[index]["error"] = str(e)
+            await queue.put({"event": "session_error", "data": {**tag, "detail": str(e)}})
+
+    tasks = [asyncio.ensure_future(run_session(i, session)) for i, session in enumerate(sessions)]
+    pending = len(tasks)
+    try:
+        while pending:
+            event = await queue.get()
+            if event["event"] in ("session_done", "session_error"):
+                pending -= 1
+            yield event
+    finally:
+        # Stop outstanding sessions if the consumer goes away.
+        for task in tasks:
+            task.cancel()
+    yield {"event": "done", "data": {"results": results}}
+
+
+async def acreate_learning_path_content_with_llm(
+    llm,
+    learner_profile,
+    learning_path,
+    session_ids: Optional[Sequence[str]] = None,
+    include_learned: bool = False,
+    allow_parallel=True,
+    with_quiz=True,
+    max_workers=3,
+    use_search=True,
+    output_markdown=True,
+    max_concurrency: int = 8,
+    max_concurrent_sessions: Optional[int] = None,
+    *,
+    search_rag_manager: Optional[SearchRagManager] = None,
+) -> List[Dict[str, Any]]:
+    """Collect :func:`astream_learning_path_content_with_llm` into per-session results."""
+    results: List[Dict[str, Any]] = []
+    async for event in astream_learning_path_content_with_llm(
+        llm,
+        learner_profile,
+        learning_path,
+        session_ids=session_ids,
+        include_learned=include_learned,
+        allow_parallel=allow_parallel,
+        with_quiz=with_quiz,
+        max_workers=max_workers,
+        use_search=use_search,
+        output_markdown=output_markdown,
+        max_concurrency=max_concurrency,
+        max_concurrent_sessions=max_concurrent_sessions,
+        search_rag_manager=search_rag_manager,
+    ):
+        if event["event"] == "done":
+            results = event["data"]["results"]
+    return results
+
+
+def _unwrap_knowledge_points(knowledge_points):
+    """The explorer returns ``{"knowledge_points": [...]}``; the drafting stages expect the list."""
+    if isinstance(knowledge_points, Mapping) and "knowledge_points" in knowledge_points:
+        return knowledge_points["knowledge_points"]
+    return knowledge_points
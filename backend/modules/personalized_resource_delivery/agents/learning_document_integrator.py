@@ -6,6 +6,8 @@ from typing import Any, Mapping
 from pydantic import BaseModel, field_validator
 
 from base import BaseAgent
+from base.single_flight import coalesce
+from utils.payload import parse_legacy_payload
 from ..prompts.learning_document_integrator import integrated_document_generator_system_prompt, integrated_document_generator_task_prompt
 from ..schemas import DocumentStructure
 
@@ -44,7 +46,15 @@ class LearningDocumentIntegrator(BaseAgent):
         validated_output = DocumentStructure.model_validate(raw_output)
         return validated_output.model_dump()
 
+    async def aintegrate(self, payload: IntegratedDocPayload | Mapping[str, Any] | str):
+        if not isinstance(payload, IntegratedDocPayload):
+            payload = IntegratedDocPayload.model_validate(payload)
+        raw_output = await self.ainvoke(payload.model_dump(), task_prompt=integrated_document_generator_task_prompt)
+        validated_output = DocumentStructure.model_validate(raw_output)
+        return validated_output.model_dump()
+
 
+@coalesce
 def integrate_learning_document_with_llm(llm, learner_profile, learning_path, learning_session, knowledge_points, knowledge_drafts, output_markdown=True):
     logger.info(f'Integrating learning document with {len(knowledge_points)} knowledge points and {len(knowledge_drafts)} drafts...')
     input_dict = {
@@ -54,7 +64,7 @@ def integrate_learning_document_with_llm(llm, learner_profile, learning_path, le
         'knowledge_points': knowledge_points,
         'knowledge_drafts': knowledge_drafts
     }
-    learning_document_integrator = LearningDocumentIntegrator(llm)
+    learning_document_integrator = LearningDocumentIntegrator.shared(llm)
     document_structure = learning_document_integrator.integrate(input_dict)
     if not output_markdown:
         return document_structure
@@ -62,6 +72,25 @@ def integrate_learning_document_with_llm(llm, learner_profile, learning_path, le
     return prepare_markdown_document(document_structure, knowledge_points, knowledge_drafts)
 
 
+@coalesce
+async def aintegrate_learning_document_with_llm(llm, learner_profile, learning_path, learning_session, knowledge_points, knowledge_drafts, output_markdown=True):
+    """Async twin of :func:`integrate_learning_document_with_llm`."""
+    logger.info(f'Integrating learning document with {len(knowledge_points)} knowledge points and {len(knowledge_drafts)} drafts...')
+    input_dict = {
+        'learner_profile': learner_profile,
+        'learning_path': learning_path,
+        'learning_session': learning_session,
+        'knowledge_points': knowledge_points,
+        'knowledge_drafts': knowledge_drafts
+    }
+    learning_document_integrator = LearningDocumentIntegrator.shared(llm)
+    document_structure = await learning_document_integrator.aintegrate(input_dict)
+    if not output_markdown:
+        return document_structure
+    logger.info('Preparing markdown document...')
+    return prepare_markdown_document(document_structure, knowledge_points, knowledge_drafts)
+
+
 def prepare_markdown_document(document_structure, knowledge_points, knowledge_drafts):
     """Render a markdown learning document from the integrated structure and drafts.
 
@@ -69,22 +98,9 @@ def prepare_markdown_document(document_structure, knowledge_points, knowledge_dr
     knowledge_points: list with items containing 'type' in {'foundational','practical','strategic'}.
     knowledge_drafts: list aligned with knowledge_points, each with 'title' and 'content'.
     """
-    import ast as _ast
-    if isinstance(knowledge_points, str):
-        try:
-            knowledge_points = _ast.literal_eval(knowledge_points)
-        except Exception:
-            pass
-    if isinstance(knowledge_drafts, str):
-        try:
-            knowledge_drafts = _ast.literal_eval(knowledge_drafts)
-        except Exception:
-            pass
-    if isinstance(document_structure, str):
-        try:
-            document_structure = _ast.literal_eval(document_structure)
-        except Exception:
-            pass
+    knowledge_points = parse_legacy_payload(knowledge_points)
+    knowledge_drafts = parse_legacy_payload(knowledge_drafts)
+    document_structure = parse_legacy_payload(document_structure)
 
     if not isinstance(document_structure, dict):
         document_structure = {}
@@ -1,19 +1,22 @@
 from __future__ import annotations
 
-import ast
-from typing import Any, Mapping, Optional, List
+import asyncio
+import contextlib
+from typing import Any, AsyncIterator, Mapping, Optional, List, Tuple
 from concurrent.futures import ThreadPoolExecutor
 
 from pydantic import BaseModel, field_validator
 
 from base import BaseAgent
-from base.search_rag import SearchRagManager, format_docs
+from base.single_flight import coalesce
+from base.tracing import bind_context, span
+from base.search_rag import SearchRagManager, format_docs, get_default_search_rag_manager
+from utils.payload import parse_legacy_payload
 from modules.personalized_resource_delivery.prompts.search_enhanced_knowledge_drafter import (
     search_enhanced_knowledge_drafter_system_prompt,
     search_enhanced_knowledge_drafter_task_prompt,
 )
 from modules.personalized_resource_delivery.schemas import KnowledgeDraft
-from config.loader import default_config
 
 
 class KnowledgeDraftPayload(BaseModel):
@@ -42,7 +45,9 @@ class SearchEnhancedKnowledgeDrafter(BaseAgent):
 
     def __init__(self, model: Any, *, search_rag_manager: Optional[SearchRagManager] = None, use_search: bool = True):
         super().__init__(model=model, system_prompt=search_enhanced_knowledge_drafter_system_prompt, jsonalize_output=True)
-        self.search_rag_manager = search_rag_manager or SearchRagManager.from_config(default_config)
+        if search_rag_manager is None and use_search:
+            search_rag_manager = get_default_search_rag_manager()
+        self.search_rag_manager = search_rag_manager
         self.use_search = use_search
 
     def draft(self, payload: KnowledgeDraftPayload | Mapping[str, Any] | str):
@@ -51,20 +56,45 @@ class SearchEnhancedKnowledgeDrafter(BaseAgent):
         data = payload.model_dump()
         # Optionally enrich external resources using the search RAG manager
         if self.use_search and self.search_rag_manager is not None:
-            session = data.get("learning_session") or {}
-            session_title = str(session.get("title", "")).strip() or "learning_session"
-            knowledge_point = data.get("knowledge_point") or {}
-            knowledge_point_name = str(knowledge_point.get('name', '')).strip()
-            query = f"{session_title} {knowledge_point_name}".strip()
-            docs = self.search_rag_manager.invoke(query)
-            context = format_docs(docs)
-            if context:
-                ext = data.get("external_resources") or ""
-                data["external_resources"] = f"{ext}{context}"
+            docs = self.search_rag_manager.invoke(self._search_query(data))
+            self._attach_context(data, docs)
         raw_output = self.invoke(data, task_prompt=search_enhanced_knowledge_drafter_task_prompt)
         validated_output = KnowledgeDraft.model_validate(raw_output)
         return validated_output.model_dump()
 
+    async def adraft(self, payload: KnowledgeDraftPayload | Mapping[str, Any] | str):
+        if not isinstance(payload, KnowledgeDraftPayload):
+            payload = KnowledgeDraftPayload.model_validate(payload)
+        data = payload.model_dump()
+        if self.use_search and self.search_rag_manager is not None:
+            docs = await self.search_rag_manager.ainvoke(self._search_query(data))
+            self._attach_context(data, docs)
+        raw_output = await self.ainvoke(data, task_prompt=search_enhanced_knowledge_drafter_task_prompt)
+        validated_output = KnowledgeDraft.model_validate(raw_output)
+        return validated_output.model_dump()
+
+    @staticmethod
+    def _search_query(data: Mapping[str, Any]) -> str:
+        session = data.get("learning_session") or {}
+        session_title = str(session.get("title", "")).strip() or "learning_session"
+        knowledge_point = data.get("knowledge_point") or {}
+        knowledge_point_name = str(knowledge_point.get('name', '')).strip()
+        return f"{session_title} {knowledge_point_name}".strip()
+
+    @staticmethod
+    def _attach_context(data: dict, docs) -> None:
+        context = format_docs(docs)
+        if context:
+            ext = data.get("external_resources") or ""
+            data["external_resources"] = f"{ext}{context}"
+
+def _knowledge_point_name(knowledge_point) -> str:
+    if isinstance(knowledge_point, Mapping):
+        return str(knowledge_point.get("name", ""))
+    return str(knowledge_point)
+
+
+@coalesce
 def draft_knowledge_point_with_llm(
     llm,
     learner_profile,
@@ -77,7 +107,7 @@ def draft_knowledge_point_with_llm(
     search_rag_manager: Optional[SearchRagManager] = None,
 ):
     """Draft a single knowledge point using the agent, optionally enriching with a SearchRagManager."""
-    drafter = SearchEnhancedKnowledgeDrafter(llm, search_rag_manager=search_rag_manager, use_search=use_search)
+    drafter = SearchEnhancedKnowledgeDrafter.shared(llm, search_rag_manager=search_rag_manager, use_search=use_search)
     payload = {
         "learner_profile": learner_profile,
         "learning_path": learning_path,
@@ -85,7 +115,8 @@ def draft_knowledge_point_with_llm(
         "knowledge_points": knowledge_points,
         "knowledge_point": knowledge_point,
     }
-    return drafter.draft(payload)
+    with span("draft_knowledge_point", knowledge_point=_knowledge_point_name(knowledge_point)):
+        return drafter.draft(payload)
 
 
 def draft_knowledge_points_with_llm(
@@ -101,12 +132,10 @@ def draft_knowledge_points_with_llm(
     search_rag_manager: Optional[SearchRagManager] = None,
 ):
     """Draft multiple knowledge points in parallel or sequentially using the agent."""
-    if isinstance(learning_session, str):
-        learning_session = ast.literal_eval(learning_session)
-    if isinstance(knowledge_points, str):
-        knowledge_points = ast.literal_eval(knowledge_points)
+    learning_session = parse_legacy_payload(learning_session)
+    knowledge_points = parse_legacy_payload(knowledge_points)
     if search_rag_manager is None and use_search:
-        search_rag_manager = SearchRagManager.from_config(default_config)
+        search_rag_manager = get_default_search_rag_manager()
     def draft_one(kp):
         return draft_knowledge_point_with_llm(
             llm,
@@ -121,7 +150,8 @@ def draft_knowledge_points_with_llm(
 
     if allow_parallel:
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            return list(executor.map(draft_one, knowledge_points))
+            # bind_context keeps each worker's spans under the caller's trace.
+            return list(executor.map(bind_context(draft_one), knowledge_points))
     else:
         results: List[Any] = []
         for kp in knowledge_points:
@@ -129,6 +159,112 @@ def draft_knowledge_points_with_llm(
         return results
 
 
+
+@coalesce
+async def adraft_knowledge_point_with_llm(
+    llm,
+    learner_profile,
+    learning_path,
+    learning_session,
+    knowledge_points,
+    knowledge_point,
+    use_search: bool = True,
+    *,
+    search_rag_manager: Optional[SearchRagManager] = None,
+):
+    """Async twin of :func:`draft_knowledge_point_with_llm`."""
+    drafter = SearchEnhancedKnowledgeDrafter.shared(llm, search_rag_manager=search_rag_manager, use_search=use_search)
+    payload = {
+        "learner_profile": learner_profile,
+        "learning_path": learning_path,
+        "learning_session": learning_session,
+        "knowledge_points": knowledge_points,
+        "knowledge_point": knowledge_point,
+    }
+    with span("draft_knowledge_point", knowledge_point=_knowledge_point_name(knowledge_point)):
+        return await drafter.adraft(payload)
+
+
+async def adraft_knowledge_points_with_llm(
+    llm,
+    learner_profile,
+    learning_path,
+    learning_session,
+    knowledge_points,
+    allow_parallel: bool = True,
+    use_search: bool = True,
+    max_workers: int = 8,
+    *,
+    search_rag_manager: Optional[SearchRagManager] = None,
+):
+    """Async twin of :func:`draft_knowledge_points_with_llm`; at most ``max_workers`` drafts run at once."""
+    knowledge_points = parse_legacy_payload(knowledge_points)
+    results: List[Any] = [None] * len(knowledge_points)
+    async for index, draft in astream_knowledge_drafts_with_llm(
+        llm,
+        learner_profile,
+        learning_path,
+        learning_session,
+        knowledge_points,
+        allow_parallel=allow_parallel,
+        use_search=use_search,
+        max_workers=max_workers,
+        search_rag_manager=search_rag_manager,
+    ):
+        results[index] = draft
+    return results
+
+
+async def astream_knowledge_drafts_with_llm(
+    llm,
+    learner_profile,
+    learning_path,
+    learning_session,
+    knowledge_points,
+    allow_parallel: bool = True,
+    use_search: bool = True,
+    max_workers: int = 8,
+    *,
+    search_rag_manager: Optional[SearchRagManager] = None,
+    concurrency_budget: Optional[asyncio.Semaphore] = None,
+) -> AsyncIterator[Tuple[int, Any]]:
+    """Draft knowledge points concurrently, yielding ``(index, draft)`` pairs in completion order.
+
+    ``concurrency_budget`` is an optional semaphore shared with other pipelines
+    (see :func:`astream_learning_path_content_with_llm`); each draft holds one
+    slot of it on top of the local ``max_workers`` limit.
+    """
+    learning_session = parse_legacy_payload(learning_session)
+    knowledge_points = parse_legacy_payload(knowledge_points)
+    if search_rag_manager is None and use_search:
+        search_rag_manager = get_default_search_rag_manager()
+    semaphore = asyncio.Semaphore(max_workers if allow_parallel else 1)
+    budget = concurrency_budget or contextlib.nullcontext()
+
+    async def draft_one(index, kp):
+        async with semaphore, budget:
+            draft = await adraft_knowledge_point_with_llm(
+                llm,
+                learner_profile,
+                learning_path,
+                learning_session,
+                knowledge_points,
+                kp,
+                use_search=use_search,
+                search_rag_manager=search_rag_manager,
+            )
+        return index, draft
+
+    tasks = [asyncio.ensure_future(draft_one(i, kp)) for i, kp in enumerate(knowledge_points)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Stop outstanding drafts if the consumer goes away or a draft fails.
+        for task in tasks:
+            task.cancel()
+
+
 if __name__ == "__main__":
     from config.loader import default_config
     from base.llm_factory import LLMFactory
@@ -155,6 +291,7 @@ if __name__ == "__main__":
         knowledge_points,
         allow_parallel=True,
         use_search=True,
+        search_rag_manager=search_rag_manager,
     )
 
     for draft in drafts:
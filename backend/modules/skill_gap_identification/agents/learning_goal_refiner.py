@@ -38,6 +38,18 @@ class LearningGoalRefiner(BaseAgent):
 		validated = RefinedLearningGoal.model_validate(raw_output)
 		return validated.model_dump()
 
+	async def arefine_goal(
+		self,
+		input_dict: Mapping[str, Any],
+	) -> JSONDict:
+		"""Async twin of :meth:`refine_goal`."""
+
+		payload_dict = RefineGoalPayload(**input_dict).model_dump()
+		task_prompt = learning_goal_refiner_task_prompt
+		raw_output = await self.ainvoke(payload_dict, task_prompt=task_prompt)
+		validated = RefinedLearningGoal.model_validate(raw_output)
+		return validated.model_dump()
+
 def refine_learning_goal_with_llm(
 	llm: Any,
 	learning_goal: str,
@@ -45,10 +57,26 @@ def refine_learning_goal_with_llm(
 ) -> JSONDict:
 	"""Refine a learner's goal using the provided LLM."""
 
-	refiner = LearningGoalRefiner(llm)
+	refiner = LearningGoalRefiner.shared(llm)
 	return refiner.refine_goal(
 		{
 			"learning_goal": learning_goal,
 			"learner_information": learner_information,
 		}
 	)
+
+
+async def arefine_learning_goal_with_llm(
+	llm: Any,
+	learning_goal: str,
+	learner_information: str = "",
+) -> JSONDict:
+	"""Async twin of :func:`refine_learning_goal_with_llm`."""
+
+	refiner = LearningGoalRefiner.shared(llm)
+	return await refiner.arefine_goal(
+		{
+			"learning_goal": learning_goal,
+			"learner_information": learner_information,
+		}
+	)
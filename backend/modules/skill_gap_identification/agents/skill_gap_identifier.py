@@ -4,6 +4,7 @@ from collections.abc import Mapping
 from typing import Any, Dict, Optional, Tuple, TypeAlias
 from pydantic import BaseModel, Field
 from base import BaseAgent
+from base.semantic_cache import SemanticCache
 from ..prompts.skill_gap_identifier import skill_gap_identifier_system_prompt, skill_gap_identifier_task_prompt
 from ..schemas import SkillRequirements, SkillGaps
 from .skill_requirement_mapper import SkillRequirementMapper
@@ -42,22 +43,35 @@ class SkillGapIdentifier(BaseAgent):
         validated = SkillGaps.model_validate(raw_output)
         return validated.model_dump()
 
+    async def aidentify_skill_gap(
+        self,
+        input_dict: Mapping[str, Any],
+    ) -> JSONDict:
+        """Async twin of :meth:`identify_skill_gap`."""
+        payload_dict = SkillGapPayload(**input_dict).model_dump()
+        task_prompt = skill_gap_identifier_task_prompt
+        raw_output = await self.ainvoke(payload_dict, task_prompt=task_prompt)
+        validated = SkillGaps.model_validate(raw_output)
+        return validated.model_dump()
+
 def identify_skill_gap_with_llm(
     llm: Any,
     learning_goal: str,
     learner_information: str,
     skill_requirements: Optional[Dict[str, Any]] = None,
+    *,
+    semantic_cache: Optional[SemanticCache] = None,
 ) -> Tuple[JSONDict, JSONDict]:
     """Identify skill gaps and return both the gaps and the skill requirements used."""
 
     # Compute requirements if not provided
     if not skill_requirements:
-        mapper = SkillRequirementMapper(llm)
+        mapper = SkillRequirementMapper.shared(llm, semantic_cache=semantic_cache)
         effective_requirements = mapper.map_goal_to_skill({"learning_goal": learning_goal})
     else:
         effective_requirements = skill_requirements
 
-    skill_gap_identifier = SkillGapIdentifier(llm)
+    skill_gap_identifier = SkillGapIdentifier.shared(llm)
     skill_gaps = skill_gap_identifier.identify_skill_gap(
         {
             "learning_goal": learning_goal,
@@ -67,6 +81,33 @@ def identify_skill_gap_with_llm(
     )
     return skill_gaps, effective_requirements
 
+
+async def aidentify_skill_gap_with_llm(
+    llm: Any,
+    learning_goal: str,
+    learner_information: str,
+    skill_requirements: Optional[Dict[str, Any]] = None,
+    *,
+    semantic_cache: Optional[SemanticCache] = None,
+) -> Tuple[JSONDict, JSONDict]:
+    """Async twin of :func:`identify_skill_gap_with_llm`."""
+
+    if not skill_requirements:
+        mapper = SkillRequirementMapper.shared(llm, semantic_cache=semantic_cache)
+        effective_requirements = await mapper.amap_goal_to_skill({"learning_goal": learning_goal})
+    else:
+        effective_requirements = skill_requirements
+
+    skill_gap_identifier = SkillGapIdentifier.shared(llm)
+    skill_gaps = await skill_gap_identifier.aidentify_skill_gap(
+        {
+            "learning_goal": learning_goal,
+            "learner_information": learner_information,
+            "skill_requirements": effective_requirements,
+        },
+    )
+    return skill_gaps, effective_requirements
+
 if __name__ == "__main__":
     # python -m modules.skill_gap_identification.agents.skill_gap_identifier
     from base.llm_factory import LLMFactory
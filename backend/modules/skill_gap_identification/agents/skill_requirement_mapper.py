@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from collections.abc import Mapping
-from typing import Any, Dict, TypeAlias
+from typing import Any, Dict, Optional, TypeAlias
 
 from pydantic import BaseModel, Field
 from base import BaseAgent
+from base.response_cache import model_identity
+from base.semantic_cache import SemanticCache
+from base.single_flight import coalesce
 from ..prompts.skill_requirement_mapper import skill_requirement_mapper_system_prompt, skill_requirement_mapper_task_prompt
 from ..schemas import SkillRequirements
 
@@ -22,22 +25,53 @@ class SkillRequirementMapper(BaseAgent):
 
 	name: str = "SkillRequirementMapper"
 
-	def __init__(self, model: Any) -> None:
+	def __init__(self, model: Any, *, semantic_cache: Optional[SemanticCache] = None) -> None:
 		super().__init__(
 			model=model,
 			system_prompt=skill_requirement_mapper_system_prompt,
 			jsonalize_output=True,
 		)
+		self.semantic_cache = semantic_cache
+
+	def _cache_namespace(self) -> str:
+		identity = model_identity(self._model)
+		return f"{identity['class']}:{identity['model']}"
 
 	def map_goal_to_skill(self, input_dict: Mapping[str, Any]) -> JSONDict:
 		payload_dict = Goal2SkillPayload(**input_dict).model_dump()
+		if self.semantic_cache is not None:
+			cached = self.semantic_cache.lookup(self._cache_namespace(), payload_dict["learning_goal"])
+			if cached is not None:
+				return cached
 		task_prompt = skill_requirement_mapper_task_prompt
 		raw_output = self.invoke(payload_dict, task_prompt=task_prompt)
-		validated = SkillRequirements.model_validate(raw_output)
-		return validated.model_dump()
+		validated = SkillRequirements.model_validate(raw_output).model_dump()
+		if self.semantic_cache is not None:
+			self.semantic_cache.add(self._cache_namespace(), payload_dict["learning_goal"], validated)
+		return validated
+
+	async def amap_goal_to_skill(self, input_dict: Mapping[str, Any]) -> JSONDict:
+		payload_dict = Goal2SkillPayload(**input_dict).model_dump()
+		if self.semantic_cache is not None:
+			cached = await self.semantic_cache.alookup(self._cache_namespace(), payload_dict["learning_goal"])
+			if cached is not None:
+				return cached
+		task_prompt = skill_requirement_mapper_task_prompt
+		raw_output = await self.ainvoke(payload_dict, task_prompt=task_prompt)
+		validated = SkillRequirements.model_validate(raw_output).model_dump()
+		if self.semantic_cache is not None:
+			await self.semantic_cache.aadd(self._cache_namespace(), payload_dict["learning_goal"], validated)
+		return validated
 
 
-def map_goal_to_skills_with_llm(llm: Any, learning_goal: str) -> JSONDict:
-	mapper = SkillRequirementMapper(llm)
+@coalesce
+def map_goal_to_skills_with_llm(llm: Any, learning_goal: str, *, semantic_cache: Optional[SemanticCache] = None) -> JSONDict:
+	mapper = SkillRequirementMapper.shared(llm, semantic_cache=semantic_cache)
 	return mapper.map_goal_to_skill({"learning_goal": learning_goal})
 
+
+@coalesce
+async def amap_goal_to_skills_with_llm(llm: Any, learning_goal: str, *, semantic_cache: Optional[SemanticCache] = None) -> JSONDict:
+	mapper = SkillRequirementMapper.shared(llm, semantic_cache=semantic_cache)
+	return await mapper.amap_goal_to_skill({"learning_goal": learning_goal})
+
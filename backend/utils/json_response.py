@@ -0,0 +1,27 @@
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from base.usage import current_request_usage
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed, stdlib json otherwise.
+
+    When the request asked for it (see :class:`base.usage.UsageMiddleware`), a
+    ``usage`` block with the request's token counts is added to dict bodies.
+    """
+
+    def render(self, content: Any) -> bytes:
+        request_usage = current_request_usage()
+        if request_usage is not None and request_usage.include_in_response and isinstance(content, dict) and "usage" not in content:
+            content = {**content, "usage": request_usage.summary()}
+        if orjson is not None:
+            return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
@@ -49,6 +49,94 @@ def extract_think_and_result(info):
     return think_content, result_content
 
 
+class ThinkStreamFilter:
+    """Incrementally remove ``<think>...</think>`` blocks from streamed text.
+
+    Mirrors :func:`extract_think_and_result` for token streams: tags may be split
+    across chunks, so a possible partial tag is held back until the next chunk
+    decides it. Leading whitespace of the visible result is dropped, and an
+    unterminated think block is released verbatim on :meth:`flush`, as the regex
+    version would leave it in place.
+    """
+
+    OPEN_TAG = "<think>"
+    CLOSE_TAG = "</think>"
+
+    def __init__(self):
+        self._buffer = ""
+        self._in_think = False
+        self._think_content = ""
+        self._started = False
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk and return the text that is safe to emit."""
+        self._buffer += chunk or ""
+        output = []
+        while self._buffer:
+            if self._in_think:
+                end = self._buffer.find(self.CLOSE_TAG)
+                if end == -1:
+                    keep = self._partial_tag_length(self._buffer, self.CLOSE_TAG)
+                    self._think_content += self._buffer[:len(self._buffer) - keep]
+                    self._buffer = self._buffer[len(self._buffer) - keep:]
+                    break
+                self._think_content = ""
+                self._buffer = self._buffer[end + len(self.CLOSE_TAG):]
+                self._in_think = False
+            else:
+                start = self._buffer.find(self.OPEN_TAG)
+                if start == -1:
+                    keep = self._partial_tag_length(self._buffer, self.OPEN_TAG)
+                    output.append(self._buffer[:len(self._buffer) - keep])
+                    self._buffer = self._buffer[len(self._buffer) - keep:]
+                    break
+                output.append(self._buffer[:start])
+                self._buffer = self._buffer[start + len(self.OPEN_TAG):]
+                self._in_think = True
+        return self._emit("".join(output))
+
+    def flush(self) -> str:
+        """Return whatever is still held back once the stream has ended."""
+        if self._in_think:
+            remaining = f"{self.OPEN_TAG}{self._think_content}{self._buffer}"
+        else:
+            remaining = self._buffer
+        self._buffer = ""
+        self._think_content = ""
+        self._in_think = False
+        return self._emit(remaining)
+
+    def _emit(self, text: str) -> str:
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
+    @staticmethod
+    def _partial_tag_length(text: str, tag: str) -> int:
+        """Length of the longest suffix of ``text`` that is a proper prefix of ``tag``."""
+        for size in range(min(len(tag) - 1, len(text)), 0, -1):
+            if text.endswith(tag[:size]):
+                return size
+        return 0
+
+
+def get_text_from_chunk(chunk) -> str:
+    """Extract the text delta from a streamed message chunk."""
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        parts = []
+        for block in content:
+            if isinstance(block, str):
+                parts.append(block)
+            elif isinstance(block, dict) and block.get("type") == "text":
+                parts.append(block.get("text", ""))
+        return "".join(parts)
+    return ""
+
+
 def preprocess_response(response, only_text=True, exclude_think=False, json_output=False):
     if only_text or exclude_think or json_output:
         response = get_text_from_response(response)
@@ -0,0 +1,27 @@
+import ast
+import json
+from typing import Any
+
+
+def parse_legacy_payload(value: Any) -> Any:
+    """Decode a structured value that may have been sent as a string.
+
+    Native JSON values (dicts, lists, numbers) are returned unchanged. Strings
+    that look like a JSON object/array are parsed with ``json.loads``; older
+    clients that sent Python reprs (``str(dict)``) are still accepted through an
+    ``ast.literal_eval`` fallback. Anything else is returned as-is, so free text
+    such as a markdown document passes through untouched.
+    """
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    if not text or text[0] not in "{[":
+        return value
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return value
@@ -1,19 +1,29 @@
 import re
 import os
 import json
-import PyPDF2
-import pdfplumber
-import re
-from pypinyin import lazy_pinyin
 import hashlib
 
-def extract_text_from_pdf(file_path):
+# pdfplumber and pypinyin are imported where they are used: together they add
+# about a second to every process start, and most code paths never need them.
+
+def extract_text_from_pdf(file_path, max_pages=None):
     assert file_path.endswith('.pdf'), "Invalid file format. Please provide a PDF file."
+    import pdfplumber
+    with pdfplumber.open(file_path) as pdf:
+        pages = pdf.pages if max_pages is None else pdf.pages[:max_pages]
+        # Image-only pages have no text layer and return None.
+        return "".join(page.extract_text() or "" for page in pages)
+
+def count_pdf_pages(file_path):
+    import pdfplumber
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+def extract_pdf_page_range(file_path, start, stop):
+    """Extract the text of pages ``[start, stop)``; top-level so it can run in a process pool."""
+    import pdfplumber
     with pdfplumber.open(file_path) as pdf:
-        text = ""
-        for page in pdf.pages:
-            text += page.extract_text()
-        return text
+        return [page.extract_text() or "" for page in pdf.pages[start:stop]]
 
 def save_json(file_path, data):
     base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -31,6 +41,7 @@ def load_json(file_path):
 def sanitize_collection_name(name):
     contains_chinese = bool(re.search(r'[\u4e00-\u9fff]', name))
     if contains_chinese:
+        from pypinyin import lazy_pinyin
         name = ''.join(lazy_pinyin(name))
     else:
         name = name
@@ -0,0 +1,8 @@
+import json
+from typing import Any
+
+
+def format_sse_event(event: str, data: Any) -> str:
+    """Encode one Server-Sent Events message with a JSON payload."""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
@@ -0,0 +1,43 @@
+"""Wall-time profile of the application's startup phases.
+
+``main.py`` wraps its imports and component construction in :func:`phase`
+blocks; the result is logged once the server is up and exported as the
+``startup_phase_seconds`` gauge. For a per-module breakdown of the import
+phase run ``python -X importtime main.py``.
+"""
+
+import time
+import logging
+import threading
+import contextlib
+from typing import Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+_phases: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Record the wall time of the ``with`` block under ``name``; repeated names accumulate."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        with _lock:
+            _phases[name] = _phases.get(name, 0.0) + elapsed
+
+
+def phases() -> Dict[str, float]:
+    with _lock:
+        return dict(_phases)
+
+
+def log_report() -> None:
+    recorded = phases()
+    if not recorded:
+        return
+    details = ", ".join(f"{name}={seconds:.3f}s" for name, seconds in recorded.items())
+    logger.info(f"Startup took {sum(recorded.values()):.3f}s ({details})")
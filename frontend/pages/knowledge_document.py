@@ -7,12 +7,20 @@ import streamlit as st
 import streamlit.components.v1 as components
 import urllib.parse as urlparse
 from components.time_tracking import track_session_learning_start_time
-from utils.request_api import draft_knowledge_points, explore_knowledge_points, generate_document_quizzes, integrate_learning_document, update_learner_profile
+from utils.request_api import draft_knowledge_points, explore_knowledge_points, generate_document_quizzes, integrate_learning_document, update_learner_profile, prefetch_learning_content, get_prefetched_learning_content
 from utils.format import prepare_markdown_document
 from utils.state import get_current_session_uid, save_persistent_state
 from config import use_mock_data, use_search
 from assets.js.doc_reading import doc_reading_auto_scroll_js
 
+# Quiz mix of a session; also sent with prefetch requests so prefetched sessions match.
+DOCUMENT_QUIZ_COUNTS = {
+    "single_choice_count": 3,
+    "multiple_choice_count": 1,
+    "true_false_count": 1,
+    "short_answer_count": 1,
+}
+
 
 st.markdown('<style>' + open('./assets/css/main.css').read() + '</style>', unsafe_allow_html=True)
 
@@ -43,6 +51,7 @@ def render_learning_content():
     else:
         track_session_learning_start_time()
         learning_content = st.session_state["document_caches"].get(session_uid, "")
+        request_next_session_prefetch(goal, session_uid)
         
         render_type = "by_section"
         document = learning_content["document"]
@@ -59,6 +68,7 @@ def render_learning_content():
             complete_button_status = True if goal["learning_path"][st.session_state["selected_session_id"]]["if_learned"] else False
             if st.button("Regenerate", icon=":material/refresh:"):
                 st.session_state["document_caches"].pop(session_uid)
+                st.session_state.setdefault("regenerate_requested", set()).add(session_uid)
                 try:
                     save_persistent_state()
                 except Exception:
@@ -114,6 +124,7 @@ def render_session_details(goal):
     with col3:
         if st.button("Regenerate", icon=":material/refresh:", key="regenerate-content-top"):
             st.session_state["document_caches"].pop(session_uid)
+            st.session_state.setdefault("regenerate_requested", set()).add(session_uid)
             try:
                 save_persistent_state()
             except Exception:
@@ -187,6 +198,23 @@ def render_content_preparation(goal):
             pass
         return learning_content
 
+    regenerate = session_uid in st.session_state.get("regenerate_requested", set())
+    with st.spinner("Checking for prepared content..."):
+        # On regenerate this only drops the backend's prefetched copy, so the pipeline below runs afresh.
+        prefetched_content = get_prefetched_learning_content(
+            goal["learner_profile"], goal["learning_path"], learning_session, use_search=use_search,
+            quiz_counts=DOCUMENT_QUIZ_COUNTS, regenerate=regenerate,
+        )
+    st.session_state.get("regenerate_requested", set()).discard(session_uid)
+    if prefetched_content:
+        st.session_state["document_caches"][session_uid] = prefetched_content
+        try:
+            save_persistent_state()
+        except Exception:
+            pass
+        st.rerun()
+        return prefetched_content
+
     with st.spinner("Stage 1/4 - Exploring knowledge Points..."):
         knowledge_points = explore_knowledge_points(
             goal["learner_profile"],
@@ -236,10 +264,7 @@ def render_content_preparation(goal):
         quizzes = generate_document_quizzes(
             goal["learner_profile"],
             learning_document,
-            single_choice_count=3,
-            multiple_choice_count=1,
-            true_false_count=1,
-            short_answer_count=1,
+            **DOCUMENT_QUIZ_COUNTS,
             llm_type="gpt4o"
         )
     learning_content["quizzes"] = quizzes
@@ -494,7 +519,7 @@ def update_learner_profile_with_feedback(goal, feedback_data, session_informatio
     if session_information != "":
         session_information = copy.deepcopy(session_information)
         session_information["if_learned"] = True
-    new_learner_profile = update_learner_profile(goal["learner_profile"], feedback_data, session_information=session_information)
+    new_learner_profile = update_learner_profile(goal["learner_profile"], feedback_data, session_information=session_information, learning_path=goal["learning_path"])
     if new_learner_profile is None:
         st.error("Failed to update learner profile. Please try again.")
         return False
@@ -503,6 +528,17 @@ def update_learner_profile_with_feedback(goal, feedback_data, session_informatio
         st.toast("🎉 Your profile has been updated!")
         return True
 
+def request_next_session_prefetch(goal, session_uid):
+    """Once per opened session, let the backend start preparing the next unlearned session."""
+    if use_mock_data:
+        return
+    requested = st.session_state.setdefault("prefetch_requested", set())
+    if session_uid in requested:
+        return
+    requested.add(session_uid)
+    current_session_id = goal["learning_path"][st.session_state["selected_session_id"]].get("id")
+    prefetch_learning_content(goal["learner_profile"], goal["learning_path"], current_session_id, use_search=use_search, quiz_counts=DOCUMENT_QUIZ_COUNTS)
+
 def load_knowledge_point_content(file_path):
     try:
         knowledge_document = json.load(open(file_path))
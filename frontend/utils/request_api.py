@@ -16,6 +16,8 @@ API_NAMES = {
     "draft_point_perspectives": "draft-point-perspectives",
     "integrate_knowledge_document": "integrate-knowledge-document",
     "tailor_learning_content": "tailor-learning-content",
+    "tailor_knowledge_content": "tailor-knowledge-content",
+    "prefetch_learning_content": "prefetch-learning-content",
     "explore_knowledge_points": "explore-knowledge-points",
     "draft_knowledge_point": "draft-knowledge-point",
     "draft_knowledge_points": "draft-knowledge-points",
@@ -64,8 +66,8 @@ def get_available_models(backend_endpoint):
 
 def chat_with_tutor(chat_messages, learner_profile, llm_type="gpt4o", method_name="genmentor"):
     data = {
-        "messages": str(chat_messages),
-        "learner_profile": str(learner_profile),
+        "messages": chat_messages,
+        "learner_profile": learner_profile,
         "llm_type": str(llm_type),
         "method_name": str(method_name),
     }
@@ -104,8 +106,8 @@ def create_learner_profile(learning_goal, learner_information, skill_gaps, llm_t
     model_provider, model_name = parse_llm_settings(llm_type)
     data = {
         "learning_goal": str(learning_goal),
-        "learner_information": str(learner_information),
-        "skill_gaps": str(skill_gaps),
+        "learner_information": learner_information,
+        "skill_gaps": skill_gaps,
         "llm_type": str(llm_type),
         "method_name": str(method_name),
         "model_provider": model_provider,
@@ -114,12 +116,13 @@ def create_learner_profile(learning_goal, learner_information, skill_gaps, llm_t
     response = make_post_request(API_NAMES["create_profile"], data, "./assets/data_example/learner_profile.json")
     return response.get("learner_profile") if response else None
 
-def update_learner_profile(learner_profile, learner_interactions, learner_information="", session_information="", llm_type="gpt4o", method_name="genmentor"):
+def update_learner_profile(learner_profile, learner_interactions, learner_information="", session_information="", learning_path=None, llm_type="gpt4o", method_name="genmentor"):
     data = {
-        "learner_profile": str(learner_profile),
-        "learner_interactions": str(learner_interactions),
-        "learner_information": str(learner_information),
-        "session_information": str(session_information),
+        "learner_profile": learner_profile,
+        "learner_interactions": learner_interactions,
+        "learner_information": learner_information,
+        "session_information": session_information,
+        "learning_path": learning_path,
         "llm_type": str(llm_type),
         "method_name": str(method_name),
     }
@@ -129,7 +132,7 @@ def update_learner_profile(learner_profile, learner_interactions, learner_inform
 # @st.cache_resource
 def schedule_learning_path(learner_profile, session_count, llm_type="gpt4o", method_name="genmentor"):
     data = {
-        "learner_profile": str(learner_profile),
+        "learner_profile": learner_profile,
         "session_count": session_count,
         "llm_type": str(llm_type),
         "method_name": str(method_name),
@@ -139,10 +142,10 @@ def schedule_learning_path(learner_profile, session_count, llm_type="gpt4o", met
 
 def reschedule_learning_path(learning_path, learner_profile, session_count, other_feedback="", llm_type="gpt4o", method_name="genmentor"):
     data = {
-        "learning_path": str(learning_path),
-        "learner_profile": str(learner_profile),
+        "learning_path": learning_path,
+        "learner_profile": learner_profile,
         "session_count": int(session_count),
-        "other_feedback": str(other_feedback),
+        "other_feedback": other_feedback,
         "llm_type": str(llm_type),
         "method_name": str(method_name),
     }
@@ -152,8 +155,8 @@ def reschedule_learning_path(learning_path, learner_profile, session_count, othe
 # @st.cache_resource
 def generate_document_quizzes(learner_profile, learning_document, single_choice_count, multiple_choice_count, true_false_count, short_answer_count, llm_type="gpt4o", method_name="genmentor"):
     data = {
-        "learner_profile": str(learner_profile),
-        "learning_document": str(learning_document),
+        "learner_profile": learner_profile,
+        "learning_document": learning_document,
         "single_choice_count": single_choice_count,
         "multiple_choice_count": multiple_choice_count,
         "true_false_count": true_false_count,
@@ -164,12 +167,41 @@ def generate_document_quizzes(learner_profile, learning_document, single_choice_
     response = make_post_request("generate-document-quizzes", data, "./assets/data_example/document_quiz.json")
     return response.get("document_quiz") if response else None
 
+def prefetch_learning_content(learner_profile, learning_path, current_session_id=None, use_search=True, quiz_counts=None):
+    """Ask the backend to prepare the next unlearned session's content in the background."""
+    data = {
+        "learner_profile": learner_profile,
+        "learning_path": learning_path,
+        "current_session_id": current_session_id,
+        "use_search": use_search,
+        **(quiz_counts or {}),
+    }
+    response = make_post_request(API_NAMES["prefetch_learning_content"], data, timeout=30)
+    return response.get("status") if response else None
+
+def get_prefetched_learning_content(learner_profile, learning_path, learning_session, use_search=True, quiz_counts=None, regenerate=False):
+    """Return content the backend already prefetched for this session, or None.
+
+    With ``regenerate`` the backend drops its prefetched copy instead and returns None.
+    """
+    data = {
+        "learner_profile": learner_profile,
+        "learning_path": learning_path,
+        "learning_session": learning_session,
+        "use_search": use_search,
+        **(quiz_counts or {}),
+        "prefetched_only": True,
+        "regenerate": regenerate,
+    }
+    response = make_post_request(API_NAMES["tailor_knowledge_content"], data)
+    return response.get("tailored_content") if response else None
+
 # @st.cache_resource
 def explore_knowledge_points(learner_profile, learning_path, learning_session, llm_type="gpt4o", method_name="genmentor"):
     data = {
-        "learner_profile": str(learner_profile),
-        "learning_path": str(learning_path),
-        "learning_session": str(learning_session),
+        "learner_profile": learner_profile,
+        "learning_path": learning_path,
+        "learning_session": learning_session,
     }
     response = make_post_request("explore-knowledge-points", data, "./assets/data_example/knowledge_points.json")
     return response.get("knowledge_points") if response else None
@@ -177,11 +209,11 @@ def explore_knowledge_points(learner_profile, learning_path, learning_session, l
 # @st.cache_resource
 def draft_knowledge_point(learner_profile, learning_path, learning_session, knowledge_points, knowledge_point, use_search, llm_type="gpt4o", method_name="genmentor"):
     data = {
-        "learner_profile": str(learner_profile),
-        "learning_path": str(learning_path),
-        "learning_session": str(learning_session),
-        "knowledge_points": str(knowledge_points),
-        "knowledge_point": str(knowledge_point),
+        "learner_profile": learner_profile,
+        "learning_path": learning_path,
+        "learning_session": learning_session,
+        "knowledge_points": knowledge_points,
+        "knowledge_point": knowledge_point,
         "use_search": use_search,
         "llm_type": str(llm_type),
         "method_name": str(method_name),
@@ -192,10 +224,10 @@ def draft_knowledge_point(learner_profile, learning_path, learning_session, know
 # @st.cache_resource
 def draft_knowledge_points(learner_profile, learning_path, learning_session, knowledge_points, allow_parallel, use_search, llm_type="gpt4o", method_name="genmentor"):
     data = {
-        "learner_profile": str(learner_profile),
-        "learning_path": str(learning_path),
-        "learning_session": str(learning_session),
-        "knowledge_points": str(knowledge_points),
+        "learner_profile": learner_profile,
+        "learning_path": learning_path,
+        "learning_session": learning_session,
+        "knowledge_points": knowledge_points,
         "allow_parallel": allow_parallel,
         "use_search": use_search,
         "llm_type": str(llm_type),
@@ -207,11 +239,11 @@ def draft_knowledge_points(learner_profile, learning_path, learning_session, kno
 # @st.cache_resource
 def integrate_learning_document(learner_profile, learning_path, learning_session, knowledge_points, knowledge_drafts, output_markdown=False, llm_type="gpt4o", method_name="genmentor"):
     data = {
-        "learner_profile": str(learner_profile),
-        "learning_path": str(learning_path),
-        "learning_session": str(learning_session),
-        "knowledge_points": str(knowledge_points),
-        "knowledge_drafts": str(knowledge_drafts),
+        "learner_profile": learner_profile,
+        "learning_path": learning_path,
+        "learning_session": learning_session,
+        "knowledge_points": knowledge_points,
+        "knowledge_drafts": knowledge_drafts,
         "output_markdown": output_markdown,
         "llm_type": str(llm_type),
         "method_name": str(method_name),